@@ -9,9 +9,13 @@ Example:
 import pyswisseph as swe
 import datetime
 import sys
+from aspects import compute_aspects
+from ephe_loader import EPHE_PATH
+from house_lords import PLANET_INDEX, RASI_INDEX, house_lord, sign_lord
+from vargas import compute_vargas, vargottama
 
 # --- Setup Swiss Ephemeris ---
-swe.set_ephe_path('.')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 rasis = [
@@ -61,11 +65,10 @@ def get_planet_positions(dob, tob, lat, lon, tz_offset):
     results['Ascendant'] = get_chart_info(ascmc[0])
     return results
 
-def get_lagna_houses(asc_index):
-    return [(asc_index + i) % 12 + 1 for i in range(12)]
-
-def detect_yogas(data):
+def detect_yogas(data, vargas=None, aspects=None):
     yogas = []
+    if aspects is None:
+        aspects = compute_aspects(data)
     rasi = {p: data[p]['rasi'] for p in data}
     houses = {p: int(data[p]['longitude'] // 30) + 1 for p in data}
     deg = {p: data[p]['longitude'] for p in data}
@@ -73,14 +76,13 @@ def detect_yogas(data):
     # Helper vars
     moon_pos = houses['Moon']
     lagna_rasi = rasi['Ascendant']
-    lagna_index = rasis.index(lagna_rasi)
-    house_map = get_lagna_houses(lagna_index)
+    lagna_index = RASI_INDEX[lagna_rasi]
 
     # --- Phase 1 Yogas ---
     if rasi['Sun'] == rasi['Mercury']:
         yogas.append("Budha-Aditya Yoga")
 
-    if abs(houses['Jupiter'] - houses['Moon']) in [1, 4, 7, 10]:
+    if aspects.relative_house('Moon', 'Jupiter') in [1, 4, 7, 10]:
         yogas.append("Gaja Kesari Yoga")
 
     count = sum(1 for p in ['Mercury', 'Venus', 'Jupiter'] if rasi[p] in ['Mithuna', 'Kanni', 'Dhanus', 'Meena'])
@@ -107,7 +109,7 @@ def detect_yogas(data):
         'Mars': ['Mesha', 'Vrischika'],
         'Mercury': ['Mithuna', 'Kanni'],
         'Jupiter': ['Dhanus', 'Meena'],
-        'Venus': ['Rishaba', 'Tula'],
+        'Venus': ['Rishaba', 'Thula'],
         'Saturn': ['Makara', 'Kumbha']
     }
     for p, signs in pmp.items():
@@ -125,7 +127,7 @@ def detect_yogas(data):
 
     # Adhi Yoga - Benefics in 6,7,8 from Moon
     benefics = ['Jupiter', 'Venus', 'Mercury']
-    count = sum(1 for p in benefics if abs(houses[p] - moon_pos) in [6, 7, 8])
+    count = sum(1 for p in benefics if aspects.relative_house('Moon', p) in [6, 7, 8])
     if count >= 2:
         yogas.append("Adhi Yoga (from Moon)")
 
@@ -161,18 +163,14 @@ def detect_yogas(data):
     if ((moon_pos - 1) in occupied and (moon_pos + 1) in occupied):
         yogas.append("Durudhara Yoga")
 
-    # Neechabhanga (Debilitated planet in rasi of its enemy but aspected by its exaltation lord)
-    if rasi['Venus'] == 'Kanni' and rasi['Mercury'] == 'Meena':
+    # Neechabhanga: debilitated Venus with its dispositor Mercury in Meena (exchange), or aspected by Jupiter,
+    # the lord of its exaltation sign
+    if rasi['Venus'] == 'Kanni' and (rasi['Mercury'] == 'Meena' or aspects.aspects('Jupiter', 'Venus')):
         yogas.append("Neechabhanga Raja Yoga (Venus)")
 
     # Dharma-Karmadhipati Yoga: 9th and 10th lords connected
-    lords = {
-        'Mesha': 'Mars', 'Rishaba': 'Venus', 'Mithuna': 'Mercury', 'Kataka': 'Moon',
-        'Simha': 'Sun', 'Kanni': 'Mercury', 'Thula': 'Venus', 'Vrischika': 'Mars',
-        'Dhanus': 'Jupiter', 'Makara': 'Saturn', 'Kumbha': 'Saturn', 'Meena': 'Jupiter'
-    }
-    ninth_lord = lords[rasis[(lagna_index + 8) % 12]]
-    tenth_lord = lords[rasis[(rasis.index(lagna_rasi) + 9) % 12]]
+    ninth_lord = house_lord(lagna_index, 9)
+    tenth_lord = house_lord(lagna_index, 10)
     if rasi[ninth_lord] == rasi[tenth_lord]:
         yogas.append("Dharma-Karmadhipati Yoga")
 
@@ -204,7 +202,7 @@ def detect_yogas(data):
     if suna and ana: yogas.append("Durudhura Yoga")
 
     # Shakata Yoga: Moon in 6/8 from Jupiter
-    if abs(houses['Moon'] - houses['Jupiter']) in [6, 8]:
+    if aspects.relative_house('Jupiter', 'Moon') in [6, 8]:
         yogas.append("Shakata Yoga")
 
     # Amala Yoga: Benefics in 10th from Lagna or Moon
@@ -217,10 +215,10 @@ def detect_yogas(data):
     # Parivartana Yoga: Lords in each other's sign
     checked = set()
     for p1 in data:
-        if p1 not in lords.values(): continue
+        if p1 not in PLANET_INDEX: continue
         lord1_rasi = rasi[p1]
-        if lord1_rasi in lords:
-            lord_of_lord1 = lords[lord1_rasi]
+        if lord1_rasi in RASI_INDEX:
+            lord_of_lord1 = sign_lord(lord1_rasi)
             if p1 != lord_of_lord1 and rasi.get(lord_of_lord1) == rasi.get(p1):
                 key = tuple(sorted([p1, lord_of_lord1]))
                 if key not in checked:
@@ -244,6 +242,14 @@ def detect_yogas(data):
     if houses['Moon'] in [9, 12] and houses['Jupiter'] in [9, 12]:
         yogas.append("Moksha Yoga (Moon + Jupiter)")
 
+    # --- Divisional Chart Yogas ---
+    # Vargottama: same sign in the Rasi and Navamsa charts
+    if vargas is None:
+        vargas = compute_vargas(data)
+    grahas = ['Ascendant', 'Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
+    for p in vargottama(vargas, grahas):
+        yogas.append("Vargottama Lagna" if p == 'Ascendant' else f"Vargottama {p}")
+
     return sorted(set(yogas))
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""
+Ashtakavarga: Bhinnashtakavarga (BAV) per planet, Sarvashtakavarga (SAV)
+and transit strength.
+
+Parashara's benefic points are stored as one 12-bit mask per (planet,
+contributor): bit h-1 is set when the contributor gives a bindu to the
+h-th sign counted from itself. At import every mask is rotated to each of
+the twelve signs and spread into a 96-bit integer with one byte lane per
+sign, so a planet's BAV for a chart is the sum of its eight contributors'
+integers (no lane exceeds 8) and the SAV the sum of the seven BAVs (none
+exceeds 56); `int.to_bytes` then reads out the twelve counts at once.
+
+Transit strength over a run of days is the planet's BAV looked up at the
+sign it transits each day, done for the whole run with one
+`bytes.translate` over the daily sign indices.
+"""
+
+import astrology
+
+RASIS = [
+    "Mesha", "Rishaba", "Mithuna", "Kataka", "Simha", "Kanni",
+    "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
+]
+RASI_INDEX = {rasi: i for i, rasi in enumerate(RASIS)}
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+CONTRIBUTORS = PLANETS + ["Ascendant"]
+FAVOURABLE_BINDUS = 4  # a transit through a sign with at least 4 bindus in the planet's own BAV is favourable
+
+
+def _mask(*houses):
+    return sum(1 << (house - 1) for house in houses)
+
+
+# --- BENEFIC POINTS ---
+# planet -> one mask per contributor, ordered like CONTRIBUTORS (Brihat Parashara Hora Shastra)
+BENEFIC_POINTS = {
+    "Sun": [
+        _mask(1, 2, 4, 7, 8, 9, 10, 11), _mask(3, 6, 10, 11), _mask(1, 2, 4, 7, 8, 9, 10, 11),
+        _mask(3, 5, 6, 9, 10, 11, 12), _mask(5, 6, 9, 11), _mask(6, 7, 12), _mask(1, 2, 4, 7, 8, 9, 10, 11),
+        _mask(3, 4, 6, 10, 11, 12),
+    ],
+    "Moon": [
+        _mask(3, 6, 7, 8, 10, 11), _mask(1, 3, 6, 7, 10, 11), _mask(2, 3, 5, 6, 9, 10, 11),
+        _mask(1, 3, 4, 5, 7, 8, 10, 11), _mask(1, 4, 7, 8, 10, 11, 12), _mask(3, 4, 5, 7, 9, 10, 11),
+        _mask(3, 5, 6, 11), _mask(3, 6, 10, 11),
+    ],
+    "Mars": [
+        _mask(3, 5, 6, 10, 11), _mask(3, 6, 11), _mask(1, 2, 4, 7, 8, 10, 11), _mask(3, 5, 6, 11),
+        _mask(6, 10, 11, 12), _mask(6, 8, 11, 12), _mask(1, 4, 7, 8, 9, 10, 11), _mask(1, 3, 6, 10, 11),
+    ],
+    "Mercury": [
+        _mask(5, 6, 9, 11, 12), _mask(2, 4, 6, 8, 10, 11), _mask(1, 2, 4, 7, 8, 9, 10, 11),
+        _mask(1, 3, 5, 6, 9, 10, 11, 12), _mask(6, 8, 11, 12), _mask(1, 2, 3, 4, 5, 8, 9, 11),
+        _mask(1, 2, 4, 7, 8, 9, 10, 11), _mask(1, 2, 4, 6, 8, 10, 11),
+    ],
+    "Jupiter": [
+        _mask(1, 2, 3, 4, 7, 8, 9, 10, 11), _mask(2, 5, 7, 9, 11), _mask(1, 2, 4, 7, 8, 10, 11),
+        _mask(1, 2, 4, 5, 6, 9, 10, 11), _mask(1, 2, 3, 4, 7, 8, 10, 11), _mask(2, 5, 6, 9, 10, 11),
+        _mask(3, 5, 6, 12), _mask(1, 2, 4, 5, 6, 7, 9, 10, 11),
+    ],
+    "Venus": [
+        _mask(8, 11, 12), _mask(1, 2, 3, 4, 5, 8, 9, 11, 12), _mask(3, 5, 6, 9, 11, 12),
+        _mask(3, 5, 6, 9, 11), _mask(5, 8, 9, 10, 11), _mask(1, 2, 3, 4, 5, 8, 9, 10, 11),
+        _mask(3, 4, 5, 8, 9, 10, 11), _mask(1, 2, 3, 4, 5, 8, 9, 11),
+    ],
+    "Saturn": [
+        _mask(1, 2, 4, 7, 8, 10, 11), _mask(3, 6, 11), _mask(3, 5, 6, 10, 11, 12),
+        _mask(6, 8, 9, 10, 11, 12), _mask(5, 6, 11, 12), _mask(6, 11, 12), _mask(3, 5, 6, 11),
+        _mask(1, 3, 4, 6, 10, 11),
+    ],
+}
+
+# Bindus in each planet's BAV, the same for every chart (48, 49, 39, 54, 56, 52, 39; SAV 337)
+TOTALS = {planet: sum(mask.bit_count() for mask in masks) for planet, masks in BENEFIC_POINTS.items()}
+SAV_TOTAL = sum(TOTALS.values())
+
+
+def _rotate(mask, sign):
+    """The mask moved so that its first house is `sign` (a 12-bit left rotation)."""
+    return ((mask << sign) | (mask >> (12 - sign))) & 0xFFF
+
+
+def _lanes(mask):
+    """The 12-bit mask spread to one byte per sign, lowest byte Mesha."""
+    return sum(1 << (8 * sign) for sign in range(12) if mask >> sign & 1)
+
+
+# planet -> contributor -> contributor's sign -> byte-lane integer of the signs it gives bindus to
+_LANES = [[[_lanes(_rotate(mask, sign)) for sign in range(12)] for mask in BENEFIC_POINTS[planet]]
+          for planet in PLANETS]
+
+
+# --- TABLES ---
+def bindu_rows(signs):
+    """
+    BAV of every planet and the SAV for the contributors' sign indices
+    (ordered like CONTRIBUTORS). Returns (seven 12-byte rows, one 12-byte SAV row).
+    """
+    rows = []
+    sav = 0
+    for table in _LANES:
+        bav = 0
+        for lanes, sign in zip(table, signs):
+            bav += lanes[sign]
+        sav += bav
+        rows.append(bav.to_bytes(12, "little"))
+    return rows, sav.to_bytes(12, "little")
+
+
+def chart_signs(chart):
+    """Sign indices of the contributors in a chart dict from astrology.get_planet_positions."""
+    return [RASI_INDEX[chart[body]["rasi"]] for body in CONTRIBUTORS]
+
+
+def compute_ashtakavarga(chart):
+    """{"bav": {planet: {rasi: bindus}}, "sav": {rasi: bindus}, "totals": {planet: bindus, "SAV": 337}}."""
+    rows, sav = bindu_rows(chart_signs(chart))
+    return {
+        "bav": {planet: dict(zip(RASIS, row)) for planet, row in zip(PLANETS, rows)},
+        "sav": dict(zip(RASIS, sav)),
+        "totals": {**TOTALS, "SAV": SAV_TOTAL},
+    }
+
+
+# --- TRANSITS ---
+# Swiss Ephemeris body numbers
+_SWE_IDS = {"Sun": 0, "Moon": 1, "Mars": 4, "Mercury": 2, "Jupiter": 5, "Venus": 3, "Saturn": 6}
+
+
+def transit_signs(start, days, tz_offset=5.5):
+    """
+    Sidereal sign of every planet at local noon on each of `days` days from
+    `start` (a date): {planet: bytes of sign indices, one per day}.
+    """
+    import pyswisseph as swe
+
+    astrology.configure_engine()
+    jd0 = swe.julday(start.year, start.month, start.day, 12.0 - tz_offset)
+    signs = {}
+    for planet in PLANETS:
+        pid = _SWE_IDS[planet]
+        signs[planet] = bytes(int(swe.calc_ut(jd0 + day, pid, swe.FLG_SIDEREAL)[0][0] // 30) % 12
+                              for day in range(days))
+    return signs
+
+
+def transit_strength(ashtakavarga, signs):
+    """
+    Each planet's bindus in its own BAV at the sign it transits, per day, for
+    the daily sign indices from transit_signs. One translate per planet.
+    """
+    bindus = {}
+    for planet, daily in signs.items():
+        row = bytes(ashtakavarga["bav"][planet][rasi] for rasi in RASIS)
+        bindus[planet] = daily.translate(row + bytes(256 - 12))
+    return {
+        "bindus": {planet: list(daily) for planet, daily in bindus.items()},
+        "total": [sum(day) for day in zip(*bindus.values())],
+        "favourable_days": {planet: len(daily) - sum(daily.count(n) for n in range(FAVOURABLE_BINDUS))
+                            for planet, daily in bindus.items()},
+    }
+
@@ -0,0 +1,105 @@
+"""
+Graha drishti: the houses and planets each planet aspects, per chart.
+
+Every graha aspects the 7th house from itself; Mars also the 4th and 8th,
+Jupiter the 5th and 9th, Saturn the 3rd and 10th, and Rahu and Ketu, like
+Jupiter, the 5th and 9th. Aspects are whole-sign: a planet aspects every
+house, and every planet in a sign, it aspects. Planets sharing a sign are
+conjunct, not aspecting.
+
+A chart's aspects are rows of bitmasks, built once per chart
+(BirthChart.aspects) and read by every analyzer: bit h-1 of
+house_masks[i] is set when PLANETS[i] aspects house h, counted from the
+lagna, bit j of planet_masks[i] when it aspects PLANETS[j], and bit i of
+aspected_by[h-1] when PLANETS[i] aspects house h. The house masks are
+12-bit rotations of one mask per planet, precomputed for all twelve
+houses at import, as are the members of every possible mask.
+"""
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+
+# Houses (counted from the planet) aspected in addition to the 7th
+SPECIAL_ASPECTS = {"Mars": (4, 8), "Jupiter": (5, 9), "Saturn": (3, 10), "Rahu": (5, 9), "Ketu": (5, 9)}
+
+
+def _mask(*houses):
+    return sum(1 << (house - 1) for house in houses)
+
+
+def _rotate(mask, house):
+    """The mask moved so that its first house is `house` (0-11, a 12-bit left rotation)."""
+    return ((mask << house) | (mask >> (12 - house))) & 0xFFF
+
+
+ASPECT_MASKS = {planet: _mask(7, *SPECIAL_ASPECTS.get(planet, ())) for planet in PLANETS}
+# planet index -> house the planet occupies (0-11) -> mask of the houses it aspects
+_HOUSE_MASKS = [[_rotate(ASPECT_MASKS[planet], house) for house in range(12)] for planet in PLANETS]
+# 12-bit house mask -> its houses (0-11); 9-bit planet mask -> its planets, in PLANETS order
+_SET_HOUSES = [tuple(h for h in range(12) if mask >> h & 1) for mask in range(1 << 12)]
+_SET_PLANETS = [[p for i, p in enumerate(PLANETS) if mask >> i & 1] for mask in range(1 << len(PLANETS))]
+
+
+# --- MATRIX ---
+class AspectMatrix:
+    """Aspect bitmasks of one chart. Houses are 1-12 from the lagna; absent planets aspect nothing."""
+
+    __slots__ = ("houses", "house_masks", "planet_masks", "aspected_by")
+
+    def __init__(self, houses, house_masks, planet_masks, aspected_by):
+        self.houses = houses              # per planet: house occupied (0-11) or None
+        self.house_masks = house_masks
+        self.planet_masks = planet_masks
+        self.aspected_by = aspected_by    # per house (0-11): mask of the planets aspecting it
+
+    def aspects_house(self, planet, house):
+        """True when `planet` aspects `house`."""
+        return bool(self.house_masks[PLANET_INDEX[planet]] >> (house - 1) & 1)
+
+    def aspects(self, planet, other):
+        """True when `planet` aspects `other`."""
+        return bool(self.planet_masks[PLANET_INDEX[planet]] >> PLANET_INDEX[other] & 1)
+
+    def houses_aspected(self, planet):
+        return [house + 1 for house in _SET_HOUSES[self.house_masks[PLANET_INDEX[planet]]]]
+
+    def aspecting_house(self, house):
+        """Planets aspecting `house`, in PLANETS order."""
+        return list(_SET_PLANETS[self.aspected_by[house - 1]])
+
+    def aspecting(self, other):
+        """Planets aspecting `other`, in PLANETS order."""
+        house = self.houses[PLANET_INDEX[other]]
+        return [] if house is None else list(_SET_PLANETS[self.aspected_by[house]])
+
+    def relative_house(self, planet, other):
+        """The house `other` occupies counted from `planet` (1-12), or None if either is absent."""
+        start, end = self.houses[PLANET_INDEX[planet]], self.houses[PLANET_INDEX[other]]
+        if start is None or end is None:
+            return None
+        return (end - start) % 12 + 1
+
+    def to_dict(self):
+        """{planet: {"houses": [...], "planets": [...]}} for the planets present."""
+        return {planet: {"houses": self.houses_aspected(planet),
+                         "planets": list(_SET_PLANETS[self.planet_masks[PLANET_INDEX[planet]]])}
+                for planet, house in zip(PLANETS, self.houses) if house is not None}
+
+
+def compute_aspects(chart):
+    """AspectMatrix of a chart dict (planet -> {"longitude", ...}, with "Ascendant")."""
+    lagna = int(chart["Ascendant"]["longitude"] // 30)
+    houses = [int(chart[planet]["longitude"] // 30 - lagna) % 12 if planet in chart else None
+              for planet in PLANETS]
+    house_masks = [0 if house is None else _HOUSE_MASKS[i][house] for i, house in enumerate(houses)]
+    occupants, aspected_by = [0] * 12, [0] * 12
+    for i, house in enumerate(houses):
+        if house is not None:
+            occupants[house] |= 1 << i
+            for aspected in _SET_HOUSES[house_masks[i]]:
+                aspected_by[aspected] |= 1 << i
+    planet_masks = [0] * len(PLANETS)
+    for i, mask in enumerate(house_masks):
+        for aspected in _SET_HOUSES[mask]:
+            planet_masks[i] |= occupants[aspected]
+    return AspectMatrix(houses, house_masks, planet_masks, aspected_by)
@@ -1,12 +1,10 @@
 import datetime
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-from env_config import OPENAI_API_KEY
-
-# --- Load OpenAI Key ---
-load_dotenv()
-client = OpenAI(api_key=OPENAI_API_KEY)
+import threading
+import cache
+from ephe_loader import EPHE_PATH
+from llm_backends import get_llm_client
+from llm_limiter import LLMOverloaded, create_chat_completion
 
 # --- Nakshatras & Rasis ---
 nakshatras = [
@@ -38,6 +36,37 @@ def get_chart_info(longitude, speed=None):
 
 # --- Planet Positions ---
 
+# Swiss Ephemeris keeps its settings (ephemeris path, sidereal mode, topocentric
+# location) in thread-local storage, so each worker thread is configured once.
+_engine_state = threading.local()
+
+
+def configure_engine(force=False):
+    """
+    Point Swiss Ephemeris at the ephemeris files and select Lahiri ayanamsa.
+    set_ephe_path closes every open ephemeris file, so this runs once per
+    thread instead of once per chart.
+    """
+    if getattr(_engine_state, "configured", False) and not force:
+        return
+    # Lazy import of pyswisseph
+    import pyswisseph as swe
+
+    swe.set_ephe_path(EPHE_PATH)  # Bundled ephemeris files (see ephe_loader)
+    swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa (Vedic)
+    _engine_state.configured = True
+
+
+def get_julian_day(dob, tob, tz_offset):
+    """Julian Day (UT) for a local birth date/time."""
+    import pyswisseph as swe
+
+    local_dt = datetime.datetime.strptime(f"{dob} {tob}", "%Y-%m-%d %H:%M")
+    utc_dt = local_dt - datetime.timedelta(hours=tz_offset)
+    return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
+                      utc_dt.hour + utc_dt.minute / 60.0)
+
+
 def get_planet_positions(dob, tob, lat, lon, tz_offset):
     """
     Returns planetary positions along with Ascendant and house cusps.
@@ -45,17 +74,12 @@ def get_planet_positions(dob, tob, lat, lon, tz_offset):
     """
     # Lazy import of pyswisseph
     import pyswisseph as swe
-    
+
     # --- Setup Swiss Ephemeris ---
-    swe.set_ephe_path('./ephe')  # Use current directory for ephemeris files
-    swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa (Vedic)
-    
+    configure_engine()
+
     print(f"DEBUG: get_planet_positions called with lat={lat}, lon={lon}, tz_offset={tz_offset}")
-    local_dt = datetime.datetime.strptime(f"{dob} {tob}", "%Y-%m-%d %H:%M")
-    utc_dt = local_dt - datetime.timedelta(hours=tz_offset)
-    print(f"DEBUG: UTC time: {utc_dt}")
-    jd = swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
-                    utc_dt.hour + utc_dt.minute / 60.0)
+    jd = get_julian_day(dob, tob, tz_offset)
     print(f"DEBUG: Julian Day: {jd}")
 
     swe.set_topo(lon, lat, 0)
@@ -109,16 +133,29 @@ def generate_gpt_prompt(data):
 
 
 # --- Get GPT Interpretation ---
+INTERPRETATION_MODEL = "gpt-4o"
+
+
+def ask_model(prompt_text):
+    response = create_chat_completion(get_llm_client(),
+                                      model=INTERPRETATION_MODEL,
+                                      messages=[{
+                                          "role":
+                                          "user",
+                                          "content":
+                                          prompt_text
+                                      }],
+                                      temperature=0.7)
+    return response.choices[0].message.content
+
+
 def get_astrology_interpretation(prompt_text):
     try:
-        response = client.chat.completions.create(model="gpt-4o",
-                                                  messages=[{
-                                                      "role":
-                                                      "user",
-                                                      "content":
-                                                      prompt_text
-                                                  }],
-                                                  temperature=0.7)
-        return response.choices[0].message.content
+        # Same chart -> same prompt -> one model call shared by every instance;
+        # failures raise out of the cache and are never stored
+        return cache.get_or_compute("interpretation", (INTERPRETATION_MODEL, prompt_text),
+                                    lambda: ask_model(prompt_text))
+    except LLMOverloaded:
+        raise
     except Exception as e:
         return f"Error from OpenAI: {e}"
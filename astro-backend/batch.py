@@ -0,0 +1,92 @@
+"""
+Bulk computation for partner imports.
+
+A batch body is either a JSON array of birth records or NDJSON (one record per
+line). Every record is validated before any computation starts; invalid
+records become per-record error entries instead of failing the batch. Results
+are streamed back as NDJSON, one line per record, as soon as each completes.
+"""
+
+import json
+import os
+
+from compute_pool import gate, run_in_pool
+from reports import SECTIONS, parse_birth_record
+from serialization import dumps, shape_payload
+
+BATCH_MAX_RECORDS = int(os.getenv("BATCH_MAX_RECORDS", "5000"))
+BATCH_SECTIONS = ("chart", "dasa", "yogas", "career")
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+
+class BatchError(ValueError):
+    """The batch as a whole cannot be processed (bad body or too large)."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_batch_body(body, content_type=""):
+    """Decode a JSON-array or NDJSON body into a list of raw records."""
+    text = body.decode("utf-8").strip()
+    if not text:
+        raise BatchError("Empty batch")
+
+    is_ndjson = content_type.split(";")[0].strip().lower() in NDJSON_MEDIA_TYPES
+    if not is_ndjson and text.startswith("["):
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise BatchError(f"Invalid JSON array: {e}")
+    else:
+        records = []
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                # Keep the slot so indices still match the caller's lines
+                records.append(BatchError(f"Invalid JSON on line {line_no}: {e.msg}"))
+
+    if not isinstance(records, list):
+        raise BatchError("Batch body must be a JSON array or NDJSON")
+    if len(records) > BATCH_MAX_RECORDS:
+        raise BatchError(f"Batch too large: {len(records)} records (max {BATCH_MAX_RECORDS})", status_code=413)
+    return records
+
+
+def validate_batch(records):
+    """Validate all records up front: returns a list of BirthChart or error message."""
+    validated = []
+    for record in records:
+        if isinstance(record, BatchError):
+            validated.append(str(record))
+            continue
+        try:
+            validated.append(parse_birth_record(record))
+        except ValueError as e:
+            validated.append(str(e))
+    return validated
+
+
+async def iter_batch_results(validated, section, include_chart=False, compact=False):
+    """
+    Yield one NDJSON line per record, computing each on the cpu pool as the
+    stream is consumed. The whole stream holds a single "batch" gate slot.
+    """
+    compute = SECTIONS[section]
+    keep_chart = section == "chart"
+    async with gate("batch").admit():
+        for index, birth in enumerate(validated):
+            if isinstance(birth, str):
+                entry = {"index": index, "error": birth}
+            else:
+                try:
+                    payload = shape_payload(await run_in_pool("cpu", compute, birth), include_chart, compact, keep_chart)
+                    entry = {"index": index, "result": payload}
+                except Exception as e:
+                    entry = {"index": index, "error": f"Error processing record: {str(e)}"}
+            yield dumps(entry) + b"\n"
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the bit-packed Ashtakavarga tables against counting
+bindus one sign at a time.
+
+naive_bav() walks the benefic-point house lists for every contributor and
+sign, the way it would be written without the masks; naive_transit() looks
+each day's bindus up in a loop. The benchmark first checks that the engine
+agrees with both and that every BAV keeps its fixed total (48, 49, 39, 54,
+56, 52, 39; SAV 337), on the benchmark corpus and on random sign
+combinations, then times both ways. Exits non-zero on any disagreement.
+
+Run from astro-backend/:
+  python benchmarks/bench_ashtakavarga.py
+"""
+
+import contextlib
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ashtakavarga
+import astrology
+from bench_suite import CORPUS
+from bench_vargas import timed
+
+HOUSES = {planet: [[h for h in range(1, 13) if mask >> (h - 1) & 1] for mask in masks]
+          for planet, masks in ashtakavarga.BENEFIC_POINTS.items()}
+TOTALS = {"Sun": 48, "Moon": 49, "Mars": 39, "Mercury": 54, "Jupiter": 56, "Venus": 52, "Saturn": 39}
+
+
+def naive_bav(signs):
+    """[[bindus per sign] per planet], counted house by house."""
+    rows = []
+    for planet in ashtakavarga.PLANETS:
+        row = [0] * 12
+        for houses, sign in zip(HOUSES[planet], signs):
+            for house in houses:
+                row[(sign + house - 1) % 12] += 1
+        rows.append(row)
+    return rows
+
+
+def naive_transit(rows, signs):
+    return {planet: [row[sign] for sign in signs[planet]] for planet, row in zip(ashtakavarga.PLANETS, rows)}
+
+
+def engine_transit(rows, signs):
+    return {planet: signs[planet].translate(row + bytes(244)) for planet, row in zip(ashtakavarga.PLANETS, rows)}
+
+
+def main():
+    rng = random.Random(7)
+    astrology.configure_engine()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        charts = [astrology.get_planet_positions(*birth)[0] for birth in CORPUS]
+    combos = [ashtakavarga.chart_signs(chart) for chart in charts]
+    combos += [[rng.randrange(12) for _ in ashtakavarga.CONTRIBUTORS] for _ in range(20000)]
+    wrong = 0
+    for signs in combos:
+        rows, sav = ashtakavarga.bindu_rows(signs)
+        expected = naive_bav(signs)
+        wrong += [list(row) for row in rows] != expected
+        wrong += list(sav) != [sum(column) for column in zip(*expected)]
+        wrong += [sum(row) for row in rows] != list(TOTALS.values()) or sum(sav) != 337
+    print(f"tables: {len(combos):,} sign combinations, {wrong} differences")
+
+    days = 365
+    signs = ashtakavarga.transit_signs(datetime.date(2026, 1, 1), days)
+    rows = [bytes(row) for row in naive_bav(combos[0])]
+    bad = engine_transit(rows, signs) != {p: bytes(v) for p, v in naive_transit(rows, signs).items()}
+    print(f"transits: {days} days x {len(signs)} planets, {int(bad)} differences")
+
+    engine = timed(ashtakavarga.bindu_rows, combos[:len(charts)])
+    naive = timed(naive_bav, combos[:len(charts)])
+    full = timed(ashtakavarga.compute_ashtakavarga, charts)
+    print("\nBAV of 7 planets + SAV per chart")
+    print(f"  house by house             {naive:8.1f} us/chart")
+    print(f"  bindu_rows (lane masks)    {engine:8.1f} us/chart   {naive / engine:.1f}x")
+    print(f"  compute_ashtakavarga       {full:8.1f} us/chart")
+    engine = timed(lambda r: engine_transit(r, signs), [rows])
+    naive = timed(lambda r: naive_transit(r, signs), [rows])
+    print(f"\ntransit bindus, {days} days x {len(signs)} planets")
+    print(f"  per-day lookups            {naive:8.1f} us")
+    print(f"  bytes.translate            {engine:8.1f} us   {naive / engine:.1f}x")
+    return 1 if wrong or bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
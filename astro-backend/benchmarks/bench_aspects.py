@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the bitmask aspect matrix against per-analyzer house arithmetic.
+
+naive_aspects() answers one question the way the analyzers used to: the
+houses a planet aspects, counted from its house with modular arithmetic.
+The benchmark first checks that the matrix agrees with it for every planet
+in every house under every lagna, and on random charts for planet-to-planet
+aspects, then times what a report needs per chart (the planets aspecting
+each house and each planet): recomputed every time versus one
+compute_aspects() shared and queried. Exits non-zero on any disagreement.
+
+Run from astro-backend/:
+  python benchmarks/bench_aspects.py
+"""
+
+import contextlib
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import aspects
+import astrology
+from bench_suite import CORPUS, prepare
+from bench_vargas import timed
+
+
+def naive_aspects(chart, planet):
+    """Houses (from the lagna) `planet` aspects, straight from the rule."""
+    lagna = int(chart["Ascendant"]["longitude"] // 30)
+    house = (int(chart[planet]["longitude"] // 30) - lagna) % 12 + 1
+    return sorted((house + offset - 2) % 12 + 1 for offset in (7,) + aspects.SPECIAL_ASPECTS.get(planet, ()))
+
+
+def naive_report(chart):
+    planets = [p for p in aspects.PLANETS if p in chart]
+    houses = {p: naive_aspects(chart, p) for p in planets}
+    placed = {p: (int(chart[p]["longitude"] // 30) - int(chart["Ascendant"]["longitude"] // 30)) % 12 + 1
+              for p in planets}
+    on_houses = {h: [p for p in planets if h in houses[p]] for h in range(1, 13)}
+    on_planets = {o: [p for p in planets if placed[o] in houses[p] and p != o] for o in planets}
+    return on_houses, on_planets
+
+
+def matrix_report(matrix, chart):
+    on_houses = {h: matrix.aspecting_house(h) for h in range(1, 13)}
+    on_planets = {o: matrix.aspecting(o) for o in aspects.PLANETS if o in chart}
+    return on_houses, on_planets
+
+
+def random_chart(rng):
+    chart = {p: {"longitude": rng.uniform(0, 360)} for p in aspects.PLANETS[:7]}
+    rahu = rng.uniform(0, 360)
+    chart["Rahu"], chart["Ketu"] = {"longitude": rahu}, {"longitude": (rahu + 180) % 360}
+    chart["Ascendant"] = {"longitude": rng.uniform(0, 360)}
+    return chart
+
+
+def check():
+    bad = 0
+    for lagna in range(12):
+        for sign in range(12):
+            chart = {p: {"longitude": sign * 30 + 15} for p in aspects.PLANETS}
+            chart["Ascendant"] = {"longitude": lagna * 30 + 1}
+            matrix = aspects.compute_aspects(chart)
+            bad += sum(matrix.houses_aspected(p) != naive_aspects(chart, p) for p in aspects.PLANETS)
+    rng = random.Random(11)
+    for _ in range(5000):
+        chart = random_chart(rng)
+        bad += matrix_report(aspects.compute_aspects(chart), chart) != naive_report(chart)
+    return bad
+
+
+def main():
+    astrology.configure_engine()
+    bad = check()
+    print(f"matrix and house arithmetic disagree on {bad} cases")
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        charts = [prepare(birth)["data"] for birth in CORPUS]
+
+    # What the career, life purpose, spouse and yoga analyzers ask of one chart, four times over
+    slow = timed(lambda chart: [naive_report(chart) for _ in range(4)], charts)
+    fast = timed(lambda chart: [matrix_report(matrix, chart) for matrix in [aspects.compute_aspects(chart)] * 4],
+                 charts)
+    build = timed(aspects.compute_aspects, charts)
+    print("\nper chart")
+    print(f"  compute_aspects                        {build:8.1f} us")
+    print(f"  house arithmetic in each analyzer      {slow:8.1f} us")
+    print(f"  one shared matrix                      {fast:8.1f} us   {slow / fast:.1f}x")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark and accuracy check for the panchang grid.
+
+Accuracy: at every element boundary the engine found for a year, the
+element just before (1 s earlier) and just after (1 s later) must be the
+two consecutive elements, and the angle at the boundary must sit on the
+division within 1e-5 deg. Places whose timezone is far from their
+longitude (Kiritimati, UTC+14 at 157 W; Apia, UTC+13 at 172 W) must get
+each civil date's own sunrise.
+
+Timing, over a grid of places x days:
+  per cell    each day's elements solved from that day's sunrise
+              (Newton from scratch per place and day, no shared table)
+  shared      boundaries() once for the range, then a bisect per cell
+and sunrise with a cold and a warm rise/set cache.
+
+Run from astro-backend/:
+  python benchmarks/bench_panchang.py [--places 20] [--days 90]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astrology
+import panchang
+import riseset
+
+START = datetime.date(2026, 1, 1)
+FAR_OFFSET_PLACES = [{"name": "Kiritimati", "lat": 1.87, "lon": -157.4, "tz_offset": 14},
+                     {"name": "Apia", "lat": -13.83, "lon": -171.76, "tz_offset": 13}]
+
+
+def accuracy(table):
+    bad = 0
+    for element, (names, span) in panchang.ELEMENTS.items():
+        ends, indices = table[element]
+        for end, index in zip(ends, indices):
+            before = int(panchang._angles(end - 1 / 86400)[element][0] // span) % len(names)
+            after = int(panchang._angles(end + 1 / 86400)[element][0] // span) % len(names)
+            angle = panchang._angles(end)[element][0]
+            off = abs((angle - (index + 1) * span + 180) % 360 - 180)
+            bad += before != index or after != (index + 1) % len(names) or off > 1e-5
+    return bad, sum(len(ends) for ends, _ in table.values())
+
+
+def per_cell_rows(place, start, days):
+    """Each cell's elements and their ends found from its own sunrise."""
+    lat, lon, tz_offset = place["lat"], place["lon"], place["tz_offset"]
+    rows = []
+    for offset in range(days):
+        date = start + datetime.timedelta(days=offset)
+        sunrise, _ = panchang.sun_times(date, lat, lon, tz_offset)
+        angles = panchang._angles(sunrise)
+        row = {}
+        for element, (names, span) in panchang.ELEMENTS.items():
+            angle, rate = angles[element]
+            index = int(angle // span)
+            target = (index + 1) * span % 360
+            end = panchang._crossing(element, target, sunrise + ((target - angle) % 360) / rate)
+            row[element] = (names[index], panchang._local(end, tz_offset).isoformat(timespec="minutes"))
+        rows.append(row)
+    return rows
+
+
+def far_offset(table, days):
+    """Rows of FAR_OFFSET_PLACES whose sunrise is not on the row's civil date or disagrees with per-cell solving."""
+    bad = 0
+    for place in FAR_OFFSET_PLACES:
+        rows = panchang.place_rows(place, START, days, table)
+        naive = per_cell_rows(place, START, days)
+        for offset, (row, cell) in enumerate(zip(rows, naive)):
+            date = START + datetime.timedelta(days=offset)
+            sunrise, _ = panchang.sun_times(date, place["lat"], place["lon"], place["tz_offset"])
+            bad += (panchang._local(sunrise, place["tz_offset"]).date() != date or
+                    any(row[e]["name"] != cell[e][0] for e in panchang.ELEMENTS))
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+    astrology.configure_engine()
+
+    table = panchang.boundaries(*panchang.grid_span(START, 366))
+    bad, total = accuracy(table)
+    print(f"accuracy: {total} boundaries in a year, {bad} misplaced")
+    wrong_day = far_offset(table, 366)
+    print(f"far-offset timezones: {wrong_day} of {366 * len(FAR_OFFSET_PLACES)} days off their civil date")
+
+    places = [{"name": f"p{i}", "lat": 8 + 0.37 * i, "lon": 70 + 0.29 * i, "tz_offset": 5.5}
+              for i in range(args.places)]
+    cells = args.places * args.days
+
+    riseset.RISESET.clear()
+    start = time.perf_counter()
+    for place in places:
+        panchang.place_rows(place, START, args.days, table)
+    cold_grid = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = panchang.boundaries(*panchang.grid_span(START, args.days))
+    rows = [panchang.place_rows(place, START, args.days, table) for place in places]
+    shared = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive = [per_cell_rows(place, START, args.days) for place in places]
+    per_cell = time.perf_counter() - start
+
+    same = all(r[e]["name"] == n[e][0] and r[e]["ends"] == n[e][1]
+               for rs, ns in zip(rows, naive) for r, n in zip(rs, ns) for e in panchang.ELEMENTS)
+    print(f"shared table and per-cell solving agree on {cells:,} cells: {same}")
+    print(f"\n{args.places} places x {args.days} days")
+    print(f"  sunrise cache cold              {cold_grid * 1e6 / cells:8.1f} us/cell")
+    print(f"  per cell (warm sunrise)         {per_cell * 1e6 / cells:8.1f} us/cell")
+    print(f"  shared boundaries (warm)        {shared * 1e6 / cells:8.1f} us/cell   {per_cell / shared:.1f}x")
+    return 1 if bad or wrong_day or not same else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Memory per worker and requests/sec: single process vs pre-fork.
+
+Starts the server twice on a free local port with LLM_BACKEND=stub, first as
+a single uvicorn process (what start_production.py runs) and then through
+start_prefork.py, drives the same keep-alive GET load at each and reads
+/proc/<pid>/smaps_rollup for every server process afterwards. PSS is the
+fair share of each process (shared copy-on-write pages are split between
+the processes mapping them), so "total PSS" is the real footprint.
+
+The load generator runs in this process, so on a small machine it competes
+with the server for CPU; compare the modes against each other rather than
+reading the absolute numbers.
+
+Run from astro-backend/:
+  python benchmarks/bench_prefork.py [--workers 4] [--duration 10] [--clients 16]
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from worker_stats import read_memory
+
+DEFAULT_PATH = "/dasa?dob=1978-09-18&tob=17:35&lat=13.0833&lon=80.2833&tz_offset=5.5"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, workers):
+    # Deep endpoint queues: measure throughput, not load shedding
+    env = {"LLM_BACKEND": "stub", "ENDPOINT_QUEUE_FACTOR": "256", **os.environ}
+    if mode == "single":
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning", "--no-access-log"]
+    else:
+        cmd = [sys.executable, "start_prefork.py", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--max-requests", "0", "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/test")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not come up on port {port}")
+
+
+def server_pids(proc):
+    """Master (or the single process) followed by its forked workers."""
+    try:
+        with open(f"/proc/{proc.pid}/task/{proc.pid}/children") as f:
+            children = [int(pid) for pid in f.read().split()]
+    except OSError:
+        children = []
+    return [proc.pid] + children
+
+
+def run_load(port, path, clients, duration):
+    """Keep-alive GETs from `clients` threads for `duration` seconds."""
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        ok = errors = 0
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < stop_at:
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    ok += 1
+                else:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.close()
+        with lock:
+            counts["ok"] += ok
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return counts
+
+
+def measure(mode, args):
+    port = free_port()
+    proc = start_server(mode, port, args.workers)
+    try:
+        run_load(port, args.path, args.clients, 1)  # warm every worker
+        counts = run_load(port, args.path, args.clients, args.duration)
+        memory = [(pid, read_memory(pid)) for pid in server_pids(proc)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+    return counts, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    print(f"{args.clients} keep-alive clients, {args.duration:.0f}s per mode, {os.cpu_count()} CPUs, GET {args.path}\n")
+    print(f"{'mode':<18}{'req/s':>9}{'errors':>8}{'procs':>7}{'RSS/worker':>12}{'PSS/worker':>12}"
+          f"{'private/worker':>16}{'total PSS':>11}")
+    print("-" * 93)
+    for mode in ("single", "prefork"):
+        counts, memory = measure(mode, args)
+        workers = memory[1:] if mode == "prefork" else memory
+        per_worker = lambda key: sum(m.get(key, 0) for _, m in workers) / max(len(workers), 1) / 1024
+        total_pss = sum(m.get("pss_kb", 0) for _, m in memory) / 1024
+        label = mode if mode == "single" else f"prefork x{args.workers}"
+        print(f"{label:<18}{counts['ok'] / args.duration:>9.1f}{counts['errors']:>8}{len(memory):>7}"
+              f"{per_worker('rss_kb'):>10.1f}MB{per_worker('pss_kb'):>10.1f}MB"
+              f"{per_worker('private_dirty_kb'):>14.1f}MB{total_pss:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
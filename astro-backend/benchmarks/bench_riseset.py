@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: sunrise/sunset through the rise/set cache against direct
+swe.rise_trans calls.
+
+The workload is requests for a set of cities on dates drawn from a
+two-month window: most at the city's geocoded coordinates, one in five
+from a user-entered place within about 2 km of it. Timed per request:
+  uncached   two rise_trans searches at the exact place
+  cold       the cache empty at the start of the run
+  warm       the same requests again
+  table      a precomputed table for the cities' cells (RISESET_TABLE),
+             loaded before timing
+Accuracy: the largest sunrise and sunset shift from computing at the cell
+centre instead of the exact place, per geohash precision; exits non-zero
+if it exceeds 10 s at the configured precision.
+
+Run from astro-backend/:
+  python benchmarks/bench_riseset.py [--requests 3000] [--cities 20]
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astrology
+import riseset
+
+START = datetime.date(2026, 1, 1)
+WINDOW = 60
+MAX_SHIFT_SECONDS = 10
+
+
+def workload(n_requests, n_cities, seed=7):
+    rng = random.Random(seed)
+    cities = [{"name": f"c{i}", "lat": rng.uniform(-45, 55), "lon": rng.uniform(-120, 150)}
+              for i in range(n_cities)]
+    requests = []
+    for _ in range(n_requests):
+        city = rng.choice(cities)
+        lat, lon = city["lat"], city["lon"]
+        if rng.random() < 0.2:
+            lat, lon = lat + rng.uniform(-0.02, 0.02), lon + rng.uniform(-0.02, 0.02)
+        requests.append((START + datetime.timedelta(days=rng.randrange(WINDOW)), lat, lon))
+    return cities, requests
+
+
+def timed(fn, requests):
+    start = time.perf_counter()
+    results = [fn(*request) for request in requests]
+    return (time.perf_counter() - start) * 1e6 / len(requests), results
+
+
+def uncached(date, lat, lon):
+    return riseset.compute_sun_times(date.toordinal(), lat, lon)
+
+
+def max_shift(requests, precision):
+    worst = 0.0
+    for date, lat, lon in requests:
+        _, cell_lat, cell_lon = riseset.geohash_cell(lat, lon, precision)
+        exact = riseset.compute_sun_times(date.toordinal(), lat, lon)
+        centre = riseset.compute_sun_times(date.toordinal(), cell_lat, cell_lon)
+        worst = max([worst] + [abs(a - b) * 86400 for a, b in zip(exact, centre) if a and b])
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--cities", type=int, default=20)
+    args = parser.parse_args()
+    astrology.configure_engine()
+    cities, requests = workload(args.requests, args.cities)
+
+    direct, _ = timed(uncached, requests)
+    cache = riseset.RiseSetCache()
+    cold, _ = timed(cache.get, requests)
+    cold_stats = cache.metrics()
+    warm, _ = timed(cache.get, requests)
+
+    # the table is per cell, so build it for the cells users actually fall in
+    cells = {riseset.geohash_cell(lat, lon)[0]: {"lat": lat, "lon": lon} for _, lat, lon in requests}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "riseset_table.json.gz")
+        start = time.perf_counter()
+        with gzip.open(path, "wt") as f:
+            json.dump(riseset.build_table(list(cells.values()), START, WINDOW), f)
+        build = time.perf_counter() - start
+        pinned = riseset.RiseSetCache(max_entries=0, table_path=path)
+        pinned.preload()
+        from_table, table_results = timed(pinned.get, requests)
+        size = os.path.getsize(path)
+    same = table_results == [cache.get(*request) for request in requests]
+
+    print(f"{args.requests:,} requests around {len(cities)} cities over {WINDOW} days, "
+          f"geohash precision {riseset.RISESET_GEOHASH_PRECISION}")
+    print(f"  uncached rise_trans    {direct:8.1f} us/request")
+    print(f"  cache cold             {cold:8.1f} us/request   {direct / cold:6.1f}x   "
+          f"hit rate {cold_stats['hits'] / args.requests:.0%}")
+    print(f"  cache warm             {warm:8.1f} us/request   {direct / warm:6.1f}x")
+    print(f"  precomputed table      {from_table:8.1f} us/request   {direct / from_table:6.1f}x   "
+          f"{len(cells)} cells x {WINDOW} days, {size / 1024:.0f} KiB, built in {build:.1f} s")
+    print(f"table and cache agree: {same}")
+
+    sample = requests[:300]
+    print("\nlargest shift from computing at the cell centre")
+    shifts = {}
+    for precision in (5, 6, 7):
+        shifts[precision] = max_shift(sample, precision)
+        print(f"  precision {precision}   {shifts[precision]:6.1f} s")
+    ok = same and shifts.get(riseset.RISESET_GEOHASH_PRECISION, 0) <= MAX_SHIFT_SECONDS
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
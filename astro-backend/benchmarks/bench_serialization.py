@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Response size and encode time per endpoint.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with the
+FastJSONResponse path in its three shapes: full chart, chart omitted (the
+default) and compact chart rows.
+
+Run from astro-backend/:
+  python benchmarks/bench_serialization.py [--iterations 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "stub")
+
+from fastapi.encoders import jsonable_encoder
+
+from reports import SECTIONS, BirthChart
+from serialization import dumps, orjson, shape_payload
+
+BIRTH = ("1978-09-18", "17:35", 13.08333333, 80.28333333, 5.5)
+
+
+def default_encode(payload):
+    """What a plain `return payload` costs in FastAPI."""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def time_encoder(encode, payload, keep_chart, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = encode(payload, keep_chart)
+    elapsed = time.perf_counter() - start
+    return len(body), elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    variants = [
+        ("default", lambda p, keep: default_encode(p)),
+        ("fast/full", lambda p, keep: dumps(shape_payload(p, include_chart=True))),
+        ("fast/slim", lambda p, keep: dumps(shape_payload(p, keep_chart=keep))),
+        ("fast/compact", lambda p, keep: dumps(shape_payload(p, include_chart=True, compact=True))),
+    ]
+
+    print(f"Encoder: {'orjson' if orjson else 'json (orjson not installed)'}, {args.iterations} iterations\n")
+    print(f"{'Endpoint':<14}" + "".join(f"{name:>22}" for name, _ in variants))
+    print(f"{'':<14}" + "".join(f"{'bytes':>10}{'us/encode':>12}" for _ in variants))
+    print("-" * (14 + 22 * len(variants)))
+
+    for section, compute in SECTIONS.items():
+        payload = compute(BirthChart(*BIRTH))
+        row = f"{'/' + section:<14}"
+        for _, encode in variants:
+            size, micros = time_encoder(encode, payload, section == "chart", args.iterations)
+            row += f"{size:>10}{micros:>12.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
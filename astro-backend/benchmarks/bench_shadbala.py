@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: Shadbala with and without its memoized date/place terms.
+
+compute_shadbala takes sunrise/sunset from the shared rise/set cache and
+memoizes the Sun's ingresses per month. "cold" clears both before every chart, so
+each chart pays for three rise_trans searches and two ingress solutions;
+"warm" is the steady state of a server answering births that share days
+and places (the corpus repeated). Both must give identical results, and
+the minimum strength per planet must match the classical table.
+
+Run from astro-backend/:
+  python benchmarks/bench_shadbala.py
+"""
+
+import contextlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import astrology
+import riseset
+import shadbala
+from bench_suite import CORPUS, prepare
+from bench_vargas import timed
+
+# Minimum Shadbala per planet in virupas (BPHS 27)
+REQUIRED_VIRUPAS = {"Sun": 390, "Moon": 360, "Mars": 300, "Mercury": 420, "Jupiter": 390, "Venus": 330,
+                    "Saturn": 300}
+
+
+def run(p):
+    return shadbala.compute_shadbala(p["jd"], p["birth"][2], p["birth"][3], p["data"], p["cusps"])
+
+
+def cold(p):
+    riseset.RISESET.clear()
+    shadbala._ingress.cache_clear()
+    return run(p)
+
+
+def main():
+    astrology.configure_engine()
+    required = {planet: rupas * 60 for planet, rupas in shadbala.REQUIRED_RUPAS.items()}
+    pinned = required == REQUIRED_VIRUPAS
+    print(f"required strengths match the classical table: {pinned}")
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        prepared = [prepare(birth) for birth in CORPUS]
+    same = all(cold(p) == run(p) for p in prepared)
+    print(f"memoized and fresh results identical over {len(prepared)} births: {same}")
+
+    slow = timed(cold, prepared)
+    fast = timed(run, prepared)
+    print("\ncompute_shadbala per chart")
+    print(f"  cold (sun times and ingresses solved)  {slow:8.1f} us")
+    print(f"  warm (memoized)                        {fast:8.1f} us   {slow / fast:.1f}x")
+    print(f"  rise/set cache: {riseset.metrics()}")
+    return 0 if same and pinned else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: core functions and HTTP endpoints, with regression gating.
+
+Every benchmark cycles through CORPUS, a fixed set of births spanning
+southern to sub-arctic latitudes and four centuries, so one op is the
+average cost over the corpus rather than one lucky chart. Core functions
+are called directly with their inputs prepared outside the timed loop;
+endpoints go through the full ASGI app (middleware, validation, pools,
+serialization) via an in-process httpx client, no sockets involved.
+
+The chart store, shared cache, LLM latency and upstream rate limits are
+switched off so the suite measures computation, not cache hits or quotas. Each benchmark runs --rounds timed
+rounds of at least --min-time seconds; the median ops/sec is compared with
+benchmarks/baseline.json and the run fails when any benchmark is more than
+--threshold (default 25%) slower. Baselines are machine-specific: record
+them on the machine that runs the comparison.
+
+With --memory every benchmark also makes one untimed pass over the corpus
+under tracemalloc, recording the peak and net Python allocations per op;
+a peak more than --threshold above the baseline's fails the run too.
+
+Run from astro-backend/:
+  python benchmarks/bench_suite.py                 compare with the baseline
+  python benchmarks/bench_suite.py --save          record a new baseline
+  python benchmarks/bench_suite.py -k dasa         only benchmarks matching "dasa"
+  python benchmarks/bench_suite.py --memory        also allocations per op
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["LLM_STUB_LATENCY_MS"] = "0"
+os.environ["CHART_STORE"] = "off"
+os.environ["CACHE_BACKEND"] = "off"
+# The stub has no upstream quota; keep the limiter's per-minute buckets out of the numbers
+os.environ["OPENAI_RPM"] = os.environ["OPENAI_TPM"] = str(10**9)
+os.environ.setdefault("ENDPOINT_QUEUE_FACTOR", "256")
+
+import httpx
+
+import allyogas
+import ashtakavarga
+import aspects
+import astrology
+import carear
+import dasa
+import dasa_bhukti
+import indu_dasa
+import life_purpose
+import main
+import shadbala
+import vargas
+from version import ENGINE_VERSION
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# (dob, tob, lat, lon, tz_offset): latitudes -55..64, years 1851..2099
+CORPUS = [
+    ("1851-03-04", "06:15", -54.80, -68.30, -4.0),   # Ushuaia
+    ("1923-07-21", "14:40", -33.87, 151.21, 10.0),   # Sydney
+    ("1947-08-15", "00:05", 0.35, 32.58, 3.0),       # Kampala
+    ("1955-12-01", "23:59", 51.50, -0.12, 0.0),      # London
+    ("1978-09-18", "17:35", 13.08, 80.28, 5.5),      # Chennai
+    ("2001-02-28", "03:10", 28.61, 77.21, 5.5),      # Delhi
+    ("2032-06-30", "12:00", 64.15, -21.94, 0.0),     # Reykjavik
+    ("2099-12-31", "21:30", 40.71, -74.00, -5.0),    # New York
+]
+
+
+# --- CORE FUNCTIONS ---
+def prepare(birth):
+    """Inputs for the core benchmarks, computed once per corpus entry."""
+    dob, tob, lat, lon, tz_offset = birth
+    data, asc_deg, cusps = astrology.get_planet_positions(dob, tob, lat, lon, tz_offset)
+    jd = astrology.get_julian_day(dob, tob, tz_offset)
+    # get_chart_info only looks at the sign of the speed
+    positions = [(info["longitude"], -1.0 if info["retrograde"] else 1.0) for info in data.values()]
+    return {"birth": birth, "jd": jd, "data": data, "asc_deg": asc_deg, "cusps": cusps,
+            "moon": data["Moon"]["longitude"], "positions": positions}
+
+
+CORE = {
+    "get_planet_positions": lambda p: astrology.get_planet_positions(*p["birth"]),
+    # One op is every body of one chart
+    "get_chart_info": lambda p: [astrology.get_chart_info(lon, speed) for lon, speed in p["positions"]],
+    "dasa.generate_dasa_table": lambda p: dasa.generate_dasa_table(p["jd"], p["moon"]),
+    "dasa_bhukti.generate_dasa_table": lambda p: dasa_bhukti.generate_dasa_table(p["jd"], p["moon"]),
+    "indu_dasa.generate_dasa_table": lambda p: indu_dasa.generate_dasa_table(p["jd"], p["moon"]),
+    "detect_yogas": lambda p: allyogas.detect_yogas(p["data"]),
+    "analyze_career": lambda p: carear.analyze_career(p["data"], p["asc_deg"], p["cusps"], "Male"),
+    "analyze_life_purpose": lambda p: life_purpose.analyze_life_purpose(p["data"], p["asc_deg"], p["cusps"]),
+    "get_indu_dasa": lambda p: indu_dasa.get_indu_dasa(*p["birth"]),
+    "compute_vargas": lambda p: vargas.compute_vargas(p["data"]),
+    "compute_ashtakavarga": lambda p: ashtakavarga.compute_ashtakavarga(p["data"]),
+    "compute_aspects": lambda p: aspects.compute_aspects(p["data"]),
+    "compute_shadbala": lambda p: shadbala.compute_shadbala(p["jd"], p["birth"][2], p["birth"][3], p["data"],
+                                                            p["cusps"]),
+}
+
+
+# --- ENDPOINTS ---
+def query(birth):
+    dob, tob, lat, lon, tz_offset = birth
+    return {"dob": dob, "tob": tob, "lat": lat, "lon": lon, "tz_offset": tz_offset}
+
+
+SECTION_PATHS = ("/predict", "/career", "/dasa", "/yogas", "/life_purpose", "/dasa_bhukti", "/spouse", "/indu_dasa")
+BATCH_BODY = json.dumps([query(birth) for birth in CORPUS])
+
+
+def endpoint_benchmarks():
+    benches = {"GET /test": lambda client, birth: client.get("/test")}
+    for path in SECTION_PATHS:
+        benches[f"GET {path}"] = lambda client, birth, path=path: client.get(path, params=query(birth))
+    benches["GET /vargas"] = lambda client, birth: client.get("/vargas", params=query(birth))
+    benches["GET /shadbala"] = lambda client, birth: client.get("/shadbala", params=query(birth))
+    benches["GET /ashtakavarga"] = lambda client, birth: client.get(
+        "/ashtakavarga", params={**query(birth), "transit_start": "2026-01-01"})
+    benches["GET /panchang"] = lambda client, birth: client.get(
+        "/panchang", params={"lat": birth[2], "lon": birth[3], "tz_offset": birth[4], "start": birth[0], "days": 30})
+    benches["GET /report/stream"] = lambda client, birth: client.get("/report/stream", params=query(birth))
+    # One op is the whole corpus in a single request
+    benches["POST /batch/dasa"] = lambda client, birth: client.post(
+        "/batch/dasa", content=BATCH_BODY, headers={"content-type": "application/json"})
+    return benches
+
+
+# --- TIMING ---
+def measure(run_ops, min_time, rounds):
+    """Median and best ops/sec over `rounds` rounds of at least min_time seconds each."""
+    run_ops(len(CORPUS))  # warm-up pass
+    n = len(CORPUS)
+    while True:
+        elapsed = run_ops(n)
+        if elapsed >= min_time / 4:
+            break
+        n *= 4
+    n = max(n, int(n * min_time / elapsed))
+    rates = [n / run_ops(n) for _ in range(rounds)]
+    return statistics.median(rates), max(rates)
+
+
+def measure_memory(run_op):
+    """Mean peak and net Python allocations (bytes) per op, one op per corpus entry."""
+    run_op(0)  # warm-up: first-call caches are not per-op cost
+    peaks, nets = [], []
+    tracemalloc.start()
+    try:
+        for i in range(len(CORPUS)):
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            run_op(i)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - start)
+            nets.append(current - start)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks), statistics.mean(nets)
+
+
+def run_core(name, fn, prepared, min_time, rounds):
+    def run_ops(n):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(prepared[i % len(prepared)])
+        return time.perf_counter() - start
+    return measure(run_ops, min_time, rounds)
+
+
+def run_endpoint(loop, client, name, request, min_time, rounds):
+    async def ops(n):
+        start = time.perf_counter()
+        for i in range(n):
+            response = await request(client, CORPUS[i % len(CORPUS)])
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+        return time.perf_counter() - start
+    return measure(lambda n: loop.run_until_complete(ops(n)), min_time, rounds)
+
+
+def core_memory(fn, prepared):
+    return measure_memory(lambda i: fn(prepared[i]))
+
+
+def endpoint_memory(loop, client, request):
+    return measure_memory(lambda i: loop.run_until_complete(request(client, CORPUS[i])))
+
+
+# --- BASELINE ---
+def load_baseline():
+    try:
+        with open(BASELINE_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results, previous):
+    merged = dict(previous["results"]) if previous else {}
+    merged.update(results)
+    baseline = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+                 "engine_version": ENGINE_VERSION, "recorded_at": time.strftime("%Y-%m-%d")},
+        "results": dict(sorted(merged.items())),
+    }
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCH_THRESHOLD", "0.25")),
+                        help="allowed ops/sec drop vs the baseline (fraction)")
+    parser.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--memory", action="store_true", help="also measure allocations per op (tracemalloc)")
+    args = parser.parse_args()
+
+    astrology.configure_engine()
+    devnull = open(os.devnull, "w")  # the analyzers print debug lines on every call
+    with contextlib.redirect_stdout(devnull):
+        prepared = [prepare(birth) for birth in CORPUS]
+
+    results = {}
+
+    def record(name, rates, memory=None):
+        median, best = rates
+        results[name] = {"ops_per_sec": round(median, 1), "best_ops_per_sec": round(best, 1)}
+        line = f"  {name:<34}{median:>12,.1f} ops/s"
+        if memory is not None:
+            peak, net = memory
+            results[name].update(peak_kb=round(peak / 1024, 1), net_kb=round(net / 1024, 1))
+            line += f"{peak / 1024:>10,.1f} kB peak{net / 1024:>8,.1f} kB net"
+        print(line, file=sys.__stdout__, flush=True)
+
+    print("core functions")
+    for name, fn in CORE.items():
+        if args.filter in name:
+            with contextlib.redirect_stdout(devnull):
+                rates = run_core(name, fn, prepared, args.min_time, args.rounds)
+                memory = core_memory(fn, prepared) if args.memory else None
+            record(name, rates, memory)
+
+    print("endpoints (in-process ASGI)")
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+    for name, request in endpoint_benchmarks().items():
+        if args.filter in name:
+            with contextlib.redirect_stdout(devnull):
+                rates = run_endpoint(loop, client, name, request, args.min_time, args.rounds)
+                memory = endpoint_memory(loop, client, request) if args.memory else None
+            record(name, rates, memory)
+    loop.run_until_complete(client.aclose())
+    loop.close()
+
+    baseline = load_baseline()
+    if args.save:
+        save_baseline(results, baseline)
+        print(f"\nSaved {len(results)} results to {BASELINE_FILE}")
+        return 0
+    if baseline is None:
+        print(f"\nNo baseline at {BASELINE_FILE}; record one with --save")
+        return 0
+
+    print(f"\nvs baseline ({baseline['meta']['recorded_at']}, {baseline['meta']['processor']}, "
+          f"threshold -{args.threshold:.0%})")
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"  {name:<34}{'new':>12}")
+            continue
+        change = result["ops_per_sec"] / reference["ops_per_sec"] - 1
+        regressed = change < -args.threshold
+        line = f"  {name:<34}{change:>+11.1%}{'  REGRESSION' if regressed else ''}"
+        if "peak_kb" in result and reference.get("peak_kb"):
+            growth = result["peak_kb"] / reference["peak_kb"] - 1
+            if growth > args.threshold:
+                regressed = True
+                line += f"  peak {growth:+.1%}  MEMORY REGRESSION"
+            else:
+                line += f"  peak {growth:+.1%}"
+        if regressed:
+            regressions.append(name)
+        print(line)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the table-driven varga engine against the one-by-one rules.
+
+naive_varga() places one body in one division with floating-point
+arithmetic and the textbook rule for that division, the way it would be
+written without the engine. The benchmark first checks that both agree on
+random longitudes and on both sides of every part boundary of every
+division, then times placing every body of a chart in all sixteen
+divisions both ways, over the benchmark corpus. Exits non-zero on any
+disagreement.
+
+Run from astro-backend/:
+  python benchmarks/bench_vargas.py
+"""
+
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import astrology
+import vargas
+from bench_suite import CORPUS
+
+PARTS = {code: n for code, _, n, _ in vargas.DIVISIONS}
+TRIMSAMSA_ODD = [(5, 0), (10, 10), (18, 8), (25, 2), (30, 6)]
+TRIMSAMSA_EVEN = [(5, 1), (12, 5), (20, 11), (25, 9), (30, 7)]
+
+
+def naive_varga(longitude, code):
+    """Sign index of one longitude in one division, straight from the rule."""
+    longitude %= 360
+    sign, degree = int(longitude // 30), longitude % 30
+    odd = sign % 2 == 0
+    quality = sign % 3  # movable, fixed, dual
+    part = int(degree * PARTS[code] / 30)
+    if code == "D1":
+        return sign
+    if code == "D2":
+        return (4 if part == 0 else 3) if odd else (3 if part == 0 else 4)
+    if code == "D3":
+        return (sign + 4 * part) % 12
+    if code == "D4":
+        return (sign + 3 * part) % 12
+    if code == "D7":
+        return (sign + part) % 12 if odd else (sign + 6 + part) % 12
+    if code == "D9":
+        return ([sign, sign + 8, sign + 4][quality] + part) % 12  # movable: itself, fixed: 9th, dual: 5th
+    if code == "D10":
+        return (sign + part) % 12 if odd else (sign + 8 + part) % 12
+    if code in ("D12", "D60"):
+        return (sign + part) % 12
+    if code in ("D16", "D45"):
+        return ([0, 4, 8][quality] + part) % 12
+    if code == "D20":
+        return ([0, 8, 4][quality] + part) % 12
+    if code == "D24":
+        return ((4 if odd else 3) + part) % 12
+    if code == "D27":
+        return ([0, 3, 6, 9][sign % 4] + part) % 12  # fiery, earthy, airy, watery starts
+    if code == "D30":
+        return next(s for last, s in (TRIMSAMSA_ODD if odd else TRIMSAMSA_EVEN) if degree < last)
+    if code == "D40":
+        return ((0 if odd else 6) + part) % 12
+    raise ValueError(code)
+
+
+def naive_vargas(longitudes):
+    return [bytes(naive_varga(lon, code) for code in vargas.CODES) for lon in longitudes]
+
+
+def boundary_longitudes():
+    """Both sides of every part boundary of every division (and the Trimsamsa's whole degrees)."""
+    longitudes = []
+    for code, n in PARTS.items():
+        for k in range(12 * (30 if code == "D30" else n)):
+            edge = k * 30 / (30 if code == "D30" else n)
+            longitudes += [(edge - 1e-7) % 360, edge + 1e-7]
+    return longitudes
+
+
+def timed(fn, charts, rounds=5, min_time=0.3):
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(n):
+            fn(charts[i % len(charts)])
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n *= 2
+    best = elapsed
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(charts[i % len(charts)])
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def main():
+    rng = random.Random(7)
+    samples = [rng.uniform(0, 360) for _ in range(200000)] + boundary_longitudes()
+    fast, slow = vargas.varga_signs(samples), naive_vargas(samples)
+    wrong = [(lon, code) for lon, f, s in zip(samples, fast, slow) for code, a, b in zip(vargas.CODES, f, s) if a != b]
+    print(f"agreement: {len(samples):,} longitudes x {len(vargas.CODES)} divisions, {len(wrong)} differences")
+    for lon, code in wrong[:10]:
+        print(f"  {code} at {lon!r}: engine {vargas.RASIS[vargas.varga_signs([lon])[0][vargas.CODES.index(code)]]}, "
+              f"rule {vargas.RASIS[naive_varga(lon, code)]}")
+
+    astrology.configure_engine()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        charts = [astrology.get_planet_positions(*birth)[0] for birth in CORPUS]
+    longitudes = [[info["longitude"] for info in chart.values()] for chart in charts]
+    engine = timed(vargas.varga_signs, longitudes)
+    naive = timed(naive_vargas, longitudes)
+    full = timed(vargas.compute_vargas, charts)
+    bodies = len(longitudes[0])
+    print(f"\n{bodies} bodies x {len(vargas.CODES)} divisions per chart")
+    print(f"  one by one (float rules)   {naive:8.1f} us/chart")
+    print(f"  varga_signs (tables)       {engine:8.1f} us/chart   {naive / engine:.1f}x")
+    print(f"  compute_vargas (named)     {full:8.1f} us/chart")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared cache, run against both backends.
+
+The Redis backend talks to the in-process RESP stand-in (resp_standin.py),
+so no server is needed. Covers: encoding round-trips and sizes for every
+section payload, hits and misses, engine-version namespacing, expiry,
+in-process and cross-instance stampede protection, lock ownership, LRU
+eviction, distinct births computing in parallel, and degradation when the
+cache server goes away. Exits non-zero on failure.
+
+Run from astro-backend/:
+  python benchmarks/check_cache.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("CHART_STORE", "off")
+
+from cache import Cache, MemoryBackend, RedisBackend, decode, encode
+from reports import SECTIONS, BirthChart
+from resp_standin import RespStandIn
+from serialization import dumps
+
+BIRTH = ("1978-09-18", "17:35", 13.08333333, 80.28333333, 5.5)
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def check_encoding():
+    print("encoding")
+    birth = BirthChart(*BIRTH)
+    birth.use_cache = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        payloads = {name: compute(birth) for name, compute in SECTIONS.items()}
+    for name, payload in payloads.items():
+        blob = encode(payload)
+        check(decode(blob) == payload, f"{name}: {len(blob)} bytes encoded vs {len(dumps(payload))} JSON")
+
+
+def counting(value, delay=0.0):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return compute, calls
+
+
+def check_backend(label, make_backend):
+    print(label)
+    cache = Cache(make_backend(), namespace="astro:test:LAHIRI")
+    compute, calls = counting({"chart": [1.5, 2.5], "n": 3})
+
+    check(cache.get_or_compute("chart", ("a",), compute) == {"chart": [1.5, 2.5], "n": 3}, "miss computes")
+    check(cache.get_or_compute("chart", ("a",), compute) == {"chart": [1.5, 2.5], "n": 3} and len(calls) == 1,
+          "hit skips compute")
+
+    other_engine = Cache(cache.backend, namespace="astro:test-next:LAHIRI")
+    other_engine.get_or_compute("chart", ("a",), compute)
+    check(len(calls) == 2, "a new engine version does not see old entries")
+
+    cache.get_or_compute("dasa", ("short",), compute, ttl=0.05)
+    time.sleep(0.1)
+    cache.get_or_compute("dasa", ("short",), compute, ttl=0.05)
+    check(len(calls) == 4, "entries expire after their TTL")
+
+    compute, calls = counting("slow", delay=0.2)
+    threads = [threading.Thread(target=cache.get_or_compute, args=("chart", ("herd",), compute)) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check(len(calls) == 1, f"16 concurrent misses in one process compute once (waits={cache.stats['chart']['waits']})")
+
+    compute, calls = counting("shared", delay=0.2)
+    instances = [Cache(make_backend(), namespace=cache.namespace) for _ in range(4)]
+    threads = [threading.Thread(target=c.get_or_compute, args=("interpretation", ("prompt",), compute)) for c in instances]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    expected = 1 if isinstance(cache.backend, RedisBackend) else 4
+    check(len(calls) == expected, f"4 instances missing together compute {expected}x")
+
+    backend, lock_key = cache.backend, cache.key("chart", ("owned",)) + ":lock"
+    backend.add(lock_key, b"first", 0.05)
+    time.sleep(0.1)
+    check(backend.add(lock_key, b"second", 30), "an expired lock can be taken again")
+    backend.release(lock_key, b"first")
+    check(backend.get(lock_key) == b"second", "a late holder does not release the new holder's lock")
+    backend.release(lock_key, b"second")
+    check(backend.get(lock_key) is None, "the holder releases its own lock")
+
+    def failing():
+        raise RuntimeError("model error")
+    try:
+        cache.get_or_compute("interpretation", ("bad",), failing)
+    except RuntimeError:
+        pass
+    compute, calls = counting("recovered")
+    cache.get_or_compute("interpretation", ("bad",), compute)
+    check(len(calls) == 1, "failures are not cached")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        cache.get_or_compute("chart", ("a",), compute)
+    print(f"  hit latency: {(time.perf_counter() - start) * 1000:.1f} us")
+
+
+def check_lru():
+    print("memory LRU")
+    backend = MemoryBackend(max_bytes=4096)
+    cache = Cache(backend)
+    for i in range(100):
+        cache.get_or_compute("chart", (i,), lambda: "x" * 200)
+    check(backend.size <= 4096, f"stays within max_bytes ({backend.size} bytes, {len(backend._entries)} entries)")
+
+
+def check_parallel_births():
+    print("distinct births in parallel")
+    slow_profile = BirthChart._stored_profile
+
+    def stored_profile(self, store):
+        time.sleep(0.3)
+        return {"chart": {}, "asc_deg": 0.0, "cusps": [], "dasa_table": [], "yogas": []}
+    BirthChart._stored_profile = stored_profile
+    try:
+        births = [BirthChart(f"2001-01-0{i + 1}", "06:00", 13.0, 80.0) for i in range(4)]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=lambda b=b: b.profile) for b in births]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        BirthChart._stored_profile = slow_profile
+    check(elapsed < 0.6, f"4 births with a 0.3 s profile overlap ({elapsed:.2f} s)")
+
+
+def check_redis_down():
+    print("redis down")
+    server = RespStandIn().start()
+    backend = RedisBackend(server.url, timeout=0.1)
+    cache = Cache(backend)
+    cache.get_or_compute("chart", ("x",), lambda: 1)
+    server.stop()
+    compute, calls = counting("fallback")
+    start = time.perf_counter()
+    check(cache.get_or_compute("chart", ("y",), compute) == "fallback", "miss still computes")
+    check(cache.get_or_compute("chart", ("y",), compute) == "fallback" and len(calls) == 2,
+          f"no errors raised, backend marked down ({(time.perf_counter() - start) * 1000:.0f} ms for both calls)")
+
+
+def main():
+    check_encoding()
+    check_backend("memory backend", MemoryBackend)
+    server = RespStandIn().start()
+    try:
+        check_backend("redis backend (stand-in)", lambda: RedisBackend(server.url))
+    finally:
+        server.stop()
+    check_lru()
+    check_parallel_births()
+    check_redis_down()
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
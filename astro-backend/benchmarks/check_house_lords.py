@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Checks for the per-lagna house-lord tables and the yogas that read them.
+
+Every entry of HOUSE_SIGN, HOUSE_LORD and LORD_HOUSES, and every helper
+called with a sign name and with an index, is compared with lordship
+worked out directly from the sign order and the classical sign lords.
+Panch Mahapurusha is checked for Venus in Thula, once missed through a
+misspelt sign name. Exits non-zero on failure.
+
+Run from astro-backend/:
+  python benchmarks/check_house_lords.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import allyogas
+import astrology
+import house_lords
+from bench_suite import CORPUS
+
+LORDS = {"Mesha": "Mars", "Rishaba": "Venus", "Mithuna": "Mercury", "Kataka": "Moon", "Simha": "Sun",
+         "Kanni": "Mercury", "Thula": "Venus", "Vrischika": "Mars", "Dhanus": "Jupiter", "Makara": "Saturn",
+         "Kumbha": "Saturn", "Meena": "Jupiter"}
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def check_tables():
+    print("house-lord tables")
+    rasis = house_lords.RASIS
+    bad = 0
+    for lagna, lagna_name in enumerate(rasis):
+        signs = [rasis[(lagna + house) % 12] for house in range(12)]
+        for house, sign in enumerate(signs, 1):
+            bad += house_lords.HOUSE_SIGN[lagna][house - 1] != rasis.index(sign)
+            bad += house_lords.PLANETS[house_lords.HOUSE_LORD[lagna][house - 1]] != LORDS[sign]
+            for key in (lagna, lagna_name):
+                bad += house_lords.house_sign(key, house) != sign
+                bad += house_lords.house_lord(key, house) != LORDS[sign]
+        for planet in house_lords.PLANETS:
+            ruled = tuple(house for house, sign in enumerate(signs, 1) if LORDS[sign] == planet)
+            bad += house_lords.LORD_HOUSES[lagna][house_lords.PLANET_INDEX[planet]] != ruled
+            bad += any(house_lords.lord_houses(key, planet) != ruled for key in (lagna, lagna_name))
+    bad += any(house_lords.sign_lord(sign) != lord or house_lords.sign_lord(rasis.index(sign)) != lord
+               for sign, lord in LORDS.items())
+    check(bad == 0, f"every lagna, house and planet matches the sign order ({bad} mismatches)")
+    check(all(house_lords.lord_houses("Mesha", planet) == () for planet in ("Rahu", "Ketu", "Uranus")),
+          "Rahu, Ketu and the outer planets rule no houses")
+
+
+def check_malavya():
+    print("Panch Mahapurusha")
+    with contextlib.redirect_stdout(io.StringIO()):
+        chart = astrology.get_planet_positions(*CORPUS[0])[0]
+    # Thula is the 7th sign, which the yoga counts as a kendra
+    data = {**chart, "Venus": astrology.get_chart_info(house_lords.RASI_INDEX["Thula"] * 30 + 15.0, 1.0)}
+    with contextlib.redirect_stdout(io.StringIO()):
+        yogas = allyogas.detect_yogas(data)
+    check("Venus forms Panch Mahapurusha Yoga" in yogas, "Venus in Thula forms Malavya")
+
+
+def main():
+    astrology.configure_engine()
+    check_tables()
+    check_malavya()
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+End-to-end checks for the report job API through an in-process client.
+
+Uses the stub LLM with added latency so jobs stay pending long enough to
+observe: submit/poll/fetch, deduplication of identical submissions,
+cancellation (queued and running), discard of finished jobs, result expiry
+and request validation. Job state goes to a temporary database. Exits
+non-zero on failure.
+
+Run from astro-backend/:
+  python benchmarks/check_jobs.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "stub"
+os.environ.setdefault("LLM_STUB_LATENCY_MS", "400")
+os.environ["JOB_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+os.environ["JOB_WORKERS"] = "1"
+os.environ.setdefault("CHART_STORE", "off")
+os.environ.setdefault("CACHE_BACKEND", "off")
+
+from fastapi.testclient import TestClient
+
+import jobs
+import main
+
+client = TestClient(main.app)
+BIRTHS = [
+    {"dob": "1978-09-18", "tob": "17:35", "lat": 13.0833, "lon": 80.2833, "tz_offset": 5.5},
+    {"dob": "2001-02-28", "tob": "03:10", "lat": 28.6, "lon": 77.2, "tz_offset": 5.5, "gender": "female"},
+    {"dob": "1955-12-01", "tob": "23:59", "lat": 51.5, "lon": -0.12, "tz_offset": 0.0},
+]
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def wait(job, statuses=("done", "failed", "cancelled"), timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job}").json()
+        if status["status"] in statuses:
+            return status
+        time.sleep(0.05)
+    return status
+
+
+def main_checks():
+    print("submit, poll, fetch")
+    r = client.post("/jobs", json=BIRTHS[0])
+    job = r.json()["id"]
+    check(r.status_code == 202 and r.headers["location"] == f"/jobs/{job}", "POST /jobs -> 202 with Location")
+    seen = set()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job}").json()
+        seen.add((status["status"], status["progress"]["current"]))
+        if status["status"] == "done":
+            break
+        time.sleep(0.02)
+    check(status["status"] == "done" and status["progress"]["completed"] == status["progress"]["total"],
+          f"finished with progress {status['progress']['completed']}/{status['progress']['total']}")
+    check(("running", "predict") in seen, "progress reports the running section")
+    r = client.get(f"/jobs/{job}/result")
+    result = r.json()
+    check(r.status_code == 200 and set(result["sections"]) == set(status["sections"]) and not result["errors"],
+          f"result has all {len(result['sections'])} sections and the chart")
+
+    print("deduplication")
+    r = client.post("/jobs", json=BIRTHS[0])
+    check(r.status_code == 200 and r.json()["id"] == job and r.json()["deduplicated"], "finished job is reused")
+    first = client.post("/jobs", json={**BIRTHS[1], "sections": ["predict", "dasa"]})
+    second = client.post("/jobs", json={**BIRTHS[1], "sections": "predict,dasa"})
+    check(first.status_code == 202 and second.status_code == 200 and first.json()["id"] == second.json()["id"],
+          "identical pending submissions share one job")
+    other = client.post("/jobs", json={**BIRTHS[1], "sections": ["predict", "dasa"], "gender": "male"})
+    check(other.json()["id"] != first.json()["id"], "a different gender is a different job")
+
+    print("cancellation")
+    # One worker: `first` is running, `other` and the next one are queued behind it
+    queued = client.post("/jobs", json={**BIRTHS[2], "sections": ["yogas"]}).json()["id"]
+    r = client.delete(f"/jobs/{queued}")
+    check(r.status_code == 200 and r.json()["status"] == "cancelled", "queued job is cancelled immediately")
+    check(client.get(f"/jobs/{queued}/result").status_code == 409, "its result is 409")
+    running = wait(first.json()["id"], ("running",))["id"]
+    r = client.delete(f"/jobs/{running}")
+    check(r.status_code == 200 and r.json()["cancel_requested"], "running job acknowledges the cancel")
+    check(wait(running)["status"] == "cancelled", "and stops at the next section boundary")
+    r = client.post("/jobs", json={**BIRTHS[1], "sections": ["predict", "dasa"]})
+    check(r.status_code == 202 and not r.json()["deduplicated"], "a cancelled job can be resubmitted")
+    client.delete(f"/jobs/{r.json()['id']}")
+    wait(other.json()["id"])
+
+    print("discard and expiry")
+    check(client.delete(f"/jobs/{job}").status_code == 204, "DELETE on a finished job discards it")
+    check(client.get(f"/jobs/{job}").status_code == 404, "discarded job is gone")
+    jobs.JOB_RESULT_TTL = 0.2
+    short = client.post("/jobs", json={**BIRTHS[2], "sections": ["dasa"]}).json()["id"]
+    wait(short)
+    time.sleep(0.3)
+    check(client.get(f"/jobs/{short}/result").status_code == 404, "results expire after JOB_RESULT_TTL")
+
+    print("validation")
+    check(client.post("/jobs", json={"dob": "1978-09-18"}).status_code == 400, "missing fields -> 400")
+    check(client.post("/jobs", json={**BIRTHS[0], "sections": ["horoscope"]}).status_code == 400,
+          "unknown section -> 400")
+    check(client.post("/jobs", content=b"not json").status_code == 400, "non-JSON body -> 400")
+    check(client.get("/jobs/unknown").status_code == 404, "unknown job -> 404")
+
+    print(f"  metrics: {client.get('/metrics').json()['jobs']}")
+
+
+if __name__ == "__main__":
+    main_checks()
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Checks for the LLM admission limiter's token accounting.
+
+A stand-in client answers 429 a given number of times and then succeeds,
+reporting exactly the estimated usage. However many 429s precede the
+success, the tokens-per-minute bucket must end up charged for one
+estimate: a rejected attempt is refunded before its retry acquires again.
+A call that fails outright (timeout, 5xx, connection error) is charged
+nothing, and every retry is counted. Backoff is shortened so the bucket
+barely refills meanwhile. Exits non-zero on failure.
+
+Run from astro-backend/:
+  python benchmarks/check_llm_limiter.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_limiter
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]
+MAX_TOKENS = 100
+TPM = 600  # refills 10 tokens a second
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class StandInClient:
+    """client.chat.completions.create that fails with 429 `rejections` times, then succeeds."""
+
+    def __init__(self, rejections, usage, error=RateLimited):
+        self.rejections = rejections
+        self.error = error
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.usage = usage
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.rejections:
+            raise self.error("upstream error")
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=self.usage))
+
+
+def spent(rejections, error=RateLimited):
+    """Tokens taken from a fresh bucket by one completion after `rejections` failures."""
+    est = llm_limiter.estimate_tokens(MESSAGES, MAX_TOKENS)
+    llm_limiter.limiter = llm_limiter.LLMRateLimiter(500, TPM, 4, 5)
+    client = StandInClient(rejections, est, error)
+    try:
+        llm_limiter.create_chat_completion(client, messages=MESSAGES, max_tokens=MAX_TOKENS)
+    except (llm_limiter.LLMOverloaded, ServerError):
+        pass  # the bucket ran dry, or the failure is passed on: the tokens spent are checked below
+    return TPM - llm_limiter.limiter.tokens.tokens, est, client.calls
+
+
+def main():
+    llm_limiter.LLM_BACKOFF_BASE = 0.001
+    saved = llm_limiter.limiter
+    print("429 retries")
+    try:
+        for rejections in (0, 1, 3):
+            tokens, est, calls = spent(rejections)
+            check(calls == rejections + 1 and abs(tokens - est) < 2,
+                  f"{rejections} x 429 then success spends {tokens:.0f} tokens (one estimate: {est})")
+        retried = llm_limiter.limiter.stats["retried"]
+        check(retried == 3, f"3 retries counted ({retried})")
+        print("other failures")
+        tokens, _, calls = spent(1, ServerError)
+        check(calls == 1 and abs(tokens) < 2, f"a 503 is passed on without retrying and spends {tokens:.0f} tokens")
+    finally:
+        llm_limiter.limiter = saved
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Allocation budgets for the hot paths, measured with tracemalloc.
+
+Each check keeps the results of the function over the benchmark corpus
+alive and divides what stayed allocated by the number of items produced
+(one chart_info dict, one chart body, one dasa period, one yoga), so a
+change that makes every item heavier fails regardless of how many items a
+chart has. The transient peak of one call is budgeted as well. Budgets
+carry about 25% headroom over CPython 3.11; raise one deliberately, in the
+commit that needs it. Exits non-zero when a budget is exceeded.
+
+Run from astro-backend/:
+  python benchmarks/check_memory.py
+"""
+
+import contextlib
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import allyogas
+import astrology
+import dasa
+import dasa_bhukti
+import indu_dasa
+from bench_suite import CORPUS, prepare
+from vargas import compute_vargas
+
+# name -> (function of a prepared birth, items in its result, bytes retained per item, peak bytes per call)
+BUDGETS = {
+    "get_chart_info dict": (lambda p: astrology.get_chart_info(p["moon"] + 0.0, 1.0), lambda r: 1, 256, 320),
+    "get_planet_positions body": (lambda p: astrology.get_planet_positions(*p["birth"])[0], len, 360, 6 * 1024),
+    "dasa.generate_dasa_table period": (lambda p: dasa.generate_dasa_table(p["jd"], p["moon"])[2], len, 576, 12 * 1024),
+    "dasa_bhukti.generate_dasa_table period": (lambda p: dasa_bhukti.generate_dasa_table(p["jd"], p["moon"]), len,
+                                               576, 12 * 1024),
+    # as BirthChart calls it, with the chart's vargas
+    "detect_yogas yoga": (lambda p: allyogas.detect_yogas(p["data"], p["vargas"]), len, 64, 9 * 1024),
+    "get_indu_dasa timeline entry": (lambda p: indu_dasa.get_indu_dasa(*p["birth"])["timeline"], len, 400, 20 * 1024),
+}
+REPEAT = 25  # corpus passes whose results are kept
+
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def measure(fn, items, prepared):
+    """(bytes retained per item, peak bytes of a single call)."""
+    fn(prepared[0])  # first-call caches are not per-item cost
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        kept = [fn(p) for p in prepared * REPEAT]
+        retained = tracemalloc.get_traced_memory()[0] - start - sys.getsizeof(kept)
+        per_item = retained / sum(items(r) for r in kept)
+        del kept
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        fn(prepared[len(prepared) // 2])
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return per_item, peak
+
+
+def main_checks():
+    astrology.configure_engine()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):  # the analyzers print debug lines
+        prepared = [prepare(birth) for birth in CORPUS]
+    for p in prepared:
+        p["vargas"] = compute_vargas(p["data"])
+    for name, (fn, items, item_budget, peak_budget) in BUDGETS.items():
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            per_item, peak = measure(fn, items, prepared)
+        print(name)
+        check(per_item <= item_budget, f"{per_item:.0f} B retained per item (budget {item_budget})")
+        check(peak <= peak_budget, f"{peak} B peak per call (budget {peak_budget})")
+
+
+if __name__ == "__main__":
+    main_checks()
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
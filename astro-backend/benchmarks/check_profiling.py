@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Checks for on-demand request profiling through an in-process client.
+
+Covers: the admin-token guard, both profiler modes producing collapsed
+stacks with the annotated stages, the profile download formats, ring-buffer
+eviction, and that every wrapper and hook is removed again once no profile
+is running (no overhead for ordinary requests). Caches are off so profiled
+requests really compute. Exits non-zero on failure.
+
+Run from astro-backend/:
+  python benchmarks/check_profiling.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["PROFILE_ADMIN_TOKENS"] = "check-token"
+os.environ["PROFILE_RING_SIZE"] = "3"
+os.environ["PROFILE_SAMPLE_INTERVAL_MS"] = "0.25"  # the profiled request takes a few ms
+os.environ["CHART_STORE"] = "off"
+os.environ["CACHE_BACKEND"] = "off"
+
+from fastapi.testclient import TestClient
+
+import compute_pool
+import main
+import pyswisseph
+import serialization
+
+client = TestClient(main.app)
+ADMIN = {"X-Admin-Token": "check-token"}
+QUERY = "dob=1978-09-18&tob=17:35&lat=13.0833&lon=80.2833&tz_offset=5.5"
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def originals():
+    return (pyswisseph.calc_ut, serialization.dumps, compute_pool.ComputePool._run, sys.getswitchinterval())
+
+
+def main_checks():
+    before = originals()
+
+    print("guard")
+    check(client.get(f"/career?{QUERY}", headers={"X-Profile": "sample"}).status_code == 403, "no token -> 403")
+    check(client.get(f"/career?{QUERY}", headers={"X-Profile": "sample", "X-Admin-Token": "nope"}).status_code == 403,
+          "wrong token -> 403")
+    check(client.get("/admin/profiles").status_code == 403, "profile list needs the token")
+    check("x-profile-id" not in client.get(f"/career?{QUERY}").headers, "requests without the flag are not profiled")
+
+    for mode in ("trace", "sample"):
+        print(f"{mode} mode")
+        # The request computes for about a millisecond, so a sampler can miss it; allow a few attempts
+        for _ in range(5 if mode == "sample" else 1):
+            r = client.get(f"/indu_dasa?{QUERY}", headers={"X-Profile": mode, **ADMIN})
+            profile_id = r.headers.get("x-profile-id")
+            data = client.get(f"/admin/profiles/{profile_id}?format=json", headers=ADMIN).json()
+            if data["samples"] or mode == "trace":
+                break
+        check(r.status_code == 200 and profile_id, f"profiled request answered with X-Profile-Id {profile_id}")
+        check({"swe.calc_ut", "swe.houses_ex", "indu_dasa.get_indu_dasa", "serialization"} <= set(data["stages"]),
+              f"stages timed: {', '.join(data['stages'])}")
+        folded = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).text
+        lines = folded.splitlines()
+        check(lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines),
+              f"collapsed stacks: {len(lines)} stacks, {data['samples'] or sum(int(l.rsplit(' ', 1)[1]) for l in lines)}"
+              f" {data['weight']}")
+        if mode == "trace":
+            check(any("[swe.calc_ut]" in line for line in lines), "Swiss Ephemeris calls appear as [swe.calc_ut] frames")
+        else:
+            check(data["samples"] > 0, "sampler collected samples")
+
+    print("query flag and ring buffer")
+    r = client.get(f"/dasa?{QUERY}&profile=1", headers=ADMIN)
+    check(r.headers.get("x-profile-id") is not None, "?profile=1 works like X-Profile: sample")
+    for _ in range(3):
+        client.get(f"/yogas?{QUERY}", headers={"X-Profile": "sample", **ADMIN})
+    listed = client.get("/admin/profiles", headers=ADMIN).json()["profiles"]
+    check(len(listed) == 3 and listed[0]["target"].startswith("/yogas"), "ring buffer keeps the newest 3")
+    check(client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).status_code == 404, "evicted profile -> 404")
+
+    print("no residue")
+    check(originals() == before, "wrappers, pool hook and switch interval restored")
+    start = time.perf_counter()
+    for _ in range(200):
+        client.get(f"/dasa?{QUERY}")
+    print(f"  unprofiled /dasa after profiling: {(time.perf_counter() - start) / 200 * 1000:.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main_checks()
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the API process.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (with the
+openai backend selected, as in production) and fails when:
+  - the cumulative import time of `main` exceeds the budget, or
+  - a module that must stay deferred is imported (the openai SDK, network
+    clients); those belong to first use or the explicit warm-up. dotenv is
+    not one: main.py loads .env before any module reads its settings.
+
+The app must also start, warm-up included, with the openai backend and no
+OPENAI_API_KEY: only the interpretation endpoints need the key. The
+slowest imports are listed either way. Exit status is non-zero on
+failure, so this can gate CI or a pre-deploy step.
+
+Run from astro-backend/:
+  python benchmarks/check_startup.py [--budget-ms 900] [--runs 3] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "900"))
+DEFERRED_MODULES = ("openai", "httpx", "urllib.request")
+
+
+def import_profile():
+    """{module: (self_us, cumulative_us)} for one cold `import main`."""
+    env = {**os.environ, "LLM_BACKEND": "openai", "STARTUP_WARMUP": "0"}
+    env.setdefault("OPENAI_API_KEY", "sk-startup-check")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def start_without_key():
+    """Error text, or None when the app starts (with warm-up) and answers /test without OPENAI_API_KEY."""
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env.update({"LLM_BACKEND": "openai", "STARTUP_WARMUP": "1", "CHART_STORE": "off"})
+    code = ("from fastapi.testclient import TestClient\nimport main\n"
+            "with TestClient(main.app) as client:\n    assert client.get('/test').status_code == 200\n")
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    return None if result.returncode == 0 else result.stderr.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N cold imports")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    profile = min(profiles, key=lambda p: p["main"][1])
+    total_ms = profile["main"][1] / 1000
+
+    print(f"Slowest imports (best of {args.runs}, cumulative ms):")
+    ranked = sorted(profile.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f}  {self_us / 1000:>7.1f} self  {name}")
+
+    failures = []
+    eager = [m for m in DEFERRED_MODULES if m in profile]
+    if eager:
+        failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    error = start_without_key()
+    if error:
+        failures.append(f"app does not start without OPENAI_API_KEY: {error}")
+
+    print(f"\nimport main: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Golden-master accuracy harness for the calculation paths.
+
+`record` generates a deterministic corpus of births and stores the outputs
+of the reference path (direct swe.calc_ut / swe.houses_ex calls, the chart
+dict, generate_dasa_table, detect_yogas, get_indu_dasa, the vargas, the
+ashtakavarga, the shadbala and the aspects) in benchmarks/golden.json.gz. `check`
+recomputes the corpus through every registered path and diffs it against
+the recording:
+
+  reference  the same direct calls again (catches engine or ephemeris drift)
+  store      BirthChart profiles saved to and loaded back from a chart store
+  cache      profiles through the shared cache's encode/decode round-trip
+  compact    charts decoded from compact=true rows (whole arc-seconds)
+  http       /batch/chart, /batch/dasa and /batch/yogas through the ASGI app
+
+A new fast path (a cache, an interpolation table, a vectorized variant)
+registers itself in PATHS with the outputs it produces; it only has to
+agree with the recording before its mode is switched on.
+
+The corpus mixes random births (years 1801-2398, latitudes -80..80, real
+time-zone offsets) with edge cases: births one minute either side of the
+Moon, Sun and Ascendant crossing sign, nakshatra and pada boundaries, the
+0 deg Mesha wrap, leap days, midnight, year ends shifted across the date
+line by the time zone, the poles of the house system and the antimeridian.
+
+Longitudes, cusps and speeds are compared within arc-second tolerances
+(--position-tol, --speed-tol; a path may declare its own resolution as the
+default); dasa dates and ages get the slack that Moon tolerance implies.
+Everything else (rasi, nakshatra, pada, lords, yogas, dates) must match
+exactly. Exits non-zero on any mismatch.
+
+The recording is a local baseline, not a committed fixture: it is about
+5 MB, and positions depend on the Swiss Ephemeris version and ephemeris
+files of the machine, so golden.json.gz is gitignored. Record on the
+commit you trust (the parent of the change under review), then check on
+the change. After an intentional output change, bump ENGINE_VERSION,
+confirm the differences are the intended ones, and re-record.
+
+Run from astro-backend/:
+  python benchmarks/golden.py record [--size 2000] [--seed 1]
+  python benchmarks/golden.py check [--paths store,http] [--position-tol 0.5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["CHART_STORE"] = "off"
+os.environ["CACHE_BACKEND"] = "off"
+os.environ.setdefault("ENDPOINT_QUEUE_FACTOR", "256")
+
+import pyswisseph as swe
+
+import allyogas
+import astrology
+import cache
+import dasa
+import dasa_bhukti
+import indu_dasa
+from ashtakavarga import compute_ashtakavarga
+from aspects import compute_aspects
+from chart_store import ChartStore
+from ephe_loader import EPHE_PATH
+from reports import BirthChart
+from serialization import BODY_NAMES, compact_chart, loads
+from shadbala import compute_shadbala
+from vargas import compute_vargas
+from version import ENGINE_VERSION
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden.json.gz")
+
+FLAGS = swe.FLG_SIDEREAL | swe.FLG_SPEED
+BODIES = [(pid, None) for pid in range(10)] + [(swe.TRUE_NODE, "Rahu")]
+
+SIGN = 30.0
+NAKSHATRA = 360 / 27
+PADA = NAKSHATRA / 4
+# Largest Vimshottari period: how far a Moon error can move the dasa dates
+MAX_DASA_YEARS = 20
+
+TZ_OFFSETS = [-12, -10, -9.5, -8, -7, -6, -5, -4, -3.5, -3, -2, -1, 0, 1, 2, 3, 3.5, 4, 4.5,
+              5, 5.5, 5.75, 6, 6.5, 7, 8, 8.75, 9, 9.5, 10, 10.5, 11, 12, 12.75, 13, 14]
+
+
+# --- CORPUS ---
+def local_birth(jd_ut, lat, lon, tz_offset):
+    """(dob, tob, lat, lon, tz_offset) for the local minute nearest jd_ut."""
+    year, month, day, hours = swe.revjul(jd_ut + tz_offset / 24)
+    moment = datetime.datetime(year, month, day) + datetime.timedelta(minutes=round(hours * 60))
+    return (moment.strftime("%Y-%m-%d"), moment.strftime("%H:%M"), lat, lon, tz_offset)
+
+
+def body_longitude(jd, body, lat, lon):
+    if body == "Ascendant":
+        return swe.houses_ex(jd, lat, lon, b'O', flags=FLAGS)[1][0]
+    return swe.calc_ut(jd, body, FLAGS)[0][0]
+
+
+def crossing(jd, body, boundary, lat, lon):
+    """Moment near jd when body's longitude reaches boundary (secant steps)."""
+    step = 1 / 1440
+    for _ in range(8):
+        here = body_longitude(jd, body, lat, lon)
+        rate = ((body_longitude(jd + step, body, lat, lon) - here + 180) % 360 - 180) / step
+        delta = (boundary - here + 180) % 360 - 180
+        jd += delta / rate
+        if abs(delta) < 1e-7:
+            break
+    return jd
+
+
+def boundary_births(rng, body, spacing, exclude, count, tag):
+    """Births one local minute either side of `body` crossing a boundary every `spacing` degrees."""
+    births = []
+    while len(births) < 2 * count:
+        lat, lon = round(rng.uniform(-60, 60), 4), round(rng.uniform(-180, 180), 4)
+        tz_offset = rng.choice(TZ_OFFSETS)
+        jd = swe.julday(rng.randint(1801, 2398), rng.randint(1, 12), rng.randint(1, 28), rng.uniform(0, 24))
+        here = body_longitude(jd, body, lat, lon)
+        # Boundaries of this kind that are not also a coarser kind (pada but not nakshatra, ...)
+        candidates = [k * spacing % 360 for k in range(round(360 / spacing))
+                      if exclude is None or abs((k * spacing / exclude) - round(k * spacing / exclude)) > 1e-9]
+        boundary = min(candidates, key=lambda b: (b - here) % 360)
+        moment = crossing(jd, body, boundary, lat, lon)
+        for side in (-0.5, 0.5):
+            births.append((local_birth(moment + side / 1440, lat, lon, tz_offset), [tag]))
+    return births
+
+
+def calendar_births():
+    """Fixed edge cases: leap days, midnight, date line and year ends, house-system extremes."""
+    return [
+        (("2000-02-29", "12:00", 13.0833, 80.2833, 5.5), ["leap-day"]),
+        (("1904-02-29", "00:00", 51.5, -0.12, 0), ["leap-day", "midnight"]),
+        (("2096-02-29", "23:59", -33.87, 151.21, 10), ["leap-day"]),
+        (("2000-01-01", "00:00", -13.83, -171.76, 14), ["year-end", "tz-max"]),
+        (("1999-12-31", "23:59", -14.27, -170.7, -11), ["year-end"]),
+        (("1800-12-31", "23:30", 40.71, -74.0, -12), ["year-end", "tz-min", "early"]),
+        (("2399-06-30", "12:00", 28.61, 77.21, 5.5), ["late"]),
+        (("1978-09-18", "00:00", 0.0, 0.0, 0), ["midnight", "origin"]),
+        (("1985-06-21", "12:00", 80.0, 15.0, 1), ["high-latitude"]),
+        (("1985-12-21", "12:00", -80.0, -60.0, -3), ["high-latitude"]),
+        (("1961-03-20", "06:00", 66.56, 25.72, 2), ["arctic-circle"]),
+        (("2024-07-01", "18:45", -16.5, 180.0, 12), ["antimeridian"]),
+        (("2024-07-01", "18:45", -16.5, -180.0, -12), ["antimeridian"]),
+        (("1947-08-15", "00:05", 28.61, 77.21, 5.5), ["midnight"]),
+    ]
+
+
+def generate_corpus(size, seed):
+    """Deterministic list of (birth, tags) for a size and seed."""
+    astrology.configure_engine()
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        jd = swe.julday(rng.randint(1801, 2398), rng.randint(1, 12), rng.randint(1, 28), rng.uniform(0, 24))
+        lat = round(rng.uniform(-66, 66) if rng.random() < 0.95 else rng.uniform(-80, 80), 4)
+        corpus.append((local_birth(jd, lat, round(rng.uniform(-180, 180), 4), rng.choice(TZ_OFFSETS)), ["random"]))
+    per_kind = max(4, size // 50)
+    corpus += boundary_births(rng, swe.MOON, SIGN, None, per_kind, "moon-sign")
+    corpus += boundary_births(rng, swe.MOON, NAKSHATRA, SIGN, per_kind, "moon-nakshatra")
+    corpus += boundary_births(rng, swe.MOON, PADA, NAKSHATRA, per_kind, "moon-pada")
+    corpus += boundary_births(rng, swe.MOON, 360, None, per_kind, "moon-mesha-0")
+    corpus += boundary_births(rng, swe.SUN, SIGN, None, per_kind, "sun-sign")
+    corpus += boundary_births(rng, "Ascendant", SIGN, None, per_kind, "ascendant-sign")
+    corpus += boundary_births(rng, "Ascendant", PADA, SIGN, per_kind, "ascendant-pada")
+    corpus += calendar_births()
+    return corpus
+
+
+# --- PATHS ---
+def reference_outputs(birth):
+    """Outputs of the reference calls for one birth (the shape every path is diffed in)."""
+    dob, tob, lat, lon, tz_offset = birth
+    astrology.configure_engine()
+    jd = astrology.get_julian_day(dob, tob, tz_offset)
+    bodies = {}
+    for pid, name in BODIES:
+        position = swe.calc_ut(jd, pid, FLAGS)[0]
+        bodies[name or swe.get_planet_name(pid)] = {"longitude": position[0], "speed": position[3]}
+    cusps, ascmc = swe.houses_ex(jd, lat, lon, b'O', flags=FLAGS)
+    chart, _, _ = astrology.get_planet_positions(dob, tob, lat, lon, tz_offset)
+    moon = chart["Moon"]["longitude"]
+    nakshatra, pada, table = dasa.generate_dasa_table(jd, moon)
+    return {
+        "swe": {"bodies": bodies, "cusps": list(cusps), "ascendant": ascmc[0], "mc": ascmc[1]},
+        "chart": chart,
+        "dasa_start": {"nakshatra": nakshatra, "pada": pada},
+        "dasa_table": table,
+        "dasa_bhukti_table": dasa_bhukti.generate_dasa_table(jd, moon),
+        "yogas": allyogas.detect_yogas(chart),
+        "indu_dasa": indu_dasa.get_indu_dasa(dob, tob, lat, lon, tz_offset),
+        "vargas": compute_vargas(chart),
+        "ashtakavarga": compute_ashtakavarga(chart),
+        "shadbala": compute_shadbala(jd, lat, lon, chart, list(cusps)),
+        "aspects": compute_aspects(chart).to_dict(),
+    }
+
+
+def run_reference(births):
+    return [reference_outputs(birth) for birth in births]
+
+
+def profile_outputs(profile):
+    return {"chart": profile["chart"], "dasa_table": profile["dasa_table"], "yogas": profile["yogas"]}
+
+
+def run_store(births):
+    """Save each profile to a scratch chart store, then read it back with a fresh BirthChart."""
+    with tempfile.TemporaryDirectory() as scratch:
+        store = ChartStore(os.path.join(scratch, "golden.sqlite3"))
+        outputs = []
+        for birth in births:
+            for _ in range(2):  # computed and saved, then loaded
+                chart = BirthChart(*birth)
+                chart.store, chart.use_cache = store, False
+                profile = chart.profile
+            outputs.append(profile_outputs(profile))
+        if store.hits != len(births):
+            raise RuntimeError(f"chart store served {store.hits} of {len(births)} profiles")
+        return outputs
+
+
+def run_cache(births):
+    """Compute each profile, then serve it as a cache hit (encode/decode round-trip)."""
+    shared = cache.Cache(cache.MemoryBackend(1 << 30), namespace="golden")
+    outputs = []
+    for birth in births:
+        chart = BirthChart(*birth)
+        compute = lambda: chart._stored_profile(None)
+        shared.get_or_compute("chart", (chart.key,), compute)
+        outputs.append(profile_outputs(shared.get_or_compute("chart", (chart.key,), compute)))
+    if shared.stats["chart"]["hits"] != len(births):
+        raise RuntimeError("cache did not serve every second lookup")
+    return outputs
+
+
+def run_compact(births):
+    """Charts rebuilt from compact rows: longitudes are whole arc-seconds."""
+    outputs = []
+    for birth in births:
+        chart, _, _ = astrology.get_planet_positions(*birth)
+        decoded = {}
+        for body, arcsec, rasi, nakshatra, pada, retro in compact_chart(chart):
+            decoded[BODY_NAMES[body]] = {
+                "longitude": arcsec / 3600, "retrograde": None if retro is None else bool(retro),
+                "rasi": astrology.rasis[rasi], "nakshatra": astrology.nakshatras[nakshatra], "pada": pada}
+        outputs.append({"chart": decoded})
+    return outputs
+
+
+def run_http(births):
+    """The batch endpoints through the whole app (pools, serialization, JSON)."""
+    import httpx
+    import main
+
+    async def post(client, section, chunk):
+        body = "\n".join(json.dumps(dict(zip(("dob", "tob", "lat", "lon", "tz_offset"), b))) for b in chunk)
+        response = await client.post(f"/batch/{section}", content=body,
+                                     headers={"content-type": "application/x-ndjson"})
+        response.raise_for_status()
+        entries = [loads(line) for line in response.text.splitlines()]
+        errors = [e for e in entries if "error" in e]
+        if errors:
+            raise RuntimeError(f"/batch/{section}: {errors[0]}")
+        return [e["result"] for e in sorted(entries, key=lambda e: e["index"])]
+
+    async def run():
+        outputs = []
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://golden", timeout=None) as client:
+            for start in range(0, len(births), 1000):
+                chunk = births[start:start + 1000]
+                charts = await post(client, "chart", chunk)
+                tables = await post(client, "dasa", chunk)
+                yogas = await post(client, "yogas", chunk)
+                outputs += [{"chart": c["chart"], "dasa_table": d["dasa_table"], "yogas": y["yogas"]}
+                            for c, d, y in zip(charts, tables, yogas)]
+        return outputs
+
+    return asyncio.run(run())
+
+
+# name -> (run(births) -> outputs, default position tolerance in arc-seconds)
+PATHS = {
+    "reference": (run_reference, 0.0),
+    "store": (run_store, 0.0),
+    "cache": (run_cache, 0.0),
+    "compact": (run_compact, 0.5),
+    "http": (run_http, 0.0),
+}
+
+
+# --- COMPARISON ---
+POSITION_KEYS = {"longitude", "cusps", "ascendant", "mc"}
+SPEED_KEYS = {"speed"}
+DATE_KEYS = {"start_date", "end_date", "start", "end"}
+YEAR_KEYS = {"start_age", "end_age", "duration"}
+BOUNDARIES = {"rasi": SIGN, "nakshatra": NAKSHATRA, "pada": PADA}
+
+
+class Tolerances:
+    def __init__(self, position_arcsec, speed_arcsec):
+        self.position = position_arcsec
+        self.speed = speed_arcsec
+        # A Moon error of position_arcsec shifts the first dasa balance (and every later date) by this much
+        years = position_arcsec / (NAKSHATRA * 3600) * MAX_DASA_YEARS
+        self.days = math.ceil(years * 365.25) if position_arcsec else 0
+        self.years = years + 0.01 if position_arcsec else 0.0
+
+
+def boundary_note(reference, where):
+    """For a discrete mismatch in a chart entry: how far the reference longitude is from that boundary."""
+    field = where.rsplit(".", 1)[-1]
+    longitude = reference.get("longitude") if isinstance(reference, dict) else None
+    if field not in BOUNDARIES or longitude is None:
+        return ""
+    span = BOUNDARIES[field]
+    distance = min(longitude % span, span - longitude % span) * 3600
+    return f' (reference is {distance:.2f}" from a {field} boundary)'
+
+
+def diff(ref, got, tol, where="", key=None, parent=None):
+    """Yield (where, reference, candidate, note) for every difference beyond tolerance."""
+    if isinstance(ref, dict) and isinstance(got, dict):
+        for k in ref.keys() | got.keys():
+            if k not in ref or k not in got:
+                yield f"{where}.{k}".lstrip("."), ref.get(k, "<missing>"), got.get(k, "<missing>"), ""
+            else:
+                yield from diff(ref[k], got[k], tol, f"{where}.{k}".lstrip("."), k, ref)
+    elif isinstance(ref, list) and isinstance(got, list):
+        if len(ref) != len(got):
+            yield where, f"{len(ref)} items", f"{len(got)} items", ""
+            return
+        for i, (r, g) in enumerate(zip(ref, got)):
+            yield from diff(r, g, tol, f"{where}[{i}]", key, parent)
+    elif key in POSITION_KEYS and isinstance(ref, float) and isinstance(got, (int, float)):
+        if abs((got - ref + 180) % 360 - 180) * 3600 > tol.position:
+            yield where, ref, got, f' ({abs((got - ref + 180) % 360 - 180) * 3600:.3f}")'
+    elif key in SPEED_KEYS and isinstance(got, (int, float)):
+        if abs(got - ref) * 3600 > tol.speed:
+            yield where, ref, got, ""
+    elif key in DATE_KEYS and tol.days:
+        shift = abs((datetime.date.fromisoformat(got) - datetime.date.fromisoformat(ref)).days)
+        if shift > tol.days:
+            yield where, ref, got, f" ({shift} days)"
+    elif key in YEAR_KEYS and isinstance(got, (int, float)):
+        if abs(got - ref) > tol.years:
+            yield where, ref, got, ""
+    elif ref != got:
+        yield where, ref, got, boundary_note(parent, where)
+
+
+def max_position_error(ref, got):
+    """Largest longitude difference (arc-seconds) between two chart dicts."""
+    return max((abs((got[b]["longitude"] - info["longitude"] + 180) % 360 - 180) * 3600
+                for b, info in ref.items() if b in got), default=0.0)
+
+
+# --- COMMANDS ---
+def ephemeris_files():
+    return sorted(f for f in os.listdir(EPHE_PATH) if f.endswith(".se1")) if os.path.isdir(EPHE_PATH) else []
+
+
+def quiet():
+    return contextlib.redirect_stdout(open(os.devnull, "w"))  # the analyzers print debug lines
+
+
+def record(args):
+    started = time.perf_counter()
+    corpus = generate_corpus(args.size, args.seed)
+    with quiet():
+        outputs = run_reference([birth for birth, _ in corpus])
+    golden = {
+        "meta": {"engine_version": ENGINE_VERSION, "size": args.size, "seed": args.seed,
+                 "swisseph": swe.version, "ephemeris": ephemeris_files(), "recorded_at": time.strftime("%Y-%m-%d")},
+        "births": [{"birth": list(birth), "tags": tags, "outputs": out} for (birth, tags), out in zip(corpus, outputs)],
+    }
+    with gzip.open(args.file, "wt", encoding="utf-8") as f:
+        json.dump(golden, f, separators=(",", ":"))
+    print(f"Recorded {len(corpus)} births ({len(corpus) - args.size} edge cases) to {args.file} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def check(args):
+    if not os.path.exists(args.file):
+        print(f"No recording at {args.file}: run `golden.py record` on the commit you trust first")
+        return 2
+    with gzip.open(args.file, "rt", encoding="utf-8") as f:
+        golden = json.load(f)
+    meta = golden["meta"]
+    if meta["engine_version"] != ENGINE_VERSION:
+        print(f"warning: recorded with engine {meta['engine_version']}, running {ENGINE_VERSION}")
+    if meta["ephemeris"] != ephemeris_files() or meta["swisseph"] != swe.version:
+        print("warning: recorded with other ephemeris files or Swiss Ephemeris version; re-record on this machine")
+    entries = golden["births"][:args.limit or None]
+    births = [tuple(e["birth"]) for e in entries]
+    names = args.paths.split(",") if args.paths else list(PATHS)
+    unknown = [n for n in names if n not in PATHS]
+    if unknown:
+        print(f"Unknown path(s): {', '.join(unknown)}. Known: {', '.join(PATHS)}")
+        return 2
+
+    print(f"{len(births)} births, engine {meta['engine_version']}, recorded {meta['recorded_at']}")
+    failed = []
+    for name in names:
+        run, resolution = PATHS[name]
+        tol = Tolerances(resolution if args.position_tol is None else args.position_tol, args.speed_tol)
+        started = time.perf_counter()
+        with quiet():
+            candidates = run(births)
+        elapsed = time.perf_counter() - started
+        mismatches, worst = [], 0.0
+        for entry, got in zip(entries, candidates):
+            reference = {k: entry["outputs"].get(k, "<not recorded>") for k in got}
+            if isinstance(reference.get("chart"), dict):
+                worst = max(worst, max_position_error(reference["chart"], got["chart"]))
+            for where, r, g, note in diff(reference, got, tol):
+                mismatches.append((entry, where, r, g, note))
+        compared = ", ".join(sorted({k for got in candidates for k in got}))
+        status = "ok" if not mismatches else f"{len(mismatches)} MISMATCHES"
+        print(f"  {name:<10} {status:<16} {elapsed:6.1f}s  max chart error {worst:.3f}\"  "
+              f"(tolerance {tol.position}\"; {compared})")
+        for entry, where, r, g, note in mismatches[:args.show]:
+            print(f"      {' '.join(map(str, entry['birth']))} [{','.join(entry['tags'])}] {where}: {r!r} != {g!r}{note}")
+        if mismatches:
+            failed.append(name)
+    if failed:
+        print(f"\n{len(failed)} path(s) differ from the golden master: {', '.join(failed)}")
+        return 1
+    print("\nall paths match the golden master")
+    return 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("record", "check"))
+    parser.add_argument("--file", default=GOLDEN_FILE)
+    parser.add_argument("--size", type=int, default=2000, help="random births (record)")
+    parser.add_argument("--seed", type=int, default=1, help="corpus seed (record)")
+    parser.add_argument("--paths", default="", help=f"comma-separated subset of: {', '.join(PATHS)}")
+    parser.add_argument("--position-tol", type=float, default=None,
+                        help="allowed longitude/cusp difference in arc-seconds (default: each path's resolution)")
+    parser.add_argument("--speed-tol", type=float, default=0.0, help="allowed speed difference, arc-seconds/day")
+    parser.add_argument("--limit", type=int, default=0, help="only check the first N births")
+    parser.add_argument("--show", type=int, default=10, help="mismatches listed per path")
+    args = parser.parse_args()
+    return record(args) if args.command == "record" else check(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
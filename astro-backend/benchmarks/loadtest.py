@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Load test that replays the frontend's page load at given user arrival rates.
+
+Each simulated visitor does what pages/index.js does on submit: a GET /test
+ping, then the eight section requests at once (predict and spouse with
+include_chart=true, spouse with gender=Male, tz_offset 5.5), exactly as the
+page builds them. Like a browser on HTTP/1.1, a visitor opens at most
+--conns-per-page keep-alive connections to the backend (6 by default), so
+two of the eight requests queue behind the others. A page counts as loaded
+when all eight succeed (Promise.all), failed as soon as one does not.
+
+Visitors arrive as a Poisson process at each --rates value (users/sec) for
+--duration seconds, open-loop: arrivals do not wait for earlier pages, and
+page latency is measured from the scheduled arrival, so an overloaded
+server shows up as latency instead of a silently lower offered load. Births
+are random (seeded) so every page computes fresh charts unless
+--returning sets the fraction of visitors reusing an earlier birth.
+
+By default the backend is launched locally with the stubbed LLM
+(--llm-latency-ms simulates the model's response time; upstream rate
+limits are lifted) and a throwaway chart store and job database. --url
+targets an already running server instead. The generator runs in this
+process, so on a small machine it competes with the server for CPU.
+
+The report lists throughput, error rate and p50/p95/p99 latency per
+endpoint and per page for every rate, and the highest rate that met
+--slo-ms (page p95) with at most --max-error-rate errors. --json writes
+the same numbers for capacity planning.
+
+Run from astro-backend/:
+  python benchmarks/loadtest.py --rates 0.5,1,2,4 --duration 30
+  python benchmarks/loadtest.py --workers 4 --llm-latency-ms 2500 --json capacity.json
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode, urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (path, extra params) in the order pages/index.js issues them
+FAN_OUT = [
+    ("/predict", {"include_chart": "true"}),
+    ("/career", {}),
+    ("/dasa", {}),
+    ("/yogas", {}),
+    ("/life_purpose", {}),
+    ("/dasa_bhukti", {}),
+    ("/spouse", {"gender": "Male", "include_chart": "true"}),
+    ("/indu_dasa", {}),
+]
+PING = "/test"
+PAGE = "page"
+
+# Pseudo status codes for failures without an HTTP response
+TRANSPORT_ERROR, DROPPED = 0, -1
+STATUS_LABELS = {TRANSPORT_ERROR: "timeout/conn", DROPPED: "dropped"}
+
+# Birth places for random visitors: (lat, lon)
+PLACES = [(13.0827, 80.2707), (28.6139, 77.2090), (19.0760, 72.8777), (12.9716, 77.5946), (22.5726, 88.3639),
+          (9.9252, 78.1198), (51.5072, -0.1276), (40.7128, -74.0060), (1.3521, 103.8198), (-33.8688, 151.2093)]
+
+
+def random_birth(rng):
+    """Form values as the page sends them (strings)."""
+    day = rng.randrange(0, 70 * 365)
+    dob = time.strftime("%Y-%m-%d", time.gmtime((day - 25 * 365) * 86400))  # 1945 .. 2015
+    lat, lon = rng.choice(PLACES)
+    return {"dob": dob, "tob": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}", "lat": str(lat), "lon": str(lon)}
+
+
+def page_requests(birth):
+    paths = []
+    for path, extra in FAN_OUT:
+        params = {"dob": birth["dob"], "tob": birth["tob"], "lat": birth["lat"], "lon": birth["lon"],
+                  "tz_offset": "5.5", **extra}
+        paths.append((path, f"{path}?{urlencode(params)}"))
+    return paths
+
+
+# --- HTTP/1.1 CLIENT ---
+class Connection:
+    """One keep-alive HTTP/1.1 connection issuing GETs sequentially."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, target):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                          f"Accept: application/json\r\nOrigin: http://localhost:3000\r\n\r\n".encode())
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class ConnectionPool:
+    """Per-visitor connection limit, like a browser's per-host limit."""
+
+    def __init__(self, host, port, size):
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait(Connection(host, port))
+
+    async def get(self, target, timeout):
+        conn = await self.idle.get()
+        try:
+            return await asyncio.wait_for(conn.get(target), timeout)
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            self.idle.put_nowait(conn)
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+# --- LOAD ---
+async def visit(birth, arrived, host, port, args, samples):
+    """One page load; appends (endpoint, latency_s, status) samples for each request and the page."""
+    pool = ConnectionPool(host, port, args.conns_per_page)
+    loop = asyncio.get_running_loop()
+
+    async def fetch(name, target):
+        started = loop.time()
+        try:
+            status = await pool.get(target, args.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status = TRANSPORT_ERROR
+        samples.append((name, loop.time() - started, status))
+        return status
+
+    try:
+        statuses = [await fetch(PING, PING)] if args.ping else []
+        if all(status == 200 for status in statuses):
+            statuses += await asyncio.gather(*(fetch(name, target) for name, target in page_requests(birth)))
+        # The page fails with its first failing request
+        failed = [status for status in statuses if status != 200]
+        samples.append((PAGE, loop.time() - arrived, failed[0] if failed else 200))
+    finally:
+        pool.close()
+
+
+async def run_rate(rate, host, port, args, rng):
+    """Poisson arrivals at `rate` users/sec; returns samples from after the warm-up."""
+    loop = asyncio.get_running_loop()
+    samples, warmup_samples = [], []
+    tasks = set()
+    births = []
+    start = loop.time()
+    arrival = start
+    dropped = 0
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival - start >= args.warmup + args.duration:
+            break
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        if len(tasks) >= args.max_in_flight:
+            dropped += 1
+            continue
+        if births and rng.random() < args.returning:
+            birth = rng.choice(births)
+        else:
+            birth = random_birth(rng)
+            births.append(birth)
+        target = samples if arrival - start >= args.warmup else warmup_samples
+        task = asyncio.ensure_future(visit(birth, arrival, host, port, args, target))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.wait(tasks)
+    samples.extend((PAGE, 0.0, DROPPED) for _ in range(dropped))
+    return samples
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))]
+
+
+def summarize(samples, duration):
+    """{endpoint: {requests, throughput, error_rate, p50/p95/p99 ms, errors by status}}."""
+    summary = {}
+    names = [PAGE, PING] + [path for path, _ in FAN_OUT]
+    for name in names:
+        rows = [(latency, status) for n, latency, status in samples if n == name]
+        if not rows:
+            continue
+        ok = sorted(latency for latency, status in rows if status == 200)
+        errors = {}
+        for _, status in rows:
+            if status != 200:
+                label = STATUS_LABELS.get(status, str(status))
+                errors[label] = errors.get(label, 0) + 1
+        summary[name] = {
+            "requests": len(rows),
+            "throughput": round(len(ok) / duration, 2),
+            "error_rate": round(1 - len(ok) / len(rows), 4),
+            **{f"p{q}_ms": None if not ok else round(percentile(ok, q) * 1000, 1) for q in (50, 95, 99)},
+            "errors": errors,
+        }
+    return summary
+
+
+def print_summary(rate, summary):
+    print(f"\n{rate:g} users/s")
+    print(f"  {'endpoint':<15}{'count':>7}{'ok/s':>8}{'err%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  errors")
+    for name, row in summary.items():
+        fmt = lambda v: f"{v:>9.0f}" if v is not None else f"{'-':>9}"
+        print(f"  {name:<15}{row['requests']:>7}{row['throughput']:>8.2f}{row['error_rate'] * 100:>6.1f}%"
+              f"{fmt(row['p50_ms'])}{fmt(row['p95_ms'])}{fmt(row['p99_ms'])}  {row['errors'] or ''}")
+
+
+# --- SERVER ---
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch(args):
+    """Start the backend with the stubbed LLM; returns (process, port)."""
+    port = free_port()
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    env = {**os.environ, "LLM_BACKEND": "stub", "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+           "CHART_STORE_PATH": os.path.join(scratch, "charts.sqlite3"),
+           "JOB_STORE_PATH": os.path.join(scratch, "jobs.sqlite3")}
+    if not args.keep_llm_quota:
+        env["OPENAI_RPM"] = env["OPENAI_TPM"] = str(10**9)
+    if args.workers > 1:
+        cmd = [sys.executable, "start_prefork.py", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", PING)
+            if conn.getresponse().status == 200:
+                return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"backend did not come up on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="0.5,1,2", help="comma-separated user arrival rates (users/sec)")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per rate")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each rate")
+    parser.add_argument("--url", help="target a running backend instead of launching one")
+    parser.add_argument("--workers", type=int, default=1, help="launch through start_prefork.py when > 1")
+    parser.add_argument("--llm-latency-ms", type=int, default=1500, help="stubbed model response time")
+    parser.add_argument("--keep-llm-quota", action="store_true", help="keep the OPENAI_RPM/TPM limits")
+    parser.add_argument("--conns-per-page", type=int, default=6, help="browser connections per host")
+    parser.add_argument("--no-ping", dest="ping", action="store_false", help="skip the /test ping")
+    parser.add_argument("--returning", type=float, default=0.0, help="fraction of visitors reusing a birth")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout (seconds)")
+    parser.add_argument("--max-in-flight", type=int, default=500, help="pages in flight before arrivals are dropped")
+    parser.add_argument("--slo-ms", type=float, default=3000, help="page p95 target for the capacity estimate")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    rates = [float(r) for r in args.rates.split(",")]
+
+    proc = None
+    if args.url:
+        target = urlparse(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        proc, port = launch(args)
+        host = "127.0.0.1"
+    print(f"Target http://{host}:{port}, {'launched locally' if proc else 'external'}; "
+          f"stub LLM {args.llm_latency_ms} ms; {args.conns_per_page} connections per page; "
+          f"{args.duration:g}s per rate after {args.warmup:g}s warm-up; {os.cpu_count()} CPUs")
+
+    results = []
+    rng = random.Random(args.seed)
+    try:
+        for rate in rates:
+            samples = asyncio.run(run_rate(rate, host, port, args, rng))
+            summary = summarize(samples, args.duration)
+            page = summary.get(PAGE, {})
+            meets = (page.get("p95_ms") is not None and page["p95_ms"] <= args.slo_ms
+                     and page["error_rate"] <= args.max_error_rate)
+            results.append({"rate": rate, "meets_slo": meets, "endpoints": summary})
+            print_summary(rate, summary)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=60)
+
+    passing = [r["rate"] for r in results if r["meets_slo"]]
+    capacity = max(passing) if passing else None
+    print(f"\nCapacity: {f'{capacity:g} users/s' if capacity else 'no tested rate'} within page p95 <= "
+          f"{args.slo_ms:g} ms and <= {args.max_error_rate:.0%} errors "
+          f"({args.workers} worker{'s' if args.workers > 1 else ''}, {os.cpu_count()} CPUs)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, "cpus": os.cpu_count(),
+                       "capacity_users_per_sec": capacity, "rates": results}, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis server, for checks and development without one.
+
+Speaks enough RESP2 for cache.RedisBackend and redis-cli smoke tests: PING,
+AUTH, SELECT, GET, SET [EX|PX] [NX|XX], DEL, EXISTS, DBSIZE, FLUSHDB, and
+EVAL of the cache's lock-release script only. Data lives in one dict per
+database with lazy expiry. Not for production.
+
+  python benchmarks/resp_standin.py [--port 6379]
+"""
+
+import argparse
+import socket
+import socketserver
+import threading
+import time
+
+# cache.RELEASE_SCRIPT, the one script EVAL runs (there is no Lua here)
+RELEASE_SCRIPT = b'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+
+
+class _Store:
+    def __init__(self):
+        self.dbs = {}
+        self.lock = threading.Lock()
+
+    def db(self, index):
+        return self.dbs.setdefault(index, {})
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.server.clients.add(self.connection)
+
+    def finish(self):
+        self.server.clients.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        self.db_index = 0
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            self.wfile.write(self._execute(args))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command (e.g. typed over telnet)
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _execute(self, args):
+        command = args[0].upper()
+        store = self.server.store
+        with store.lock:
+            db = store.db(self.db_index)
+            now = time.monotonic()
+            if command == b"PING":
+                return b"+PONG\r\n"
+            if command == b"AUTH":
+                return b"+OK\r\n"
+            if command == b"SELECT":
+                self.db_index = int(args[1])
+                return b"+OK\r\n"
+            if command == b"GET":
+                entry = db.get(args[1])
+                if entry is None or (entry[1] is not None and entry[1] <= now):
+                    db.pop(args[1], None)
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+            if command == b"SET":
+                key, value, expires, condition = args[1], args[2], None, None
+                options = [a.upper() for a in args[3:]]
+                i = 0
+                while i < len(options):
+                    if options[i] in (b"EX", b"PX"):
+                        scale = 1.0 if options[i] == b"EX" else 0.001
+                        expires = now + int(options[i + 1]) * scale
+                        i += 2
+                    else:
+                        condition = options[i]
+                        i += 1
+                entry = db.get(key)
+                alive = entry is not None and (entry[1] is None or entry[1] > now)
+                if (condition == b"NX" and alive) or (condition == b"XX" and not alive):
+                    return b"$-1\r\n"
+                db[key] = (value, expires)
+                return b"+OK\r\n"
+            if command == b"DEL":
+                return b":%d\r\n" % sum(db.pop(key, None) is not None for key in args[1:])
+            if command == b"EVAL":
+                if args[1] != RELEASE_SCRIPT or args[2] != b"1":
+                    return b"-ERR only the cache lock-release script is supported\r\n"
+                entry = db.get(args[3])
+                if entry is None or entry[0] != args[4] or (entry[1] is not None and entry[1] <= now):
+                    return b":0\r\n"
+                del db[args[3]]
+                return b":1\r\n"
+            if command == b"EXISTS":
+                return b":%d\r\n" % sum(key in db for key in args[1:])
+            if command == b"DBSIZE":
+                return b":%d\r\n" % len(db)
+            if command == b"FLUSHDB":
+                db.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % command
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # The client opens one connection per thread; the socketserver default backlog of 5
+    # drops part of a 16-thread burst, and those threads see the cache as down
+    request_queue_size = 128
+
+    def __init__(self, port=0, host="127.0.0.1"):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self.clients = set()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        """Serve on a background thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop listening and drop open client connections, like a crashed server."""
+        self.shutdown()
+        self.server_close()
+        for conn in list(self.clients):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    server = RespStandIn(args.port, args.host)
+    print(f"RESP stand-in listening on {server.url}")
+    server.serve_forever()
@@ -7,5 +7,8 @@ python --version
 echo "📦 Installing Python dependencies..."
 pip install -r requirements.txt
 
+echo "🪐 Verifying bundled ephemeris files (offline)..."
+python ephe_loader.py report || echo "⚠️  Ephemeris bundle incomplete: charts will use the Moshier fallback"
+
 echo "🚀 Starting server..."
 python start_minimal.py 
\ No newline at end of file
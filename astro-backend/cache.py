@@ -0,0 +1,365 @@
+"""
+Shared result cache for the chart, dasa and interpretation layers.
+
+Callers go through get_or_compute(layer, parts, compute). Values are stored
+in a compact binary form (marshal, zlib-compressed above CACHE_COMPRESS_MIN
+bytes) under keys namespaced by ENGINE_VERSION/AYANAMSA, so a new engine
+release never reads an old entry. Two backends:
+
+  CACHE_BACKEND=memory  per-process LRU bounded by CACHE_MAX_BYTES (default)
+  CACHE_BACKEND=redis   any Redis-protocol server at CACHE_URL, shared by all
+                        instances behind the load balancer
+  CACHE_BACKEND=off     compute every time
+
+Misses are stampede-protected: within a process one caller computes while
+concurrent callers for the same key wait for its result; across instances
+(redis) the computing caller holds a short lock key, set to a random token
+and released only while it still holds that token, and the others poll for
+the value instead of computing it again. A failing cache server degrades to
+plain computation, never to an error.
+"""
+
+import hashlib
+import marshal
+import os
+import socket
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from version import AYANAMSA, ENGINE_VERSION
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_URL = os.getenv("CACHE_URL", "redis://127.0.0.1:6379/0")
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_COMPRESS_MIN = int(os.getenv("CACHE_COMPRESS_MIN", "1024"))
+CACHE_TIMEOUT = float(os.getenv("CACHE_TIMEOUT", "0.25"))
+CACHE_LOCK_TTL = float(os.getenv("CACHE_LOCK_TTL", "30"))
+CACHE_LOCK_WAIT = float(os.getenv("CACHE_LOCK_WAIT", "10"))
+
+DAY = 86400
+CACHE_TTLS = {
+    "chart": int(os.getenv("CACHE_TTL_CHART", str(30 * DAY))),
+    "dasa": int(os.getenv("CACHE_TTL_DASA", str(30 * DAY))),
+    "interpretation": int(os.getenv("CACHE_TTL_INTERPRETATION", str(7 * DAY))),
+}
+
+NAMESPACE = f"astro:{ENGINE_VERSION}:{AYANAMSA}"
+
+
+# --- ENCODING ---
+_RAW, _ZLIB = 0, 1
+
+
+def encode(value):
+    """marshal (+zlib for larger values) behind a 2-byte header: marshal version, compression."""
+    body = marshal.dumps(value)
+    if len(body) >= CACHE_COMPRESS_MIN:
+        return bytes((marshal.version, _ZLIB)) + zlib.compress(body, 1)
+    return bytes((marshal.version, _RAW)) + body
+
+
+def decode(blob):
+    """Inverse of encode; raises ValueError for entries written by another marshal version."""
+    if len(blob) < 2 or blob[0] != marshal.version:
+        raise ValueError("incompatible cache entry")
+    body = zlib.decompress(blob[2:]) if blob[1] == _ZLIB else blob[2:]
+    return marshal.loads(body)
+
+
+# --- BACKENDS ---
+class MemoryBackend:
+    """Thread-safe LRU of encoded values with per-entry expiry, bounded in bytes."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (expires_at, blob)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, blob, ttl):
+        with self._lock:
+            self._store(key, blob, ttl)
+
+    def add(self, key, blob, ttl):
+        """Set only if absent (used for locks); True when set."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._store(key, blob, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def release(self, key, token):
+        """Delete a lock key only while it still holds `token`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == token:
+                self._remove(key)
+
+    def _store(self, key, blob, ttl):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, blob)
+        self.size += len(blob)
+        while self.size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        self.size -= len(self._entries.pop(key)[1])
+
+    def metrics(self):
+        return {"backend": "memory", "entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes}
+
+
+class RedisError(Exception):
+    pass
+
+
+# Compare-and-delete: drop the lock only if it still holds the caller's token
+RELEASE_SCRIPT = 'if redis.call("GET", KEYS[1]) == ARGV[1] then return redis.call("DEL", KEYS[1]) end return 0'
+
+
+class RedisBackend:
+    """
+    Minimal Redis-protocol (RESP2) client: GET, SET [PX] [NX], DEL, EVAL. One
+    connection per thread and process; after a connection failure the
+    backend reports misses for a second instead of retrying every call.
+    """
+
+    def __init__(self, url=CACHE_URL, timeout=CACHE_TIMEOUT):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._down_until = 0.0
+        self.errors = 0
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"), os.getpid())
+        self._local.conn = conn
+        if self.password:
+            self._roundtrip(conn, ("AUTH", self.password))
+        if self.db:
+            self._roundtrip(conn, ("SELECT", self.db))
+        return conn
+
+    def _command(self, *args):
+        if time.monotonic() < self._down_until:
+            raise RedisError("cache server marked down")
+        conn = getattr(self._local, "conn", None)
+        try:
+            if conn is None or conn[2] != os.getpid():
+                conn = self._connect()
+            return self._roundtrip(conn, args)
+        except (OSError, RedisError) as e:
+            self.errors += 1
+            self._local.conn = None
+            if conn is not None:
+                conn[0].close()
+            if isinstance(e, OSError):
+                self._down_until = time.monotonic() + 1.0
+            raise RedisError(str(e)) from e
+
+    def _roundtrip(self, conn, args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        conn[0].sendall(b"".join(parts))
+        return self._read_reply(conn[1])
+
+    def _read_reply(self, rfile):
+        line = rfile.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = rfile.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply(rfile) for _ in range(count)]
+        raise RedisError(f"unexpected reply {line!r}")
+
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, blob, ttl):
+        self._command("SET", key, blob, "PX", int(ttl * 1000))
+
+    def add(self, key, blob, ttl):
+        return self._command("SET", key, blob, "PX", int(ttl * 1000), "NX") == "OK"
+
+    def delete(self, key):
+        self._command("DEL", key)
+
+    def release(self, key, token):
+        self._command("EVAL", RELEASE_SCRIPT, 1, key, token)
+
+    def metrics(self):
+        return {"backend": "redis", "server": f"{self.host}:{self.port}/{self.db}", "errors": self.errors}
+
+
+# --- CACHE ---
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Cache:
+    """Namespaced, encoded get-or-compute with stampede protection over a backend."""
+
+    def __init__(self, backend, namespace=NAMESPACE):
+        self.backend = backend
+        self.namespace = namespace
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self.stats = {layer: {"hits": 0, "misses": 0, "waits": 0} for layer in CACHE_TTLS}
+
+    def key(self, layer, parts):
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+        return f"{self.namespace}:{layer}:{digest}"
+
+    def _get(self, key):
+        try:
+            blob = self.backend.get(key)
+            return None if blob is None else decode(blob)
+        except (RedisError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+
+    def _set(self, key, value, ttl):
+        try:
+            self.backend.set(key, encode(value), ttl)
+        except (RedisError, ValueError):
+            pass  # unencodable value or cache down: the result is still returned
+
+    def get_or_compute(self, layer, parts, compute, ttl=None):
+        stats = self.stats.setdefault(layer, {"hits": 0, "misses": 0, "waits": 0})
+        key = self.key(layer, parts)
+        value = self._get(key)
+        if value is not None:
+            stats["hits"] += 1
+            return value
+
+        # Single flight within this process
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            stats["waits"] += 1
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # A previous leader may have stored the value between our miss and taking the flight
+            flight.value = self._get(key)
+            if flight.value is not None:
+                stats["hits"] += 1
+                return flight.value
+            stats["misses"] += 1
+            flight.value = self._compute_shared(key, compute, ttl or CACHE_TTLS.get(layer, DAY))
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _compute_shared(self, key, compute, ttl):
+        """Across instances: compute under a lock key, or wait for whoever holds it."""
+        lock_key, token = key + ":lock", os.urandom(16)
+        try:
+            locked = self.backend.add(lock_key, token, CACHE_LOCK_TTL)
+        except RedisError:
+            locked = None  # cache down: just compute
+        if locked is False:
+            deadline = time.monotonic() + CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                value = self._get(key)
+                if value is not None:
+                    return value
+                try:
+                    if self.backend.get(lock_key) is None:
+                        break  # holder gave up without a value
+                except RedisError:
+                    break
+        try:
+            value = compute()
+            self._set(key, value, ttl)
+            return value
+        finally:
+            if locked:
+                try:
+                    # Only our own lock: if computing outlived CACHE_LOCK_TTL, another caller may hold it now
+                    self.backend.release(lock_key, token)
+                except RedisError:
+                    pass
+
+    def metrics(self):
+        return {**self.backend.metrics(), "namespace": self.namespace, "layers": self.stats}
+
+
+def build_cache(backend=CACHE_BACKEND):
+    if backend == "memory":
+        return Cache(MemoryBackend())
+    if backend == "redis":
+        return Cache(RedisBackend())
+    if backend == "off":
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+CACHE = build_cache()
+
+
+def get_or_compute(layer, parts, compute, ttl=None):
+    """compute() through the shared cache (directly when caching is off)."""
+    if CACHE is None:
+        return compute()
+    return CACHE.get_or_compute(layer, parts, compute, ttl)
+
+
+def metrics():
+    return CACHE.metrics() if CACHE else None
@@ -1,13 +1,11 @@
 import pyswisseph as swe
 import datetime
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-from env_config import OPENAI_API_KEY
-
-# --- CONFIGURE OPENAI ---
-load_dotenv()
-client = OpenAI(api_key=OPENAI_API_KEY)
+from aspects import compute_aspects
+from ephe_loader import EPHE_PATH
+from house_lords import house_lord, house_sign, lord_houses, sign_lord
+from shadbala import rank_planets
+from vargas import compute_vargas
 
 # --- CONSTANTS ---
 rasis = [
@@ -28,13 +26,6 @@ planet_ids = {
     "Saturn": 6, "Uranus": 7, "Neptune": 8, "Pluto": 9
 }
 
-sign_lords = {
-    "Mesha": "Mars", "Rishaba": "Venus", "Mithuna": "Mercury",
-    "Kataka": "Moon", "Simha": "Sun", "Kanni": "Mercury",
-    "Thula": "Venus", "Vrischika": "Mars", "Dhanus": "Jupiter",
-    "Makara": "Saturn", "Kumbha": "Saturn", "Meena": "Jupiter"
-}
-
 career_significators = {
     "Sun": ["Leadership", "Government", "Administration", "Medicine", "Gold"],
     "Moon": ["Psychology", "Nursing", "Hospitality", "Water-related", "Real Estate"],
@@ -66,7 +57,7 @@ sign_careers = {
     "Meena": ["Spirituality", "Pharmacy", "Creative Arts", "Charity"]
 }
 
-swe.set_ephe_path('.')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 
@@ -109,15 +100,32 @@ def get_house_from_longitude(longitude, asc_deg):
     return (planet_rasi - lagna_rasi) % 12 + 1
 
 
-def analyze_career(data, asc_deg, cusps, gender):
+def analyze_dasamsa(d10):
+    """Career chart (D10): its lagna, 10th house, the 10th lord's placement and planets in the 10th."""
+    lagna = d10['Ascendant']
+    tenth_sign = house_sign(lagna, 10)
+    tenth_lord = house_lord(lagna, 10)
+    return {
+        'lagna': lagna,
+        'tenth_house': tenth_sign,
+        'tenth_lord': tenth_lord,
+        'tenth_lord_sign': d10.get(tenth_lord),
+        'planets_in_tenth': [p for p in d10 if p != 'Ascendant' and
+                             (p in planet_ids or p.startswith('Rahu') or p.startswith('Ketu')) and
+                             d10[p] == tenth_sign]
+    }
+
+
+def analyze_career(data, asc_deg, cusps, gender, vargas=None, shadbala=None, aspects=None):
     career_houses = {2: cusps[1], 6: cusps[5], 10: cusps[9], 11: cusps[10]}
+    lagna = data['Ascendant']['rasi']
     house_lords = {}
 
     for house_num, house_deg in career_houses.items():
         sign_idx = int(house_deg // 30)
-        sign = rasis[sign_idx]
-        lord = sign_lords.get(sign)
-        house_lords[house_num] = {'sign': sign, 'lord': lord, 'position': data.get(lord)}
+        lord = sign_lord(sign_idx)
+        house_lords[house_num] = {'sign': rasis[sign_idx], 'lord': lord, 'position': data.get(lord),
+                                  'rules': list(lord_houses(lagna, lord))}
 
     planets_in_career_houses = {h: [] for h in career_houses}
     for planet, info in data.items():
@@ -126,6 +134,10 @@ def analyze_career(data, asc_deg, cusps, gender):
             if house in career_houses:
                 planets_in_career_houses[house].append(planet)
 
+    if aspects is None:
+        aspects = compute_aspects(data)
+    aspects_on_career_houses = {h: aspects.aspecting_house(h) for h in career_houses}
+
     career_planets = []
     for planet in ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']:
         if planet in data:
@@ -141,10 +153,23 @@ def analyze_career(data, asc_deg, cusps, gender):
         get_house_from_longitude(data['Moon']['longitude'], asc_deg) == 11):
         yogas.append("Gajakesari Yoga (Success in career)")
 
+    if vargas is None:
+        vargas = compute_vargas(data)
+
+    # Lords of and planets in the career houses, by six-fold strength
+    significators = None
+    if shadbala is not None:
+        candidates = [info['lord'] for info in house_lords.values()]
+        candidates += [p for planets in planets_in_career_houses.values() for p in planets]
+        significators = rank_planets(shadbala, candidates)
+
     return {
         'house_lords': house_lords,
         'planets_in_career_houses': planets_in_career_houses,
+        'aspects_on_career_houses': aspects_on_career_houses,
         'career_planets': career_planets,
+        'significators': significators,
+        'dasamsa': analyze_dasamsa(vargas['D10']),
         'yogas': yogas,
         'ascendant': data['Ascendant']['rasi']
     }
@@ -161,12 +186,30 @@ def generate_career_report(analysis, asc_deg):
         report += f"\n{house_num}{suffix} House (Sign: {info['sign']}, Lord: {info['lord']}):"
         if info['position']:
             report += f" Positioned in {info['position']['rasi']} (House {get_house_from_longitude(info['position']['longitude'], asc_deg)})"
+        if info.get('rules'):
+            report += f"\n  {info['lord']} rules houses: {', '.join(map(str, info['rules']))}"
         report += f"\n  Career Fields: {', '.join(career_significators.get(str(house_num)+'th', []))}"
         if analysis['planets_in_career_houses'].get(house_num):
             report += f"\n  Planets in this house: {', '.join(analysis['planets_in_career_houses'][house_num])}"
+        if analysis.get('aspects_on_career_houses', {}).get(house_num):
+            report += f"\n  Aspected by: {', '.join(analysis['aspects_on_career_houses'][house_num])}"
 
     report += "\n\nCareer Significator Planets:"
     for planet in analysis['career_planets']:
         report += f"\n{planet['planet']} in {planet['sign']} (House {planet['house']}):"
         report += f"\n  Potential Careers: {', '.join(career_significators.get(planet['planet'], []))}"
+
+    if analysis.get('significators'):
+        report += "\n\nStrongest Career Significators (Shadbala):"
+        for sig in analysis['significators']:
+            report += f"\n{sig['planet']}: {sig['rupas']} rupas ({'strong' if sig['strong'] else 'below required strength'})"
+
+    d10 = analysis.get('dasamsa')
+    if d10:
+        report += "\n\nDasamsa (D10) Career Chart:"
+        report += f"\nD10 Lagna: {d10['lagna']}, 10th House: {d10['tenth_house']}"
+        report += f"\n10th Lord {d10['tenth_lord']} placed in {d10['tenth_lord_sign']}"
+        report += f"\n  Career Fields: {', '.join(sign_careers.get(d10['tenth_house'], []))}"
+        if d10['planets_in_tenth']:
+            report += f"\n  Planets in the D10 10th house: {', '.join(d10['planets_in_tenth'])}"
     return report
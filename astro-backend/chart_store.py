@@ -0,0 +1,222 @@
+"""
+Persistent chart store for saved profiles and cohort queries.
+
+Every computed profile (chart, ascendant, cusps, dasa table and yogas) is
+saved in an embedded SQLite database keyed by the normalized birth tuple plus
+ENGINE_VERSION/AYANAMSA, so a returning user is a single primary-key lookup
+instead of a recomputation. Alongside the JSON payload each chart gets
+indexed integer columns (lagna, Moon rasi, Moon nakshatra; indices into the
+serialization tables), one row per dasa period (lord and day-number bounds)
+and one row per detected yoga, which turns cohort questions such as "Moon in
+Rohini, currently in Jupiter dasa" into index scans.
+
+CHART_STORE=off disables it; CHART_STORE_PATH picks the database file.
+Rows written by another engine version are ignored (and removed by
+`python chart_store.py purge`).
+"""
+
+import datetime
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from serialization import BODY_NAMES, NAKSHATRA_NAMES, RASI_NAMES, dumps, loads
+from version import AYANAMSA, ENGINE_VERSION
+
+CHART_STORE = os.getenv("CHART_STORE", "sqlite").lower()
+CHART_STORE_PATH = os.getenv("CHART_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "chart_store.sqlite3"))
+COHORT_MAX_LIMIT = int(os.getenv("COHORT_MAX_LIMIT", "1000"))
+
+ENGINE = f"{ENGINE_VERSION}/{AYANAMSA}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    id INTEGER PRIMARY KEY,
+    birth_key TEXT NOT NULL UNIQUE,
+    engine TEXT NOT NULL,
+    dob TEXT NOT NULL,
+    tob TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    tz_offset REAL NOT NULL,
+    lagna INTEGER NOT NULL,
+    moon_rasi INTEGER NOT NULL,
+    moon_nakshatra INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS charts_lagna ON charts (lagna);
+CREATE INDEX IF NOT EXISTS charts_moon_rasi ON charts (moon_rasi);
+CREATE INDEX IF NOT EXISTS charts_moon_nakshatra ON charts (moon_nakshatra);
+
+CREATE TABLE IF NOT EXISTS dasa_periods (
+    chart_id INTEGER NOT NULL REFERENCES charts (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    lord INTEGER NOT NULL,
+    start_day INTEGER NOT NULL,
+    end_day INTEGER NOT NULL,
+    PRIMARY KEY (chart_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dasa_periods_lord ON dasa_periods (lord, start_day, end_day);
+
+CREATE TABLE IF NOT EXISTS yoga_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS chart_yogas (
+    chart_id INTEGER NOT NULL REFERENCES charts (id) ON DELETE CASCADE,
+    yoga_id INTEGER NOT NULL REFERENCES yoga_names (id),
+    PRIMARY KEY (chart_id, yoga_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS chart_yogas_yoga ON chart_yogas (yoga_id);
+"""
+
+_BODY_INDEX = {name.lower(): i for i, name in enumerate(BODY_NAMES)}
+_RASI_INDEX = {name.lower(): i for i, name in enumerate(RASI_NAMES)}
+_NAKSHATRA_INDEX = {name.lower(): i for i, name in enumerate(NAKSHATRA_NAMES)}
+
+
+def birth_key(dob, tob, lat, lon, tz_offset):
+    """Normalized birth tuple (same precision as the HTTP cache keys) plus engine."""
+    return f"{ENGINE}|{dob}|{tob}|{float(lat):.6f}|{float(lon):.6f}|{float(tz_offset):.4f}"
+
+
+def _day(date_text):
+    return datetime.date.fromisoformat(date_text).toordinal()
+
+
+def _index(table, value, what):
+    """Accept a table index or a (case-insensitive) name."""
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    try:
+        return table[str(value).strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown {what}: {value}")
+
+
+# --- STORE ---
+class ChartStore:
+    """SQLite-backed profile store; one connection per thread (and per process)."""
+
+    def __init__(self, path=CHART_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._inherited = []  # connections opened before a fork: never used or closed in the child
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if conn is not None:
+            self._inherited.append(conn)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def load(self, key):
+        """Saved profile for a birth key, or None."""
+        row = self._conn().execute("SELECT payload FROM charts WHERE birth_key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loads(row[0])
+
+    def save(self, key, birth, profile):
+        """Persist a profile with its indexed columns, dasa periods and yogas."""
+        chart = profile["chart"]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO charts (birth_key, engine, dob, tob, lat, lon, tz_offset, lagna,"
+                " moon_rasi, moon_nakshatra, payload, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, ENGINE, birth.dob, birth.tob, birth.lat, birth.lon, birth.tz_offset,
+                 _RASI_INDEX[chart["Ascendant"]["rasi"].lower()],
+                 _RASI_INDEX[chart["Moon"]["rasi"].lower()],
+                 _NAKSHATRA_INDEX[chart["Moon"]["nakshatra"].lower()],
+                 dumps(profile), time.time()))
+            if cursor.rowcount:  # not already saved by a concurrent request
+                chart_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO dasa_periods (chart_id, seq, lord, start_day, end_day) VALUES (?, ?, ?, ?, ?)",
+                    [(chart_id, seq, _BODY_INDEX[p["planet"].lower()], _day(p["start_date"]), _day(p["end_date"]))
+                     for seq, p in enumerate(profile["dasa_table"])])
+                for name in profile["yogas"]:
+                    conn.execute("INSERT OR IGNORE INTO yoga_names (name) VALUES (?)", (name,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO chart_yogas (chart_id, yoga_id)"
+                    " SELECT ?, id FROM yoga_names WHERE name = ?",
+                    [(chart_id, name) for name in profile["yogas"]])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def cohort(self, lagna=None, moon_rasi=None, moon_nakshatra=None, yoga=None,
+               dasa_lord=None, on_date=None, limit=100, offset=0):
+        """
+        Saved births matching every given filter. yoga matches by name prefix
+        ("Viparita Raja Yoga" covers all its pairings); dasa_lord matches the
+        Mahadasa running on on_date (default today).
+        """
+        where, args = ["c.engine = ?"], [ENGINE]
+        if lagna is not None:
+            where.append("c.lagna = ?")
+            args.append(_index(_RASI_INDEX, lagna, "rasi"))
+        if moon_rasi is not None:
+            where.append("c.moon_rasi = ?")
+            args.append(_index(_RASI_INDEX, moon_rasi, "rasi"))
+        if moon_nakshatra is not None:
+            where.append("c.moon_nakshatra = ?")
+            args.append(_index(_NAKSHATRA_INDEX, moon_nakshatra, "nakshatra"))
+        if yoga:
+            pattern = yoga.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("c.id IN (SELECT y.chart_id FROM chart_yogas y JOIN yoga_names n ON n.id = y.yoga_id"
+                         " WHERE n.name LIKE ? ESCAPE '\\')")
+            args.append(pattern)
+        if dasa_lord is not None:
+            day = (on_date or datetime.date.today()).toordinal()
+            where.append("c.id IN (SELECT d.chart_id FROM dasa_periods d"
+                         " WHERE d.lord = ? AND d.start_day <= ? AND d.end_day > ?)")
+            args.extend([_index(_BODY_INDEX, dasa_lord, "dasa lord"), day, day])
+
+        clause = " AND ".join(where)
+        limit = max(0, min(int(limit), COHORT_MAX_LIMIT))
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM charts c WHERE {clause}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT c.dob, c.tob, c.lat, c.lon, c.tz_offset FROM charts c WHERE {clause}"
+            " ORDER BY c.id LIMIT ? OFFSET ?", args + [limit, int(offset)]).fetchall()
+        births = [dict(zip(("dob", "tob", "lat", "lon", "tz_offset"), row)) for row in rows]
+        return {"count": total, "limit": limit, "offset": int(offset), "births": births}
+
+    def purge_stale(self):
+        """Delete charts written by other engine versions; returns the number removed."""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM charts WHERE engine != ?", (ENGINE,)).rowcount
+        conn.execute("DELETE FROM yoga_names WHERE id NOT IN (SELECT yoga_id FROM chart_yogas)")
+        return removed
+
+    def metrics(self):
+        return {"path": self.path, "engine": ENGINE, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+STORE = ChartStore() if CHART_STORE == "sqlite" else None
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["purge"] and STORE:
+        print(f"Removed {STORE.purge_stale()} charts from other engine versions")
+    else:
+        print("usage: python chart_store.py purge")
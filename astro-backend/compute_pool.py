@@ -0,0 +1,182 @@
+"""
+Bounded executors and per-endpoint admission for request handlers.
+
+Handlers are async and hand their work to one of two dedicated thread pools:
+"cpu" for chart math (sized to the cores, since the GIL makes more threads
+pointless) and "io" for LLM waits. Each endpoint additionally has a gate
+limiting how many of its requests run at once and how many may queue behind
+them. A full queue raises ComputeOverloaded, answered with 503, so bursts are
+shed instead of turning into tail latency. Counters for both layers are
+exposed through metrics().
+
+Endpoint limits can be overridden with ENDPOINT_LIMITS, e.g.
+  ENDPOINT_LIMITS="career=2:8,predict=16:64"   (concurrency:max_queue)
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+CPU_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(os.cpu_count() or 2)))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "32"))
+DEFAULT_QUEUE_FACTOR = int(os.getenv("ENDPOINT_QUEUE_FACTOR", "4"))
+
+
+class ComputeOverloaded(Exception):
+    """Raised when an endpoint's queue is saturated."""
+
+    def __init__(self, endpoint):
+        super().__init__(f"Server busy: too many queued {endpoint} requests")
+        self.endpoint = endpoint
+
+
+# --- POOLS ---
+class ComputePool:
+    """ThreadPoolExecutor that tracks queued/active work and propagates contextvars."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+
+    def _run(self, ctx, fn, args):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return ctx.run(fn, *args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args):
+        with self._lock:
+            self.queued += 1
+        ctx = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._run, ctx, fn, args)
+
+    def metrics(self):
+        return {"workers": self.workers, "active": self.active, "queued": self.queued, "completed": self.completed}
+
+
+POOLS = {
+    "cpu": ComputePool("cpu", CPU_WORKERS),
+    "io": ComputePool("io", IO_WORKERS),
+}
+
+
+# --- ENDPOINT GATES ---
+class EndpointGate:
+    """Concurrency limit plus bounded wait queue for one endpoint."""
+
+    def __init__(self, name, concurrency, max_queue):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def check(self):
+        """Shed load up front when the queue is already full."""
+        if self.running >= self.concurrency and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ComputeOverloaded(self.name)
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold one of the endpoint's slots for the duration of the block."""
+        self.check()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        self.total_wait += started - queued_at
+        self.running += 1
+        try:
+            yield self
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_run += time.perf_counter() - started
+            self._semaphore.release()
+
+    def metrics(self):
+        done = max(self.completed, 1)
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / done * 1000, 2),
+            "avg_run_ms": round(self.total_run / done * 1000, 2),
+        }
+
+
+def _parse_limits(value):
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, spec = item.partition("=")
+        concurrency, _, max_queue = spec.partition(":")
+        limits[name.strip()] = (int(concurrency), int(max_queue or int(concurrency) * DEFAULT_QUEUE_FACTOR))
+    return limits
+
+
+# LLM-bound endpoints mostly wait, so they get the wider io budget
+ENDPOINT_LIMITS = {
+    "predict": (IO_WORKERS // 2, IO_WORKERS * 2),
+    "report_stream": (IO_WORKERS // 2, IO_WORKERS * 2),
+    "batch": (max(1, CPU_WORKERS // 2), CPU_WORKERS),
+}
+ENDPOINT_LIMITS.update(_parse_limits(os.getenv("ENDPOINT_LIMITS", "")))
+
+_gates = {}
+
+
+def gate(endpoint):
+    """The (lazily created) gate for an endpoint."""
+    if endpoint not in _gates:
+        concurrency, max_queue = ENDPOINT_LIMITS.get(endpoint, (CPU_WORKERS, CPU_WORKERS * DEFAULT_QUEUE_FACTOR))
+        _gates[endpoint] = EndpointGate(endpoint, concurrency, max_queue)
+    return _gates[endpoint]
+
+
+# --- ENTRY POINTS ---
+async def run_in_pool(kind, fn, *args):
+    """Run fn(*args) on the "cpu" or "io" pool without endpoint admission."""
+    return await POOLS[kind].run(fn, *args)
+
+
+async def run_compute(endpoint, fn, *args, kind="cpu"):
+    """Admit through the endpoint's gate, then run fn(*args) on a pool."""
+    async with gate(endpoint).admit():
+        return await POOLS[kind].run(fn, *args)
+
+
+def metrics():
+    return {
+        "pools": {name: pool.metrics() for name, pool in POOLS.items()},
+        "endpoints": {name: g.metrics() for name, g in sorted(_gates.items())},
+    }
@@ -1,6 +1,7 @@
 import pyswisseph as swe
 import datetime
 from collections import OrderedDict
+from ephe_loader import EPHE_PATH
 
 # -------------------------
 # CONSTANTS
@@ -137,6 +138,6 @@ def main():
 
 
 if __name__ == "__main__":
-    swe.set_ephe_path('./ephe')
+    swe.set_ephe_path(EPHE_PATH)
     swe.set_sid_mode(swe.SIDM_LAHIRI)
     main()
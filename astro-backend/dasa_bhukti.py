@@ -1,12 +1,10 @@
 import pyswisseph as swe
 import datetime
 from collections import OrderedDict
-from openai import OpenAI
 import os
-from env_config import OPENAI_API_KEY
-
-# --- Load OpenAI API Key ---
-client = OpenAI(api_key=OPENAI_API_KEY)
+from ephe_loader import EPHE_PATH
+from llm_backends import get_llm_client
+from llm_limiter import LLMOverloaded, create_chat_completion
 
 # --- CONSTANTS ---
 nakshatras = [
@@ -38,7 +36,7 @@ dasa_durations = OrderedDict([
 ])
 
 # --- SWISS EPHEMERIS SETUP ---
-swe.set_ephe_path('./ephe')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 # --- HELPER FUNCTIONS ---
@@ -160,12 +158,15 @@ def ask_gpt_dasa_prediction(birth_info, dasa_table, planet_data):
     3. Spiritual guidance and remedies.
     """
     try:
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            get_llm_client(),
             model="gpt-4",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=1500
         )
         return response.choices[0].message.content.strip()
+    except LLMOverloaded:
+        raise
     except Exception as e:
         return f"GPT Error: {str(e)}"
\ No newline at end of file
@@ -1,44 +1,241 @@
+"""
+Swiss Ephemeris bundle: location, manifest, verification and backend report.
+
+The ephemeris files ship with the app in EPHE_PATH (astro-backend/ephe unless
+the EPHE_PATH variable says otherwise), the single path every module uses.
+ephe/manifest.json lists the files required for the supported date range and
+records the size, SHA-256 and covered years of each bundled file.
+
+When a file is missing, Swiss Ephemeris silently falls back to the Moshier
+approximation. At startup bundle_report() therefore verifies the bundle
+against the manifest and probes which backend actually serves the supported
+years (SWIEPH or MOSEPH). With EPHE_STRICT=1 a bad bundle stops the server;
+with EPHE_PRELOAD=1 the required files are pulled into the page cache so the
+first chart doesn't wait on disk. Nothing here touches the network at runtime.
+
+Maintenance commands (run from astro-backend/, commit the result):
+  python ephe_loader.py report              verify the bundle, show the backend
+  python ephe_loader.py fetch [files...]    download files (default: required ones)
+  python ephe_loader.py manifest            record checksums of the bundle
+"""
+
+import datetime
+import hashlib
+import json
+import mmap
 import os
-import urllib.request
+import re
+import sys
+
 import pyswisseph as swe
 
-# Correct URLs for ephemeris files
-EPHE_FILES = {
-    "seas_18.se1": "https://www.astro.com/ftp/swisseph/ephe/seas_18.se1",
-    "sepl_18.se1": "https://www.astro.com/ftp/swisseph/ephe/sepl_18.se1",
-    "semo_18.se1": "https://www.astro.com/ftp/swisseph/ephe/semo_18.se1"
-}
+EPHE_PATH = os.path.abspath(os.getenv("EPHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ephe")))
+MANIFEST_FILE = os.path.join(EPHE_PATH, "manifest.json")
+EPHE_BASE_URL = os.getenv("EPHE_BASE_URL", "https://www.astro.com/ftp/swisseph/ephe/")
+SUPPORTED_YEARS = tuple(int(y) for y in os.getenv("EPHE_SUPPORTED_YEARS", "1800:2400").split(":"))
+EPHE_STRICT = os.getenv("EPHE_STRICT", "0").lower() in ("1", "true", "yes")
+EPHE_PRELOAD = os.getenv("EPHE_PRELOAD", "0").lower() in ("1", "true", "yes")
 
+# Planets (sepl), Moon (semo), main asteroids (seas); one file per 600 years,
+# named after the starting century ("m" = BC): sepl_18 covers 1800-2400 AD
+KINDS = {"pl": "planets", "mo": "moon", "as": "asteroids"}
+REQUIRED_KINDS = ("pl", "mo", "as")
+_FILE_NAME = re.compile(r"^se(pl|mo|as)_?(m?)(\d+)\.se1$")
+FILE_SPAN_YEARS = 600
 
-def download_ephe_files():
-    """
-    Download ephemeris files if not already present.
-    """
-    ephe_dir = "ephe"
-    if not os.path.exists(ephe_dir):
-        os.makedirs(ephe_dir)
 
-    for filename, url in EPHE_FILES.items():
-        file_path = os.path.join(ephe_dir, filename)
-        if not os.path.exists(file_path):
-            print(f"Downloading {filename}...")
-            try:
-                urllib.request.urlretrieve(url, file_path)
-                print(f"Downloaded: {filename}")
-            except Exception as e:
-                print(f"Error downloading {filename}: {e}")
+# --- FILE NAMING ---
+def file_years(name):
+    """(first_year, end_year) covered by an ephemeris file, from its name."""
+    match = _FILE_NAME.match(name)
+    if not match:
+        return None
+    _, bc, century = match.groups()
+    start = int(century) * 100 * (-1 if bc else 1)
+    return start, start + FILE_SPAN_YEARS
+
+
+def file_name(kind, start_year):
+    century = start_year // 100
+    return f"se{kind}_{century:02d}.se1" if century >= 0 else f"se{kind}m{-century:02d}.se1"
+
+
+def required_files(years=SUPPORTED_YEARS):
+    """File names needed for SWIEPH precision over [first_year, end_year)."""
+    first, end = years
+    start = first - first % FILE_SPAN_YEARS
+    names = []
+    while start < end:
+        names.extend(file_name(kind, start) for kind in REQUIRED_KINDS)
+        start += FILE_SPAN_YEARS
+    return names
+
+
+# --- MANIFEST ---
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"supported_years": list(SUPPORTED_YEARS), "required": required_files(), "files": {}}
+
 
-    return ephe_dir
+def build_manifest():
+    """Manifest describing the files currently in EPHE_PATH."""
+    files = {}
+    for name in sorted(os.listdir(EPHE_PATH)):
+        years = file_years(name)
+        if years:
+            path = os.path.join(EPHE_PATH, name)
+            files[name] = {"kind": KINDS[name[2:4]], "years": list(years),
+                           "size": os.path.getsize(path), "sha256": sha256(path)}
+    return {"supported_years": list(SUPPORTED_YEARS), "required": required_files(), "files": files}
 
 
-def setup_swiss_ephemeris():
+def verify(manifest=None):
+    """{file: status} for every required or bundled file: ok, missing, corrupt or unverified."""
+    manifest = manifest or load_manifest()
+    names = list(dict.fromkeys(manifest["required"] + sorted(manifest["files"])))
+    status = {}
+    for name in names:
+        path = os.path.join(EPHE_PATH, name)
+        expected = manifest["files"].get(name)
+        if not os.path.exists(path):
+            status[name] = "missing"
+        elif expected is None:
+            status[name] = "unverified"
+        elif os.path.getsize(path) != expected["size"] or sha256(path) != expected["sha256"]:
+            status[name] = "corrupt"
+        else:
+            status[name] = "ok"
+    return status
+
+
+# --- BACKEND PROBE ---
+def probe_backend(years=None):
+    """{year: "SWIEPH" | "MOSEPH"} for Sun and Moon on 1 January of each year."""
+    first, end = SUPPORTED_YEARS
+    years = years or sorted({first, (first + end) // 2, datetime.date.today().year, end - 1})
+    swe.set_ephe_path(EPHE_PATH)
+    result = {}
+    for year in years:
+        jd = swe.julday(year, 1, 1, 0.0)
+        flags = [swe.calc_ut(jd, body, swe.FLG_SWIEPH)[1] for body in (swe.SUN, swe.MOON)]
+        result[year] = "SWIEPH" if all(flag & swe.FLG_SWIEPH for flag in flags) else "MOSEPH"
+    return result
+
+
+# --- PAGE CACHE ---
+def warm_page_cache(names):
+    """Touch every page of the given files through mmap; returns bytes warmed."""
+    warmed = 0
+    for name in names:
+        path = os.path.join(EPHE_PATH, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if hasattr(m, "madvise"):
+                    m.madvise(mmap.MADV_WILLNEED)
+                for offset in range(0, size, mmap.PAGESIZE):
+                    m[offset]
+        warmed += size
+    return warmed
+
+
+# --- STARTUP REPORT ---
+_report = None
+
+
+def bundle_report(log=True):
     """
-    Sets up Swiss Ephemeris with correct path.
+    Verify the bundle, probe the backend and (optionally) warm the page cache;
+    computed once per process and inherited by pre-forked workers. In strict
+    mode a bad bundle is never cached, so every call raises.
     """
-    ephe_dir = download_ephe_files()
-    swe.set_ephe_path(ephe_dir)
-    print(f"Swiss Ephemeris path set to: {ephe_dir}")
+    global _report
+    if _report is not None:
+        return _report
+
+    manifest = load_manifest()
+    files = verify(manifest)
+    probes = probe_backend()
+    backends = set(probes.values())
+    problems = [f"{name} {status}" for name, status in files.items()
+                if status in ("missing", "corrupt") and name in manifest["required"]]
+    problems += [f"{name} corrupt" for name, status in files.items()
+                 if status == "corrupt" and name not in manifest["required"]]
+    report = {
+        "path": EPHE_PATH,
+        "supported_years": manifest["supported_years"],
+        "backend": backends.pop() if len(backends) == 1 else "mixed",
+        "probes": probes,
+        "files": files,
+        "problems": problems,
+        "preloaded_bytes": warm_page_cache(manifest["required"]) if EPHE_PRELOAD else 0,
+    }
+
+    if log:
+        years = "-".join(str(y) for y in report["supported_years"])
+        print(f"Ephemeris: {report['backend']} for {years} from {EPHE_PATH}")
+        for problem in problems:
+            print(f"  ⚠️  {problem}")
+        if report["backend"] != "SWIEPH":
+            print("  ⚠️  falling back to Moshier: add the missing files with "
+                  "`python ephe_loader.py fetch` and commit them with the manifest")
+    if EPHE_STRICT and (problems or report["backend"] != "SWIEPH"):
+        raise RuntimeError(f"Ephemeris bundle incomplete ({', '.join(problems) or 'Moshier fallback'})")
+    _report = report
+    return _report
+
+
+# --- BUILD-TIME FETCH ---
+def fetch(names=None):
+    """Download files into EPHE_PATH (a build/maintenance step, never at runtime)."""
+    import urllib.request
+
+    os.makedirs(EPHE_PATH, exist_ok=True)
+    for name in names or required_files():
+        path = os.path.join(EPHE_PATH, name)
+        if os.path.exists(path):
+            continue
+        print(f"Downloading {name}...")
+        urllib.request.urlretrieve(EPHE_BASE_URL + name, path + ".part")
+        os.replace(path + ".part", path)
+
+
+def main(argv):
+    command = argv[0] if argv else "report"
+    if command == "fetch":
+        fetch(argv[1:])
+    elif command == "manifest":
+        manifest = build_manifest()
+        with open(MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {MANIFEST_FILE} ({len(manifest['files'])} files)")
+    elif command == "report":
+        report = bundle_report()
+        for name, status in report["files"].items():
+            print(f"  {status:<11}{name}")
+        print(f"  probes: {report['probes']}")
+        return 1 if report["problems"] else 0
+    else:
+        print(__doc__)
+        return 2
+    return 0
 
 
-# Automatically set up Swiss Ephemeris when imported
-setup_swiss_ephemeris()
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,58 @@
+"""
+House lordship per lagna, precomputed.
+
+There are only twelve lagnas, so at import every (lagna, house) pair is
+resolved to its sign and that sign's lord, and every (lagna, planet) pair
+to the houses the planet rules, all as integer tuples indexed by the
+lagna's sign index (0 = Mesha):
+
+  HOUSE_SIGN[lagna][house - 1]     sign index of the house (whole-sign)
+  HOUSE_LORD[lagna][house - 1]     lord of the house, an index into PLANETS
+  LORD_HOUSES[lagna][planet]       houses (1-12) a PLANETS index rules
+
+The analyzers look names up through the small helpers below instead of
+scanning `rasis` and rebuilding rotated sign lists per request.
+"""
+
+RASIS = [
+    "Mesha", "Rishaba", "Mithuna", "Kataka", "Simha", "Kanni",
+    "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
+]
+RASI_INDEX = {rasi: i for i, rasi in enumerate(RASIS)}
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+
+# sign index -> lord (PLANETS index)
+SIGN_LORDS = (2, 5, 3, 1, 0, 3, 5, 2, 4, 6, 6, 4)
+
+HOUSE_SIGN = tuple(tuple((lagna + house) % 12 for house in range(12)) for lagna in range(12))
+HOUSE_LORD = tuple(tuple(SIGN_LORDS[sign] for sign in signs) for signs in HOUSE_SIGN)
+LORD_HOUSES = tuple(
+    tuple(tuple(house + 1 for house, lord in enumerate(lords) if lord == planet) for planet in range(len(PLANETS)))
+    for lords in HOUSE_LORD
+)
+
+
+# --- LOOKUPS ---
+def sign_lord(sign):
+    """Lord of a sign (name or index)."""
+    return PLANETS[SIGN_LORDS[sign if isinstance(sign, int) else RASI_INDEX[sign]]]
+
+
+def house_sign(lagna, house):
+    """Sign name of `house` (1-12) for a lagna (name or index)."""
+    return RASIS[HOUSE_SIGN[lagna if isinstance(lagna, int) else RASI_INDEX[lagna]][house - 1]]
+
+
+def house_lord(lagna, house):
+    """Lord of `house` (1-12) for a lagna (name or index)."""
+    return PLANETS[HOUSE_LORD[lagna if isinstance(lagna, int) else RASI_INDEX[lagna]][house - 1]]
+
+
+def lord_houses(lagna, planet):
+    """Houses `planet` rules for a lagna (name or index); () for Rahu, Ketu and the outer planets."""
+    index = PLANET_INDEX.get(planet)
+    if index is None:
+        return ()
+    return LORD_HOUSES[lagna if isinstance(lagna, int) else RASI_INDEX[lagna]][index]
@@ -0,0 +1,79 @@
+"""
+HTTP caching for deterministic chart endpoints.
+
+Responses of the endpoints in CACHEABLE_PATHS depend only on their query
+parameters and the engine version, so each gets a strong ETag derived from
+the normalized inputs plus ENGINE_VERSION/AYANAMSA, and long-lived
+Cache-Control headers. A conditional GET whose If-None-Match matches is
+answered with 304 before any analyzer runs.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+
+from version import AYANAMSA, ENGINE_VERSION
+
+CACHEABLE_PATHS = {"/dasa", "/yogas", "/career", "/life_purpose", "/spouse", "/indu_dasa", "/vargas",
+                   "/ashtakavarga", "/shadbala"}
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "86400"))          # browsers: 1 day
+HTTP_CACHE_S_MAXAGE = int(os.getenv("HTTP_CACHE_S_MAXAGE", "2592000"))      # CDN: 30 days
+HTTP_CACHE_SWR = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", "86400"))
+
+CACHE_CONTROL = (
+    f"public, max-age={HTTP_CACHE_MAX_AGE}, s-maxage={HTTP_CACHE_S_MAXAGE}, "
+    f"stale-while-revalidate={HTTP_CACHE_SWR}"
+)
+
+
+def normalize_params(params):
+    """
+    Canonical form of the birth query parameters, so that e.g. lat=13.08 and
+    lat=13.080000 share an ETag. Returns None if the inputs cannot be parsed
+    (the endpoint then answers with its own validation error, uncached).
+    """
+    try:
+        dob = datetime.strptime(params["dob"], "%Y-%m-%d").strftime("%Y-%m-%d")
+        tob = datetime.strptime(params["tob"], "%H:%M").strftime("%H:%M")
+        normalized = {
+            "dob": dob,
+            "tob": tob,
+            "lat": f"{float(params['lat']):.6f}",
+            "lon": f"{float(params['lon']):.6f}",
+            "tz_offset": f"{float(params.get('tz_offset', 5.5)):.4f}",
+        }
+    except (KeyError, ValueError):
+        return None
+
+    for key in sorted(params):
+        if key not in normalized:
+            normalized[key] = params[key].strip().lower()
+    return normalized
+
+
+def compute_etag(path, params):
+    """Strong ETag for a cacheable GET, or None when it should not be cached."""
+    if path not in CACHEABLE_PATHS:
+        return None
+    normalized = normalize_params(params)
+    if normalized is None:
+        return None
+    canonical = "&".join(f"{k}={v}" for k, v in normalized.items())
+    digest = hashlib.sha256(f"{ENGINE_VERSION}|{AYANAMSA}|{path}?{canonical}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match comparison (RFC 9110: weak comparison, '*' matches anything)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_headers(etag):
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -1,9 +1,11 @@
 import pyswisseph as swe
 import datetime
 from collections import OrderedDict
+from ephe_loader import EPHE_PATH
+from house_lords import RASI_INDEX, house_sign, sign_lord
 
 # --- Setup Swiss Ephemeris ---
-swe.set_ephe_path('.')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 # --- Nakshatras & Rasis ---
@@ -20,13 +22,6 @@ rasis = [
     "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
 ]
 
-rasi_lords = {
-    "Mesha": "Mars", "Rishaba": "Venus", "Mithuna": "Mercury",
-    "Kataka": "Moon", "Simha": "Sun", "Kanni": "Mercury",
-    "Thula": "Venus", "Vrischika": "Mars", "Dhanus": "Jupiter",
-    "Makara": "Saturn", "Kumbha": "Saturn", "Meena": "Jupiter"
-}
-
 dasa_order = [
     "Ketu", "Venus", "Sun", "Moon", "Mars",
     "Rahu", "Jupiter", "Saturn", "Mercury"
@@ -71,8 +66,7 @@ def get_planet_positions(jd, lat, lon):
     return results
 
 def find_ninth_house(start_rasi):
-    idx = rasis.index(start_rasi)
-    return rasis[(idx + 8) % 12]
+    return house_sign(start_rasi, 9)
 
 def calculate_indu_lagnam(asc_rasi, moon_rasi):
     ninth_from_asc = find_ninth_house(asc_rasi)
@@ -81,7 +75,7 @@ def calculate_indu_lagnam(asc_rasi, moon_rasi):
     remainder = total % 12
     if remainder == 0:
         remainder = 12
-    indu_index = (rasis.index(moon_rasi) + (remainder - 1)) % 12
+    indu_index = (RASI_INDEX[moon_rasi] + (remainder - 1)) % 12
     return rasis[indu_index]
 
 def find_planets_in_rasi(planet_positions, target_rasi):
@@ -142,7 +136,7 @@ def get_indu_dasa(dob, tob, lat, lon, tz_offset=5.5):
     moon_rasi = planet_positions['Moon']['rasi']
 
     indu_lagnam = calculate_indu_lagnam(asc_rasi, moon_rasi)
-    indu_lord = rasi_lords[indu_lagnam]
+    indu_lord = sign_lord(indu_lagnam)
     planets_in_indu = find_planets_in_rasi(planet_positions, indu_lagnam)
 
     moon_long = planet_positions['Moon']['longitude']
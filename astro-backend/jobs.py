@@ -0,0 +1,324 @@
+"""
+Asynchronous report jobs: submit, poll, fetch, cancel.
+
+Full reports (every section, including the LLM interpretation) can outlast
+proxy timeouts, so POST /jobs only validates and enqueues the request and
+returns a job id. A small in-process worker pool (JOB_WORKERS threads) runs
+the sections one by one, recording progress after each; GET /jobs/{id}
+reports it and GET /jobs/{id}/result returns the finished report.
+
+Job state lives in an embedded SQLite table (JOB_STORE_PATH), not in process
+memory, so with pre-forked workers any worker can answer status, result and
+cancel calls for a job another worker is running. No broker is involved: the
+worker that accepted a job runs it. Identical requests (same birth, gender,
+sections and shaping) map to the same job id and share one run while it is
+pending or its result is fresh. Finished jobs expire after JOB_RESULT_TTL
+seconds. Cancellation is cooperative: a queued job never starts, a running
+one stops at the next section boundary. Jobs whose worker process exited
+mid-run are reported as failed and can be resubmitted.
+"""
+
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from compute_pool import ComputeOverloaded
+from llm_limiter import LLMOverloaded
+from report_stream import parse_sections
+from reports import SECTIONS, parse_birth_record
+from serialization import dumps, loads, shape_payload
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "64"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+PENDING = ("queued", "running")
+FINISHED = ("done", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request BLOB NOT NULL,
+    status TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL,
+    current TEXT,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result BLOB,
+    owner_pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+"""
+
+
+class JobError(ValueError):
+    """The job request is invalid."""
+
+
+def parse_job_request(body):
+    """
+    Validate a job body: birth fields as in a batch record, plus optional
+    "sections" (list or comma-separated; default: the full report) and
+    "compact". Returns (birth, sections, compact); raises JobError.
+    """
+    if not isinstance(body, dict):
+        raise JobError("Job body must be a JSON object")
+    try:
+        birth = parse_birth_record(body)
+        sections = body.get("sections") or ""
+        if isinstance(sections, list):
+            sections = ",".join(str(s) for s in sections)
+        sections = parse_sections(str(sections))
+    except ValueError as e:
+        raise JobError(str(e))
+    return birth, sections, bool(body.get("compact", False))
+
+
+def job_id(birth, sections, compact):
+    """Deterministic id, so identical requests land on the same job."""
+    canonical = f"{birth.key}|{birth.gender.lower()}|{','.join(sections)}|{int(compact)}"
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# --- STORE ---
+class JobStore:
+    """SQLite-backed job table; one connection per thread (and per process)."""
+
+    def __init__(self, path=JOB_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._inherited = []  # connections opened before a fork: never used or closed in the child
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if conn is not None:
+            self._inherited.append(conn)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, job):
+        """Current row for a job id, or None once unknown or expired."""
+        conn = self._conn()
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job,)).fetchone()
+        if row is None or (row["expires_at"] is not None and row["expires_at"] <= time.time()):
+            return None
+        if row["status"] in PENDING and row["owner_pid"] != os.getpid() and not _pid_alive(row["owner_pid"]):
+            self.finish(job, "failed", error="Worker exited before the job finished; resubmit it")
+            return self.get(job)
+        return row
+
+    def create(self, job, request, total):
+        """
+        Insert a queued job unless a live one with this id exists (pending,
+        or finished successfully and not yet expired). Returns (row, created).
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job,)).fetchone()
+            if row is not None and (row["status"] == "done" or
+                                    (row["status"] in PENDING and _pid_alive(row["owner_pid"]))):
+                conn.execute("COMMIT")
+                return row, False
+            conn.execute("INSERT OR REPLACE INTO jobs (id, request, status, total, owner_pid, created_at)"
+                         " VALUES (?, ?, 'queued', ?, ?, ?)", (job, dumps(request), total, os.getpid(), now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(job), True
+
+    def start(self, job):
+        """Queued -> running; False when the job was cancelled (or removed) meanwhile."""
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued' AND cancel = 0",
+            (time.time(), job))
+        return cursor.rowcount == 1
+
+    def progress(self, job, completed, current):
+        """Record progress; returns True when cancellation has been requested."""
+        conn = self._conn()
+        conn.execute("UPDATE jobs SET completed = ?, current = ? WHERE id = ?", (completed, current, job))
+        row = conn.execute("SELECT cancel FROM jobs WHERE id = ?", (job,)).fetchone()
+        return row is None or bool(row["cancel"])
+
+    def finish(self, job, status, result=None, error=None):
+        now = time.time()
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, current = NULL, finished_at = ?, expires_at = ?"
+            " WHERE id = ? AND status IN ('queued', 'running')",
+            (status, result, error, now, now + JOB_RESULT_TTL, job))
+
+    def cancel(self, job):
+        """
+        Cancel a pending job (queued: immediately; running: at its next section
+        boundary) or discard a finished one. Returns (row, discarded); row is
+        None for an unknown job.
+        """
+        conn = self._conn()
+        conn.execute("UPDATE jobs SET cancel = 1 WHERE id = ? AND status IN ('queued', 'running')", (job,))
+        row = self.get(job)
+        if row is None:
+            return None, False
+        if row["status"] == "queued":
+            self.finish(job, "cancelled", error="Cancelled before it started")
+            return self.get(job), False
+        if row["status"] in FINISHED:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job,))
+            return row, True
+        return row, False
+
+    def counts(self):
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+            (time.time(),)).fetchall()
+        return {status: count for status, count in rows}
+
+
+# --- WORKERS ---
+class JobManager:
+    """Runs jobs accepted by this process on a dedicated thread pool."""
+
+    def __init__(self, store, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def _pool(self):
+        # Created on first use: pool threads do not survive a fork
+        if self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            self._executor_pid = os.getpid()
+            self.pending = 0
+        return self._executor
+
+    def submit(self, birth, sections, compact=False):
+        """Enqueue a report job (or join the identical one); returns (status, created)."""
+        job = job_id(birth, sections, compact)
+        existing = self.store.get(job)
+        if existing is not None and existing["status"] in PENDING + ("done",):
+            self.deduplicated += 1
+            return status_view(existing), False
+        with self._lock:
+            pool = self._pool()
+            if self.pending >= self.max_pending:
+                raise ComputeOverloaded("jobs")
+            request = {"dob": birth.dob, "tob": birth.tob, "lat": birth.lat, "lon": birth.lon,
+                       "tz_offset": birth.tz_offset, "gender": birth.gender,
+                       "sections": list(sections), "compact": compact}
+            row, created = self.store.create(job, request, len(sections) + 1)
+            if not created:
+                self.deduplicated += 1
+                return status_view(row), False
+            self.pending += 1
+            self.submitted += 1
+            # Carry the caller's context (LLM priority class) into the worker thread
+            ctx = contextvars.copy_context()
+            pool.submit(ctx.run, self._run, job, birth, sections, compact)
+        return status_view(row), True
+
+    def _run(self, job, birth, sections, compact):
+        try:
+            if not self.store.start(job):
+                self.cancelled += 1
+                return
+            self._run_sections(job, birth, sections, compact)
+        except Exception as e:
+            self.failed += 1
+            self.store.finish(job, "failed", error=f"Job failed: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _run_sections(self, job, birth, sections, compact):
+        if self.store.progress(job, 0, "chart"):
+            return self._cancel(job)
+        chart = SECTIONS["chart"](birth)
+        result = {"id": job, "chart": shape_payload(chart, compact=compact, keep_chart=True)["chart"],
+                  "sections": {}, "errors": []}
+        for done, section in enumerate(sections, start=1):
+            if self.store.progress(job, done, section):
+                return self._cancel(job)
+            try:
+                result["sections"][section] = shape_payload(SECTIONS[section](birth))
+            except LLMOverloaded as e:
+                result["errors"].append({"section": section, "status": 503, "detail": str(e)})
+            except Exception as e:
+                result["errors"].append({"section": section, "status": 500, "detail": str(e)})
+        self.store.progress(job, len(sections) + 1, None)
+        self.store.finish(job, "done", result=dumps(result))
+        self.completed += 1
+
+    def _cancel(self, job):
+        self.cancelled += 1
+        self.store.finish(job, "cancelled", error="Cancelled while running")
+
+    def metrics(self):
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "jobs": self.store.counts(),
+        }
+
+
+def status_view(row):
+    """Client-facing job status (no request or result payload)."""
+    return {
+        "id": row["id"],
+        "status": row["status"],
+        "progress": {"completed": row["completed"], "total": row["total"], "current": row["current"]},
+        "sections": loads(row["request"])["sections"],
+        "cancel_requested": bool(row["cancel"]),
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "expires_at": row["expires_at"],
+    }
+
+
+JOBS = JobManager(JobStore())
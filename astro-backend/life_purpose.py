@@ -1,12 +1,12 @@
 import pyswisseph as swe
 import datetime
-from openai import OpenAI
 import os
-from env_config import OPENAI_API_KEY
-
-# --- OPENAI CONFIG ---
-# Load API key from environment variable for security
-client = OpenAI(api_key=OPENAI_API_KEY)
+from aspects import compute_aspects
+from ephe_loader import EPHE_PATH
+from house_lords import lord_houses, sign_lord
+from llm_backends import get_llm_client
+from llm_limiter import LLMOverloaded, create_chat_completion
+from shadbala import rank_planets
 
 # --- CONSTANTS ---
 rasis = [
@@ -28,19 +28,6 @@ planet_ids = {
     "Saturn": swe.SATURN, "Rahu": swe.MEAN_NODE, "Ketu": swe.MEAN_NODE
 }
 
-sign_lords = {
-    "Mesha": "Mars", "Rishaba": "Venus", "Mithuna": "Mercury",
-    "Kataka": "Moon", "Simha": "Sun", "Kanni": "Mercury",
-    "Thula": "Venus", "Vrischika": "Mars", "Dhanus": "Jupiter",
-    "Makara": "Saturn", "Kumbha": "Saturn", "Meena": "Jupiter"
-}
-
-aspects = {
-    "Mars": [4, 7, 8], "Jupiter": [5, 7, 9],
-    "Saturn": [3, 7, 10], "Rahu": [5, 7, 9],
-    "Ketu": [5, 7, 9]
-}
-
 purpose_significators = {
     "Sun": ["Soul purpose", "Leadership", "Self-realization"],
     "Moon": ["Emotional fulfillment", "Nurturing", "Mind's purpose"],
@@ -77,7 +64,7 @@ nakshatra_purposes = {
 }
 
 # --- SWISS EPHEMERIS INIT ---
-swe.set_ephe_path('.')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 # --- HELPER FUNCTIONS ---
@@ -118,13 +105,15 @@ def get_house_from_longitude(longitude, asc_deg):
     planet_rasi = int(longitude // 30)
     return (planet_rasi - lagna_rasi) % 12 + 1
 
-def analyze_life_purpose(data, asc_deg, cusps):
+def analyze_life_purpose(data, asc_deg, cusps, shadbala=None, aspects=None):
     purpose_houses = {1: cusps[0], 5: cusps[4], 9: cusps[8], 10: cusps[9], 12: cusps[11]}
+    lagna = data['Ascendant']['rasi']
     house_lords = {}
     for house_num, house_deg in purpose_houses.items():
-        sign = rasis[int(house_deg // 30)]
-        lord = sign_lords.get(sign)
-        house_lords[house_num] = {'sign': sign, 'lord': lord, 'position': data.get(lord)}
+        sign_idx = int(house_deg // 30)
+        lord = sign_lord(sign_idx)
+        house_lords[house_num] = {'sign': rasis[sign_idx], 'lord': lord, 'position': data.get(lord),
+                                  'rules': list(lord_houses(lagna, lord))}
 
     planets_in_purpose_houses = {h: [] for h in purpose_houses}
     for planet, info in data.items():
@@ -133,6 +122,10 @@ def analyze_life_purpose(data, asc_deg, cusps):
             if house in purpose_houses:
                 planets_in_purpose_houses[house].append(planet)
 
+    if aspects is None:
+        aspects = compute_aspects(data)
+    aspects_on_purpose_houses = {h: aspects.aspecting_house(h) for h in purpose_houses}
+
     all_planets = sorted(
         [(p, info['longitude'] % 30) for p, info in data.items() if p in planet_ids and p not in ['Rahu', 'Ketu']],
         key=lambda x: x[1], reverse=True
@@ -140,11 +133,20 @@ def analyze_life_purpose(data, asc_deg, cusps):
     atmakaraka = all_planets[0][0] if all_planets else None
     amatyakaraka = all_planets[1][0] if len(all_planets) > 1 else None
 
+    # Lords of and planets in the purpose houses, by six-fold strength
+    significators = None
+    if shadbala is not None:
+        candidates = [info['lord'] for info in house_lords.values()]
+        candidates += [p for planets in planets_in_purpose_houses.values() for p in planets]
+        significators = rank_planets(shadbala, candidates)
+
     return {
         'house_lords': house_lords,
         'planets_in_purpose_houses': planets_in_purpose_houses,
+        'aspects_on_purpose_houses': aspects_on_purpose_houses,
         'atmakaraka': atmakaraka,
         'amatyakaraka': amatyakaraka,
+        'significators': significators,
         'ascendant': data['Ascendant']['rasi'],
         'moon_sign': data['Moon']['rasi'],
         'moon_nakshatra': data['Moon']['nakshatra'],
@@ -158,11 +160,19 @@ def generate_purpose_report(analysis, data):
     report += f"\nSun Sign: {analysis['sun_sign']}"
     report += f"\nAtmakaraka: {analysis['atmakaraka']}"
     report += f"\nAmatyakaraka: {analysis['amatyakaraka']}"
+    if analysis.get('significators'):
+        strongest = analysis['significators'][0]
+        report += f"\nStrongest Purpose Significator: {strongest['planet']} ({strongest['rupas']} rupas)"
+    aspected = [f"House {house}: {', '.join(planets)}"
+                for house, planets in analysis.get('aspects_on_purpose_houses', {}).items() if planets]
+    if aspected:
+        report += f"\nAspects on Purpose Houses: {'; '.join(aspected)}"
     return report
 
 def ask_gpt(prompt):
     try:
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            get_llm_client(),
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You're a wise Vedic astrologer."},
@@ -172,5 +182,7 @@ def ask_gpt(prompt):
             max_tokens=2000
         )
         return response.choices[0].message.content.strip()
+    except LLMOverloaded:
+        raise
     except Exception as e:
         return f"GPT Error: {str(e)}"
@@ -0,0 +1,154 @@
+"""
+Pluggable interpretation backends.
+
+LLM_BACKEND=openai (default) talks to the real API. LLM_BACKEND=stub returns a
+deterministic, locally generated answer through the same
+client.chat.completions.create(...) interface, so load tests, benchmarks and
+offline runs need neither network access nor an API key.
+
+Stub settings:
+  LLM_STUB_LATENCY_MS      delay before the first token (default 0)
+  LLM_STUB_TOKENS_PER_SEC  generation speed, 0 = instant (default 0)
+  LLM_STUB_RESPONSE        str.format template, see StubChatClient.render
+  LLM_STUB_RESPONSE_FILE   file holding the template (overrides the above)
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+DEFAULT_STUB_TEMPLATE = (
+    "1. Personality\n"
+    "Stub interpretation {digest} generated by {model} for a {prompt_lines}-line prompt.\n"
+    "2. Career\n"
+    "Placeholder guidance derived from: {first_line}\n"
+    "3. Relationships\n"
+    "Placeholder relationship notes.\n"
+    "4. Remedies\n"
+    "Placeholder remedies."
+)
+
+
+# --- STUB RESPONSE OBJECTS (mirror the OpenAI SDK attributes we read) ---
+class _Message:
+    def __init__(self, content):
+        self.role = "assistant"
+        self.content = content
+
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, message=None, delta=None, finish_reason=None):
+        self.index = 0
+        self.message = message
+        self.delta = delta
+        self.finish_reason = finish_reason
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class _Completion:
+    def __init__(self, model, choices, usage=None):
+        self.model = model
+        self.choices = choices
+        self.usage = usage
+
+
+# --- STUB CLIENT ---
+class StubChatClient:
+    """Offline stand-in for openai.OpenAI with configurable latency and streaming."""
+
+    def __init__(self, latency_ms=0.0, tokens_per_sec=0.0, template=DEFAULT_STUB_TEMPLATE):
+        self.latency = latency_ms / 1000.0
+        self.tokens_per_sec = tokens_per_sec
+        self.template = template
+        self.chat = self
+        self.completions = self
+
+    @staticmethod
+    def render(template, model, messages):
+        """Fill the template; fields: model, prompt, prompt_lines, first_line, digest."""
+        prompt = messages[-1].get("content", "") if messages else ""
+        lines = prompt.splitlines() or [""]
+        return template.format(
+            model=model,
+            prompt=prompt,
+            prompt_lines=len(lines),
+            first_line=lines[0],
+            digest=hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12],
+        )
+
+    def create(self, model="stub", messages=(), stream=False, max_tokens=None, **_):
+        text = self.render(self.template, model, list(messages))
+        words = text.split(" ")
+        if max_tokens:
+            words = words[:max_tokens]
+            text = " ".join(words)
+        usage = _Usage(sum(len(m.get("content", "")) for m in messages) // 4, len(words))
+
+        if stream:
+            return self._stream(model, words)
+
+        time.sleep(self.latency + (len(words) / self.tokens_per_sec if self.tokens_per_sec else 0))
+        return _Completion(model, [_Choice(message=_Message(text), finish_reason="stop")], usage)
+
+    def _stream(self, model, words):
+        time.sleep(self.latency)
+        per_token = 1.0 / self.tokens_per_sec if self.tokens_per_sec else 0
+        for i, word in enumerate(words):
+            if per_token:
+                time.sleep(per_token)
+            yield _Completion(model, [_Choice(delta=_Delta(word if i == 0 else " " + word))])
+        yield _Completion(model, [_Choice(delta=_Delta(None), finish_reason="stop")])
+
+
+def _stub_template():
+    path = os.getenv("LLM_STUB_RESPONSE_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return os.getenv("LLM_STUB_RESPONSE", DEFAULT_STUB_TEMPLATE)
+
+
+# --- FACTORY ---
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    Return the process-wide chat client for the configured backend.
+
+    Created on first use (or by reports.warm_up at startup) so importing the
+    analyzers never pays for the openai SDK import. LLM_BACKEND is read here,
+    not at import, so a value from .env applies.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            backend = os.getenv("LLM_BACKEND", "openai").lower()
+            if backend == "stub":
+                _client = StubChatClient(
+                    latency_ms=float(os.getenv("LLM_STUB_LATENCY_MS", "0")),
+                    tokens_per_sec=float(os.getenv("LLM_STUB_TOKENS_PER_SEC", "0")),
+                    template=_stub_template(),
+                )
+            elif backend == "openai":
+                from openai import OpenAI
+                from env_config import OPENAI_API_KEY
+                _client = OpenAI(api_key=OPENAI_API_KEY)
+            else:
+                raise ValueError(f"Unknown LLM_BACKEND: {backend}")
+    return _client
@@ -0,0 +1,209 @@
+"""
+Admission control for upstream LLM calls.
+
+Every chat completion goes through create_chat_completion(), which waits in a
+bounded priority queue until both the requests-per-minute and the
+tokens-per-minute buckets have room. Paid callers are admitted ahead of free
+ones, 429 responses are retried with jittered backoff, and a full (or timed
+out) queue raises LLMOverloaded so the API can answer 503 right away instead
+of stacking up timeouts.
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+# --- CONFIGURATION ---
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "30000"))
+LLM_QUEUE_DEPTH = int(os.getenv("LLM_QUEUE_DEPTH", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "20.0"))
+
+# Lower value is admitted first
+PRIORITY_CLASSES = {"paid": 0, "free": 1}
+DEFAULT_PRIORITY = "free"
+
+# API keys whose requests are treated as paid traffic
+PAID_API_KEYS = {k.strip() for k in os.getenv("PAID_API_KEYS", "").split(",") if k.strip()}
+
+# Set per request by main.py, read when a completion is queued
+current_priority = contextvars.ContextVar("llm_priority", default=DEFAULT_PRIORITY)
+
+
+class LLMOverloaded(Exception):
+    """Raised when a completion cannot be admitted in time."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def priority_for_api_key(api_key):
+    """Map a caller's API key to its priority class."""
+    return "paid" if api_key and api_key in PAID_API_KEYS else DEFAULT_PRIORITY
+
+
+# --- TOKEN BUCKET ---
+class TokenBucket:
+    """Per-minute quota that refills continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+# --- ADMISSION QUEUE ---
+class LLMRateLimiter:
+    """Bounded priority queue in front of the RPM and TPM buckets."""
+
+    def __init__(self, rpm, tpm, max_queue_depth, queue_timeout):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self.stats = {"admitted": 0, "rejected": 0, "timed_out": 0, "retried": 0}
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def acquire(self, est_tokens, priority=DEFAULT_PRIORITY):
+        """Block until the call may proceed; raise LLMOverloaded otherwise."""
+        rank = PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES[DEFAULT_PRIORITY])
+        with self._cond:
+            if len(self._queue) >= self.max_queue_depth:
+                self.stats["rejected"] += 1
+                raise LLMOverloaded("LLM queue is full", retry_after=self._estimated_drain())
+
+            entry = (rank, next(self._seq), object())
+            heapq.heappush(self._queue, entry)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] is entry:
+                        wait = max(self.requests.wait_time(1, now),
+                                   self.tokens.wait_time(est_tokens, now))
+                        if wait == 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(est_tokens)
+                            heapq.heappop(self._queue)
+                            self.stats["admitted"] += 1
+                            self._cond.notify_all()
+                            return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.stats["timed_out"] += 1
+                        raise LLMOverloaded("Timed out waiting for LLM quota",
+                                            retry_after=self._estimated_drain())
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def settle(self, est_tokens, used_tokens):
+        """Return over-estimated tokens to the bucket once real usage is known."""
+        if used_tokens is None:
+            return
+        with self._cond:
+            if used_tokens < est_tokens:
+                self.tokens.refund(est_tokens - used_tokens)
+            else:
+                self.tokens.consume(used_tokens - est_tokens)
+            self._cond.notify_all()
+
+    def count_retry(self):
+        with self._cond:
+            self.stats["retried"] += 1
+
+    def _estimated_drain(self):
+        return max(1, int(len(self._queue) / max(self.requests.rate, 1e-9)))
+
+
+limiter = LLMRateLimiter(OPENAI_RPM, OPENAI_TPM, LLM_QUEUE_DEPTH, LLM_QUEUE_TIMEOUT)
+
+
+# --- HELPERS ---
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token estimate (~4 characters per token) plus the completion budget."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + len(messages) * 4 + (max_tokens or 1000)
+
+
+def _is_rate_limited(exc):
+    return getattr(exc, "status_code", None) == 429
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt, exc):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * 2 ** attempt))
+    server_hint = _retry_after(exc)
+    return max(delay, server_hint) if server_hint else delay
+
+
+def create_chat_completion(client, **kwargs):
+    """Rate-limited drop-in for client.chat.completions.create(**kwargs)."""
+    est = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+    priority = current_priority.get()
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        limiter.acquire(est, priority)
+        try:
+            response = client.chat.completions.create(**kwargs)
+        except Exception as e:
+            # A failed call (429, timeout, 5xx, connection error) is charged nothing; a retry acquires anew
+            limiter.settle(est, 0)
+            if not _is_rate_limited(e):
+                raise
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMOverloaded("OpenAI rate limit exceeded", retry_after=_retry_after(e)) from e
+            limiter.count_retry()
+            time.sleep(_backoff(attempt, e))
+            continue
+
+        usage = getattr(response, "usage", None)
+        limiter.settle(est, getattr(usage, "total_tokens", None))
+        return response
@@ -1,220 +1,666 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
 import datetime
 import os
 
+# .env before the modules below: each reads its settings at import
+from dotenv import load_dotenv
+load_dotenv()
+
+from batch import BatchError, iter_batch_results, parse_batch_body, validate_batch
+from cache import metrics as cache_metrics
+from chart_store import STORE
+from compute_pool import ComputeOverloaded, gate, run_compute, run_in_pool
+from compute_pool import metrics as compute_metrics
+from ephe_loader import bundle_report
+from http_cache import cache_headers, compute_etag, etag_matches
+from jobs import JOBS, JobError, parse_job_request, status_view
+from llm_limiter import LLMOverloaded, current_priority, limiter, priority_for_api_key
+from panchang import (PANCHANG_MAX_CELLS, PANCHANG_MAX_DAYS, boundaries, grid_span, iter_grid, parse_place,
+                      place_rows, validate_places)
+import memory_stats
+import profiling
+from report_stream import parse_sections, stream_report
+from riseset import metrics as riseset_metrics
+from reports import (BirthChart, ashtakavarga_section, career_section, chart_section, dasa_bhukti_section,
+                     dasa_section, indu_dasa_section, life_purpose_section, predict_section, shadbala_section,
+                     spouse_section, vargas_section, warm_up, yogas_section)
+from serialization import COMPACT_SCHEMA, FastJSONResponse, shape_payload
+from validation import sanitize_string, validate_birth_data, validate_gender
+from worker_stats import process_metrics
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1").lower() in ("1", "true", "yes")
+
+# --- Startup ---
+@asynccontextmanager
+async def lifespan(app):
+    """One-time warm-up on a cpu pool thread, before the first request is accepted."""
+    if STARTUP_WARMUP:
+        await run_in_pool("cpu", warm_up)
+    yield
+
 # --- FastAPI App ---
 app = FastAPI(
     title="Vedic Astrology API",
     description="A comprehensive Vedic astrology API with planetary calculations and AI-powered interpretations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# --- LLM Admission Control ---
+@app.middleware("http")
+async def llm_priority(request: Request, call_next):
+    """Tag the request with its LLM priority class (paid callers go first)."""
+    current_priority.set(priority_for_api_key(request.headers.get("X-API-Key")))
+    return await call_next(request)
+
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    headers = {"Retry-After": str(int(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={"detail": f"Interpretation service busy: {exc}"}, headers=headers)
+
+# --- Load Shedding ---
+@app.exception_handler(ComputeOverloaded)
+async def compute_overloaded(request: Request, exc: ComputeOverloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# --- HTTP Caching ---
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """ETag/Cache-Control for deterministic endpoints; 304 skips the analyzers entirely."""
+    if request.method != "GET":
+        return await call_next(request)
+    etag = compute_etag(request.url.path, dict(request.query_params))
+    if etag is None:
+        return await call_next(request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(cache_headers(etag))
+    return response
+
+# --- Request Profiling ---
+# Only installed when admin tokens are configured: no cost at all otherwise
+if profiling.ENABLED:
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        """Run an admin's request under the profiler when X-Profile (or ?profile=) asks for it."""
+        mode = profiling.requested_mode(request.headers, request.query_params)
+        if mode is None:
+            return await call_next(request)
+        if not profiling.authorized(request.headers.get("x-admin-token")):
+            return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token"})
+        try:
+            profile = profiling.start(mode, request.method, str(request.url.path) +
+                                      (f"?{request.url.query}" if request.url.query else ""))
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        token = profiling.current.set(profile)
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            profiling.current.reset(token)
+            profiling.finish(profile, status)
+        response.headers["X-Profile-Id"] = profile.id
+        return response
+
+    def require_admin(request: Request):
+        if not profiling.authorized(request.headers.get("x-admin-token")):
+            raise HTTPException(status_code=403, detail="Admin token required")
+
+    @app.get("/admin/profiles")
+    async def list_profiles(request: Request):
+        """
+        Recent request profiles, newest first.
+
+        While a profile runs, the stage wrappers and the shorter GIL switch
+        interval apply to the whole process, so concurrent requests slow down
+        (they are not recorded). Streaming responses are profiled only up to
+        their headers: the body's work is not captured.
+        """
+        require_admin(request)
+        return {"ring_size": profiling.PROFILE_RING_SIZE, "profiles": profiling.recent()}
+
+    @app.get("/admin/profiles/{profile_id}")
+    async def download_profile(profile_id: str, request: Request, format: str = "collapsed"):
+        """A stored profile as collapsed stacks (flamegraph.pl/speedscope input) or JSON with stage timings."""
+        require_admin(request)
+        profile = profiling.get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Unknown or evicted profile")
+        if format == "json":
+            return FastJSONResponse(profile.to_dict())
+        return Response(content=profile.collapsed(), media_type="text/plain",
+                        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'})
+
+# --- Memory Tracking ---
+# MEMORY_TRACE=1 only: tracemalloc slows every allocation
+if memory_stats.ENABLED:
+    memory_stats.start()
+
+    @app.middleware("http")
+    async def track_memory(request: Request, call_next):
+        """Peak/net allocations per route, until the last body chunk is sent."""
+        measurement = memory_stats.REQUESTS.begin()
+        try:
+            response = await call_next(request)
+        except BaseException:
+            memory_stats.REQUESTS.end(measurement, memory_stats.route_name(request.scope))
+            raise
+        body = response.body_iterator
+
+        async def measured_body():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                memory_stats.REQUESTS.end(measurement, memory_stats.route_name(request.scope))
+
+        response.body_iterator = measured_body()
+        return response
+
 # --- CORS Settings ---
+# Added last so it wraps every response, including 304s from conditional_get
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,https://ai-astrology.vercel.app").split(",")
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Id"],
 )
 
 @app.get("/")
-def root():
+async def root():
     return {
         "message":
-        "Astrology API is running. Endpoints: /test, /predict, /career, /dasa, /yogas, /life_purpose, /dasa_bhukti, /spouse, /indu_dasa."
+        "Astrology API is running. Endpoints: /test, /predict, /career, /dasa, /yogas, /life_purpose, /dasa_bhukti, /spouse, /indu_dasa, /vargas, /ashtakavarga, /shadbala. "
+        "Streaming report (SSE): /report/stream. Saved-chart queries: /cohort. "
+        "Report jobs: POST /jobs, then GET /jobs/{id} and /jobs/{id}/result (DELETE cancels). "
+        "Batch (POST, JSON array or NDJSON): /batch/chart, /batch/dasa, /batch/yogas, /batch/career. "
+        "Panchang: /panchang, POST /panchang/grid (NDJSON or CSV)."
+    }
+
+@app.get("/schema/compact")
+async def compact_schema():
+    """Index tables for decoding charts returned with compact=true."""
+    return COMPACT_SCHEMA
+
+@app.get("/metrics")
+async def metrics():
+    """Executor, queue, LLM admission, process, memory, ephemeris, chart store, cache, rise/set and job metrics."""
+    return {
+        "compute": compute_metrics(),
+        "llm": {**limiter.stats, "queue_depth": limiter.queue_depth()},
+        "process": process_metrics(),
+        "memory": memory_stats.metrics(),
+        "ephemeris": bundle_report(log=False),
+        "chart_store": STORE.metrics() if STORE else None,
+        "cache": cache_metrics(),
+        "riseset": riseset_metrics(),
+        "jobs": await run_in_pool("io", JOBS.metrics),
     }
 
 @app.get("/test")
-def test():
+async def test():
     """Simple test endpoint to verify server is running."""
     return {"status": "success", "message": "Server is running correctly!"}
 
 @app.get("/predict")
-def predict(dob: str,
-            tob: str,
-            lat: float,
-            lon: float,
-            tz_offset: float = 5.5):
+async def predict(dob: str,
+                  tob: str,
+                  lat: float,
+                  lon: float,
+                  tz_offset: float = 5.5,
+                  include_chart: bool = False,
+                  compact: bool = False):
     """Returns planetary positions and GPT-based predictions."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions, generate_gpt_prompt, get_astrology_interpretation
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        prompt = generate_gpt_prompt(data)
-        interpretation = get_astrology_interpretation(prompt)
-        return {"chart": data, "interpretation": interpretation}
+        birth = BirthChart(dob, tob, lat, lon, tz_offset)
+        # The chart on the CPU pool, then the LLM wait on the I/O pool, both within the predict gate
+        async with gate("predict").admit():
+            await run_in_pool("cpu", chart_section, birth)
+            payload = await run_in_pool("io", predict_section, birth)
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded, LLMOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/career")
-def career(dob: str,
-           tob: str,
-           lat: float,
-           lon: float,
-           tz_offset: float = 5.5):
+async def career(dob: str,
+                 tob: str,
+                 lat: float,
+                 lon: float,
+                 tz_offset: float = 5.5,
+                 include_chart: bool = False,
+                 compact: bool = False):
     """Returns career analysis and recommendations."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions
-        from carear import analyze_career, generate_career_report
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        career_analysis = analyze_career(data)
-        career_report = generate_career_report(career_analysis)
-        return {"chart": data, "career_analysis": career_analysis, "career_report": career_report}
+        payload = await run_compute("career", career_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/dasa")
-def dasa(dob: str,
-         tob: str,
-         lat: float,
-         lon: float,
-         tz_offset: float = 5.5):
+async def dasa(dob: str,
+               tob: str,
+               lat: float,
+               lon: float,
+               tz_offset: float = 5.5,
+               include_chart: bool = False,
+               compact: bool = False):
     """Returns Dasa periods and predictions."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions
-        from dasa import generate_dasa_table
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        dasa_table = generate_dasa_table(data)
-        return {"chart": data, "dasa_table": dasa_table}
+        payload = await run_compute("dasa", dasa_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/yogas")
-def yogas(dob: str,
-          tob: str,
-          lat: float,
-          lon: float,
-          tz_offset: float = 5.5):
+async def yogas(dob: str,
+                tob: str,
+                lat: float,
+                lon: float,
+                tz_offset: float = 5.5,
+                include_chart: bool = False,
+                compact: bool = False):
     """Returns detected Yogas and their effects."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions
-        from allyogas import detect_yogas
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        detected_yogas = detect_yogas(data)
-        return {"chart": data, "yogas": detected_yogas}
+        payload = await run_compute("yogas", yogas_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/life_purpose")
-def life_purpose(dob: str,
-                tob: str,
-                lat: float,
-                lon: float,
-                tz_offset: float = 5.5):
+async def life_purpose(dob: str,
+                       tob: str,
+                       lat: float,
+                       lon: float,
+                       tz_offset: float = 5.5,
+                       include_chart: bool = False,
+                       compact: bool = False):
     """Returns life purpose analysis and guidance."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions
-        from life_purpose import analyze_life_purpose, generate_purpose_report
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        purpose_analysis = analyze_life_purpose(data)
-        purpose_report = generate_purpose_report(purpose_analysis)
-        return {"chart": data, "purpose_analysis": purpose_analysis, "purpose_report": purpose_report}
+        payload = await run_compute("life_purpose", life_purpose_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/dasa_bhukti")
-def dasa_bhukti(dob: str,
-                tob: str,
-                lat: float,
-                lon: float,
-                tz_offset: float = 5.5):
+async def dasa_bhukti(dob: str,
+                      tob: str,
+                      lat: float,
+                      lon: float,
+                      tz_offset: float = 5.5,
+                      include_chart: bool = False,
+                      compact: bool = False):
     """Returns detailed Dasa-Bhukti periods and predictions."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from dasa_bhukti import get_planet_positions as get_dasa_positions, generate_dasa_table as generate_dasa_bhukti_table
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        data, _, _ = get_dasa_positions(dob, tob, lat, lon, tz_offset)
-        dasa_bhukti_table = generate_dasa_bhukti_table(data)
-        return {"chart": data, "dasa_bhukti_table": dasa_bhukti_table}
+        payload = await run_compute("dasa_bhukti", dasa_bhukti_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/spouse")
-def spouse(dob: str,
-          tob: str,
-          lat: float,
-          lon: float,
-          tz_offset: float = 5.5):
+async def spouse(dob: str,
+                 tob: str,
+                 lat: float,
+                 lon: float,
+                 tz_offset: float = 5.5,
+                 gender: str = "Male",
+                 include_chart: bool = False,
+                 compact: bool = False):
     """Returns spouse analysis and marriage predictions."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from spouse_analysis import get_planet_positions as get_spouse_positions, analyze_marriage, generate_report as spouse_report
-        
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
+        if not validate_gender(gender):
+            raise HTTPException(status_code=400, detail="Invalid gender. Use male, female or other")
         
-        data, _, _ = get_spouse_positions(dob, tob, lat, lon, tz_offset)
-        spouse_analysis = analyze_marriage(data)
-        spouse_report_text = spouse_report(spouse_analysis)
-        return {"chart": data, "spouse_analysis": spouse_analysis, "spouse_report": spouse_report_text}
+        payload = await run_compute("spouse", spouse_section, BirthChart(dob, tob, lat, lon, tz_offset, gender))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.get("/indu_dasa")
-def indu_dasa(dob: str,
-              tob: str,
-              lat: float,
-              lon: float,
-              tz_offset: float = 5.5):
+async def indu_dasa(dob: str,
+                    tob: str,
+                    lat: float,
+                    lon: float,
+                    tz_offset: float = 5.5,
+                    include_chart: bool = False,
+                    compact: bool = False):
     """Returns Indu Dasa periods and predictions."""
     try:
-        # Lazy import to avoid startup issues
-        from validation import validate_birth_data
-        from astrology import get_planet_positions
-        from indu_dasa import get_indu_dasa
+        is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_msg)
+        
+        payload = await run_compute("indu_dasa", indu_dasa_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.get("/vargas")
+async def vargas(dob: str,
+                 tob: str,
+                 lat: float,
+                 lon: float,
+                 tz_offset: float = 5.5,
+                 include_chart: bool = False,
+                 compact: bool = False):
+    """Returns all sixteen divisional charts (Shodasavarga) and the vargottama bodies."""
+    try:
+        is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_msg)
+        
+        payload = await run_compute("vargas", vargas_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.get("/shadbala")
+async def shadbala(dob: str,
+                   tob: str,
+                   lat: float,
+                   lon: float,
+                   tz_offset: float = 5.5,
+                   include_chart: bool = False,
+                   compact: bool = False):
+    """Returns the six-fold strength (Shadbala) of the seven planets."""
+    try:
+        is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_msg)
         
+        payload = await run_compute("shadbala", shadbala_section, BirthChart(dob, tob, lat, lon, tz_offset))
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.get("/ashtakavarga")
+async def ashtakavarga(dob: str,
+                       tob: str,
+                       lat: float,
+                       lon: float,
+                       tz_offset: float = 5.5,
+                       transit_start: str = None,
+                       transit_days: int = 365,
+                       include_chart: bool = False,
+                       compact: bool = False):
+    """Returns Bhinnashtakavarga and Sarvashtakavarga, and daily transit strength from transit_start."""
+    try:
         is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
+        if not 1 <= transit_days <= 3660:
+            raise HTTPException(status_code=400, detail="transit_days must be between 1 and 3660")
+        try:
+            start = datetime.date.fromisoformat(transit_start) if transit_start else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid transit_start. Use YYYY-MM-DD")
         
-        data, _, _ = get_planet_positions(dob, tob, lat, lon, tz_offset)
-        indu_dasa_table = get_indu_dasa(data)
-        return {"chart": data, "indu_dasa_table": indu_dasa_table}
+        payload = await run_compute("ashtakavarga", ashtakavarga_section, BirthChart(dob, tob, lat, lon, tz_offset),
+                                    start, transit_days)
+        return FastJSONResponse(shape_payload(payload, include_chart, compact))
+    except (HTTPException, ComputeOverloaded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+# --- Saved Profiles ---
+@app.get("/cohort")
+async def cohort(lagna: str = None,
+                 moon_rasi: str = None,
+                 moon_nakshatra: str = None,
+                 yoga: str = None,
+                 dasa_lord: str = None,
+                 on: str = None,
+                 limit: int = 100,
+                 offset: int = 0):
+    """Saved births matching the given chart features (names or table indices), via the chart store indexes."""
+    if STORE is None:
+        raise HTTPException(status_code=404, detail="Chart store is disabled")
+    try:
+        on_date = datetime.date.fromisoformat(on) if on else None
+        result = await run_compute("cohort", STORE.cohort, lagna, moon_rasi, moon_nakshatra, yoga,
+                                   dasa_lord, on_date, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(result)
+
+# --- Report Jobs ---
+@app.post("/jobs")
+async def submit_job(request: Request):
+    """
+    Enqueue a full report: birth fields as in a batch record, plus optional
+    "sections" and "compact". Returns 202 with the job status (200 when an
+    identical job is already pending or finished) and its Location.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Job body must be JSON")
+    try:
+        birth, sections, compact = parse_job_request(body)
+    except JobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    status, created = await run_in_pool("io", JOBS.submit, birth, sections, compact)
+    return JSONResponse(status_code=202 if created else 200,
+                        content={**status, "deduplicated": not created},
+                        headers={"Location": f"/jobs/{status['id']}"})
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status and progress (completed/total sections) of a job."""
+    row = await run_in_pool("io", JOBS.store.get, job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return status_view(row)
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """The finished report; 202 with the status while the job is still pending."""
+    row = await run_in_pool("io", JOBS.store.get, job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if row["status"] == "done":
+        return Response(content=row["result"], media_type="application/json")
+    if row["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail=row["error"])
+    if row["status"] == "failed":
+        raise HTTPException(status_code=500, detail=row["error"])
+    return JSONResponse(status_code=202, content=status_view(row), headers={"Retry-After": "1"})
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a pending job (a running one stops after its current section) or discard a finished one."""
+    row, discarded = await run_in_pool("io", JOBS.store.cancel, job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if discarded:
+        return Response(status_code=204)
+    return status_view(row)
+
+# --- Streaming Report ---
+@app.get("/report/stream")
+async def report_stream(dob: str,
+                        tob: str,
+                        lat: float,
+                        lon: float,
+                        tz_offset: float = 5.5,
+                        gender: str = "Male",
+                        sections: str = "",
+                        compact: bool = False):
+    """Full report as Server-Sent Events: the chart first, then each section as soon as it is ready."""
+    is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_msg)
+    if not validate_gender(gender):
+        raise HTTPException(status_code=400, detail="Invalid gender. Use male, female or other")
+    try:
+        names = parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    gate("report_stream").check()
+    birth = BirthChart(dob, tob, lat, lon, tz_offset, gender)
+    return StreamingResponse(stream_report(birth, names, compact),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# --- Batch Endpoints ---
+async def batch_response(request: Request, section: str):
+    """
+    Validate a JSON/NDJSON batch up front, then stream NDJSON results per record.
+    Query flags include_chart / compact shape each result like the GET endpoints.
+    """
+    gate("batch").check()
+    try:
+        records = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    validated = validate_batch(records)
+    include_chart = request.query_params.get("include_chart", "false").lower() in ("1", "true", "yes")
+    compact = request.query_params.get("compact", "false").lower() in ("1", "true", "yes")
+    return StreamingResponse(iter_batch_results(validated, section, include_chart, compact),
+                             media_type="application/x-ndjson")
+
+@app.post("/batch/chart")
+async def batch_chart(request: Request):
+    """Planetary charts for an array of birth records, streamed as NDJSON."""
+    return await batch_response(request, "chart")
+
+@app.post("/batch/dasa")
+async def batch_dasa(request: Request):
+    """Dasa tables for an array of birth records, streamed as NDJSON."""
+    return await batch_response(request, "dasa")
+
+@app.post("/batch/yogas")
+async def batch_yogas(request: Request):
+    """Yogas for an array of birth records, streamed as NDJSON."""
+    return await batch_response(request, "yogas")
+
+@app.post("/batch/career")
+async def batch_career(request: Request):
+    """Career analysis for an array of birth records, streamed as NDJSON."""
+    return await batch_response(request, "career")
+
+# --- Panchang ---
+PANCHANG_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def parse_panchang_range(start: str, days: int):
+    try:
+        start_date = datetime.date.fromisoformat(start)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start. Use YYYY-MM-DD")
+    if not 1 <= days <= PANCHANG_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {PANCHANG_MAX_DAYS}")
+    return start_date
+
+@app.get("/panchang")
+async def panchang(lat: float,
+                   lon: float,
+                   start: str,
+                   days: int = 1,
+                   tz_offset: float = 5.5,
+                   name: str = "",
+                   format: str = "json"):
+    """Daily panchang for one place: JSON, or streamed as NDJSON or CSV with format=."""
+    start_date = parse_panchang_range(start, days)
+    if format not in ("json", *PANCHANG_MEDIA_TYPES):
+        raise HTTPException(status_code=400, detail="format must be json, ndjson or csv")
+    try:
+        place = parse_place({"name": sanitize_string(name) or f"{lat},{lon}", "lat": lat, "lon": lon,
+                             "tz_offset": tz_offset}, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format != "json":
+        gate("panchang").check()
+        return StreamingResponse(iter_grid([place], start_date, days, format), media_type=PANCHANG_MEDIA_TYPES[format])
+
+    def compute():
+        return place_rows(place, start_date, days, boundaries(*grid_span(start_date, days)))
+    return FastJSONResponse({"place": place, "days": await run_compute("panchang", compute)})
+
+@app.post("/panchang/grid")
+async def panchang_grid(request: Request):
+    """
+    Daily panchang for a JSON array or NDJSON of places ({name, lat, lon,
+    tz_offset}) and the days from ?start= (&days=, default 365), streamed
+    one place at a time as NDJSON (default) or CSV (&format=csv).
+    """
+    try:
+        days = int(request.query_params.get("days", "365"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="days must be an integer")
+    start_date = parse_panchang_range(request.query_params.get("start", ""), days)
+    fmt = request.query_params.get("format", "ndjson")
+    if fmt not in PANCHANG_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    gate("panchang").check()
+    try:
+        records = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    if len(records) * days > PANCHANG_MAX_CELLS:
+        raise HTTPException(status_code=413, detail=f"Grid too large: {len(records) * days} place-days "
+                                                    f"(max {PANCHANG_MAX_CELLS})")
+    places = validate_places(records)
+    errors = [f"{i}: {p}" for i, p in enumerate(places) if isinstance(p, str)]
+    if errors and fmt == "csv":
+        raise HTTPException(status_code=400, detail=f"Invalid places: {'; '.join(errors[:10])}")
+    return StreamingResponse(iter_grid(places, start_date, days, fmt), media_type=PANCHANG_MEDIA_TYPES[fmt])
@@ -0,0 +1,106 @@
+"""
+Allocation figures per request type, from tracemalloc, for /metrics.
+
+With MEMORY_TRACE=1 tracemalloc runs for the life of the process and every
+request records, per route ("/dasa", "/jobs/{job_id}", ...), the peak of
+Python allocations above what was live when it started and the net amount
+it left allocated (caches filled, leaks). Streaming responses are measured
+until their last chunk is sent.
+
+tracemalloc counts every thread, so a figure is only attributable while a
+request runs alone: requests that overlap another one are counted as
+`overlapped` and left out of the averages. Background work (report jobs,
+the pre-fork warm-up) still lands in whatever request is running.
+Tracing costs CPU and memory on every allocation, so it is off by default
+and meant for diagnosing RSS growth, not for normal serving.
+"""
+
+import os
+import threading
+import tracemalloc
+
+MEMORY_TRACE = os.getenv("MEMORY_TRACE", "0").lower() in ("1", "true", "yes")
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+
+ENABLED = MEMORY_TRACE
+
+
+def start():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+
+class Measurement:
+    __slots__ = ("start", "overlapped")
+
+    def __init__(self, overlapped):
+        self.start = 0
+        self.overlapped = overlapped
+
+
+class RequestMemory:
+    """Peak and net Python allocations per route, for requests that ran alone."""
+
+    def __init__(self):
+        self.routes = {}
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            alone = not self._active
+            for other in self._active:
+                other.overlapped = True
+            measurement = Measurement(overlapped=not alone)
+            self._active.add(measurement)
+            if alone:
+                tracemalloc.reset_peak()
+                measurement.start = tracemalloc.get_traced_memory()[0]
+            return measurement
+
+    def end(self, measurement, route):
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self._active.discard(measurement)
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {"requests": 0, "measured": 0, "overlapped": 0,
+                                              "peak_total": 0, "peak_max": 0, "net_total": 0, "net_max": 0}
+            stats["requests"] += 1
+            if measurement.overlapped:
+                stats["overlapped"] += 1
+                return
+            peak, net = peak - measurement.start, current - measurement.start
+            stats["measured"] += 1
+            stats["peak_total"] += peak
+            stats["peak_max"] = max(stats["peak_max"], peak)
+            stats["net_total"] += net
+            stats["net_max"] = max(stats["net_max"], net)
+
+    def metrics(self):
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current = tracemalloc.get_traced_memory()[0]
+        with self._lock:
+            routes = {}
+            for route, s in sorted(self.routes.items()):
+                n = s["measured"] or 1
+                routes[route] = {
+                    "requests": s["requests"], "measured": s["measured"], "overlapped": s["overlapped"],
+                    "peak_kb_mean": round(s["peak_total"] / n / 1024, 1), "peak_kb_max": round(s["peak_max"] / 1024, 1),
+                    "net_kb_mean": round(s["net_total"] / n / 1024, 1), "net_kb_max": round(s["net_max"] / 1024, 1),
+                }
+        return {"tracing": True, "traced_kb": round(current / 1024, 1),
+                "tracemalloc_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1), "routes": routes}
+
+
+REQUESTS = RequestMemory()
+
+
+def route_name(scope):
+    """Route template of a handled request ("/jobs/{job_id}"); unmatched paths share one bucket."""
+    return getattr(scope.get("route"), "path", None) or "(unmatched)"
+
+
+def metrics():
+    return REQUESTS.metrics() if ENABLED else {"tracing": False}
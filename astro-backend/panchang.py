@@ -0,0 +1,220 @@
+"""
+Panchang: tithi, vara, nakshatra, yoga and karana at sunrise, with the time
+each ends, plus sunrise and sunset, for a grid of places and days.
+
+The end of an element is an instant, the same everywhere, so for a date
+range every boundary of every element is found once, by Newton's method on
+the Moon's and Sun's sidereal longitudes (both always advance, so each root
+is bracketed by the previous one). A place's day is then its sunrise looked
+up in those boundary lists. Sunrise and sunset come from the shared rise/set
+cache (riseset.py), per local mean date and geohash cell; a civil date is
+looked up as the mean date containing its noon, which is the civil date
+itself unless the timezone is far from the longitude (UTC+14 at 157 W).
+Grids stream as NDJSON or CSV, one place at a time.
+"""
+
+import bisect
+import csv
+import datetime
+import io
+import os
+
+import astrology
+import riseset
+from compute_pool import gate, run_in_pool
+from serialization import dumps
+from validation import validate_coordinates, validate_tz_offset
+
+PANCHANG_MAX_DAYS = int(os.getenv("PANCHANG_MAX_DAYS", "732"))
+PANCHANG_MAX_CELLS = int(os.getenv("PANCHANG_MAX_CELLS", "500000"))  # places x days per grid
+
+VARAS = ["Ravivara", "Somavara", "Mangalavara", "Budhavara", "Guruvara", "Shukravara", "Shanivara"]
+_TITHI_NAMES = ["Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi", "Saptami",
+                "Ashtami", "Navami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi"]
+TITHIS = ([f"Shukla {name}" for name in _TITHI_NAMES] + ["Purnima"] +
+          [f"Krishna {name}" for name in _TITHI_NAMES] + ["Amavasya"])
+YOGAS = [
+    "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda", "Sukarma", "Dhriti",
+    "Shula", "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata",
+    "Variyana", "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti"
+]
+_MOVABLE_KARANAS = ["Bava", "Balava", "Kaulava", "Taitila", "Gara", "Vanija", "Vishti"]
+KARANAS = ["Kimstughna"] + [_MOVABLE_KARANAS[i % 7] for i in range(56)] + ["Shakuni", "Chatushpada", "Naga"]
+
+# element -> (names, degrees per element); tithi and karana run on the Moon-Sun elongation,
+# nakshatra on the Moon, yoga on the sum of both
+ELEMENTS = {
+    "tithi": (TITHIS, 12.0),
+    "nakshatra": (astrology.nakshatras, 360 / 27),
+    "yoga": (YOGAS, 360 / 27),
+    "karana": (KARANAS, 6.0),
+}
+CSV_COLUMNS = ["place", "date", "sunrise", "sunset", "vara"] + [
+    column for element in ELEMENTS for column in (element, f"{element}_ends")]
+
+_J2000 = datetime.datetime(2000, 1, 1, 12)
+_J2000_JD = 2451545.0
+
+
+def _midnight(date, tz_offset):
+    """UT Julian Day of local midnight starting `date`."""
+    return _J2000_JD + (date - _J2000.date()).days - 0.5 - tz_offset / 24
+
+
+# --- SUN AND MOON ---
+def _angles(jd):
+    """{element: (angle, degrees per day)} at jd (UT)."""
+    import pyswisseph as swe
+
+    flags = swe.FLG_SIDEREAL | swe.FLG_SPEED
+    sun = swe.calc_ut(jd, swe.SUN, flags)[0]
+    moon = swe.calc_ut(jd, swe.MOON, flags)[0]
+    elongation = ((moon[0] - sun[0]) % 360, moon[3] - sun[3])
+    return {"tithi": elongation, "karana": elongation, "nakshatra": (moon[0], moon[3]),
+            "yoga": ((sun[0] + moon[0]) % 360, sun[3] + moon[3])}
+
+
+def _crossing(element, target, jd):
+    """Newton's method from jd: the instant the element's angle reaches `target`."""
+    for _ in range(12):
+        angle, rate = _angles(jd)[element]
+        step = ((target - angle + 180) % 360 - 180) / rate
+        jd += step
+        if abs(step) < 1e-6:  # 0.1 s
+            break
+    return jd
+
+
+def boundaries(start_jd, end_jd):
+    """
+    {element: (end instants, element indices)} covering start_jd..end_jd: the
+    element with index indices[i] is current until ends[i].
+    """
+    astrology.configure_engine()
+    at_start = _angles(start_jd)
+    table = {}
+    for element, (names, span) in ELEMENTS.items():
+        angle, rate = at_start[element]
+        index = int(angle // span)
+        jd, ends, indices = start_jd, [], []
+        while jd <= end_jd:
+            target = (index + 1) * span % 360
+            jd = _crossing(element, target, jd + ((target - angle) % 360) / rate)
+            ends.append(jd)
+            indices.append(index)
+            index, angle = (index + 1) % len(names), target
+            rate = _angles(jd)[element][1]
+        table[element] = (ends, indices)
+    return table
+
+
+def _local(jd, tz_offset):
+    """UT Julian Day -> local datetime, to the minute."""
+    moment = _J2000 + datetime.timedelta(days=jd - _J2000_JD, hours=tz_offset)
+    return (moment + datetime.timedelta(seconds=30)).replace(second=0, microsecond=0)
+
+
+def sun_times(date, lat, lon, tz_offset):
+    """(sunrise, sunset) UT Julian Days on a civil date, from the rise/set cache."""
+    noon = _midnight(date, tz_offset) + 0.5
+    return riseset.sun_times(datetime.date.fromordinal(riseset.local_date_ordinal(noon, lon)), lat, lon)
+
+
+# --- GRID ---
+def place_rows(place, start, days, table):
+    """
+    Panchang of one place ({"name", "lat", "lon", "tz_offset"}) for `days`
+    days from `start`, from the boundary table. Without a sunrise (polar
+    day or night) the elements are taken at 6:00 local time.
+    """
+    lat, lon, tz_offset = place["lat"], place["lon"], place["tz_offset"]
+    rows = []
+    for offset in range(days):
+        date = start + datetime.timedelta(days=offset)
+        sunrise, sunset = sun_times(date, lat, lon, tz_offset)
+        moment = sunrise if sunrise is not None else _midnight(date, tz_offset) + 0.25
+        row = {
+            "place": place["name"],
+            "date": date.isoformat(),
+            "sunrise": sunrise and _local(sunrise, tz_offset).strftime("%H:%M"),
+            "sunset": sunset and _local(sunset, tz_offset).strftime("%H:%M"),
+            "vara": VARAS[date.toordinal() % 7],  # ordinal 7 is a Sunday
+        }
+        for element, (names, _) in ELEMENTS.items():
+            ends, indices = table[element]
+            i = bisect.bisect_right(ends, moment)
+            row[element] = {"number": indices[i] + 1, "name": names[indices[i]],
+                            "ends": _local(ends[i], tz_offset).isoformat(timespec="minutes")}
+        rows.append(row)
+    return rows
+
+
+def grid_span(start, days):
+    """UT Julian Days bracketing every sunrise of the grid, in any timezone."""
+    first = _midnight(start, 14) - 0.5
+    return first, _midnight(start, -12) + days + 0.5
+
+
+def parse_place(record, index):
+    """A grid record -> {"name", "lat", "lon", "tz_offset"}; raises ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError("Record must be a JSON object")
+    if "lat" not in record or "lon" not in record:
+        raise ValueError("Missing fields: lat, lon")
+    try:
+        lat, lon = float(record["lat"]), float(record["lon"])
+        tz_offset = float(record.get("tz_offset", 5.5))
+    except (TypeError, ValueError):
+        raise ValueError("lat, lon and tz_offset must be numbers")
+    if not validate_coordinates(lat, lon):
+        raise ValueError("Invalid coordinates")
+    if not validate_tz_offset(tz_offset):
+        raise ValueError("Invalid timezone offset")
+    return {"name": str(record.get("name", index)), "lat": lat, "lon": lon, "tz_offset": tz_offset}
+
+
+def validate_places(records):
+    """Validate all places up front: returns a list of place dicts or error messages."""
+    validated = []
+    for index, record in enumerate(records):
+        if isinstance(record, ValueError):  # a line that was not JSON
+            validated.append(str(record))
+            continue
+        try:
+            validated.append(parse_place(record, index))
+        except ValueError as e:
+            validated.append(str(e))
+    return validated
+
+
+def _csv_lines(rows, header=False):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow([row["place"], row["date"], row["sunrise"] or "", row["sunset"] or "", row["vara"]] +
+                        [value for element in ELEMENTS for value in (row[element]["name"], row[element]["ends"])])
+    return out.getvalue().encode()
+
+
+async def iter_grid(places, start, days, fmt="ndjson"):
+    """
+    Stream the grid one place at a time, each computed on the cpu pool as the
+    stream is consumed; invalid places become {index, error} lines (the
+    caller rejects them up front for CSV). The whole stream holds a single
+    "panchang" gate slot.
+    """
+    async with gate("panchang").admit():
+        table = await run_in_pool("cpu", boundaries, *grid_span(start, days))
+        if fmt == "csv":
+            yield _csv_lines([], header=True)
+        for index, place in enumerate(places):
+            if isinstance(place, str):
+                yield dumps({"index": index, "error": place}) + b"\n"
+                continue
+            rows = await run_in_pool("cpu", place_rows, place, start, days, table)
+            if fmt == "csv":
+                yield _csv_lines(rows)
+            else:
+                yield b"".join(dumps(row) + b"\n" for row in rows)
@@ -0,0 +1,340 @@
+"""
+On-demand profiling of single requests, for admins.
+
+A request carrying `X-Profile: sample` (or `trace`; `?profile=` works too)
+and a valid `X-Admin-Token` runs under a profiler, gets an `X-Profile-Id`
+response header, and its profile is kept in a bounded ring buffer
+(PROFILE_RING_SIZE) for download from /admin/profiles. Two modes:
+
+  sample  a background thread samples the request's worker threads every
+          PROFILE_SAMPLE_INTERVAL_MS; low overhead, statistical
+  trace   deterministic sys.setprofile tracing of the request's work,
+          including C calls; exact call paths, slower
+
+Profiles are collapsed stacks ("frame;frame;frame weight", the input
+format of flamegraph.pl, speedscope and inferno), weighted by samples or by
+microseconds of self time, plus wall time per annotated stage. Stages are
+Swiss Ephemeris calls (swe.calc_ut, swe.houses_ex), the analyzers, the LLM
+interpretation and response serialization; they appear in the stacks as
+"[stage]" frames.
+
+Nothing is instrumented unless a profile is running: the stage wrappers,
+the compute-pool hook and a shorter GIL switch interval (so the sampler
+gets to run) are installed when the first profile starts and removed when
+the last one ends, and with PROFILE_ADMIN_TOKENS unset the middleware is
+not installed at all. The current profile travels with the
+request in a contextvar, which the compute pool already propagates to its
+threads. Work other requests do while a profile runs is not recorded.
+
+Limitations: the stage wrappers and the switch interval are process-wide,
+so while a profile runs every concurrent request goes through the wrappers
+and switches threads more often (slower, never recorded). A streaming
+response's profile ends when its headers are sent, so the work of
+producing the body (/report/stream, /panchang/grid) is not captured.
+"""
+
+import collections
+import contextvars
+import hmac
+import importlib
+import os
+import sys
+import threading
+import time
+import uuid
+
+PROFILE_ADMIN_TOKENS = [t.strip() for t in os.getenv("PROFILE_ADMIN_TOKENS", "").split(",") if t.strip()]
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "32"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+
+ENABLED = bool(PROFILE_ADMIN_TOKENS)
+MODES = ("sample", "trace")
+
+# (module, attribute, stage name); "Class.method" attributes patch the class
+STAGES = [
+    ("pyswisseph", "calc_ut", "swe.calc_ut"),
+    ("pyswisseph", "houses_ex", "swe.houses_ex"),
+    ("dasa", "generate_dasa_table", "dasa.generate_dasa_table"),
+    ("dasa_bhukti", "generate_dasa_table", "dasa_bhukti.generate_dasa_table"),
+    ("indu_dasa", "get_indu_dasa", "indu_dasa.get_indu_dasa"),
+    ("allyogas", "detect_yogas", "detect_yogas"),
+    ("carear", "analyze_career", "analyze_career"),
+    ("carear", "generate_career_report", "generate_career_report"),
+    ("life_purpose", "analyze_life_purpose", "analyze_life_purpose"),
+    ("life_purpose", "generate_purpose_report", "generate_purpose_report"),
+    ("spouse_analysis", "analyze_marriage", "analyze_marriage"),
+    ("astrology", "get_astrology_interpretation", "llm.interpretation"),
+    ("chart_store", "ChartStore.load", "chart_store.load"),
+    ("cache", "Cache.get_or_compute", "cache"),
+    ("serialization", "dumps", "serialization"),
+]
+
+current = contextvars.ContextVar("profile", default=None)
+
+
+def requested_mode(headers, query_params):
+    """Profiling mode asked for by the request, or None."""
+    mode = headers.get("x-profile") or query_params.get("profile")
+    if not mode:
+        return None
+    mode = mode.strip().lower()
+    return "sample" if mode in ("1", "true", "yes") else mode
+
+
+def authorized(token):
+    return bool(token) and any(hmac.compare_digest(token, t) for t in PROFILE_ADMIN_TOKENS)
+
+
+def _label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+# --- PROFILE ---
+class Profile:
+    """Collapsed stacks and stage timings for one request."""
+
+    def __init__(self, mode, method, target):
+        self.id = uuid.uuid4().hex[:16]
+        self.mode = mode
+        self.method = method
+        self.target = target
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.status = None
+        self.stacks = collections.Counter()
+        self.stages = {}
+        self.samples = 0
+        self._stage_stacks = {}  # thread id -> names of the stages open on it
+        self._threads = set()    # threads currently running this request's work
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    # Stage annotations (called by the wrappers, on any thread)
+    def enter_stage(self, name):
+        self._stage_stacks.setdefault(threading.get_ident(), []).append(name)
+        return time.perf_counter()
+
+    def exit_stage(self, name, started):
+        elapsed = time.perf_counter() - started
+        self._stage_stacks[threading.get_ident()].pop()
+        with self._lock:
+            calls, total = self.stages.get(name, (0, 0.0))
+            self.stages[name] = (calls + 1, total + elapsed)
+
+    # Pool work
+    def run(self, fn, *args):
+        """Run fn on this (pool) thread under the profiler."""
+        thread = threading.get_ident()
+        if self.mode == "trace":
+            tracer = _Tracer(self)
+            sys.setprofile(tracer)
+            try:
+                return fn(*args)
+            finally:
+                sys.setprofile(None)
+                tracer.flush()
+        self._threads.add(thread)
+        try:
+            return fn(*args)
+        finally:
+            self._threads.discard(thread)
+
+    # Sampling
+    def start_sampler(self):
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name=f"profile-{self.id}", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+        while not self._stop.wait(interval):
+            frames = sys._current_frames()
+            for thread in list(self._threads):
+                frame = frames.get(thread)
+                if frame is not None:
+                    self._record_sample(thread, frame)
+
+    def _record_sample(self, thread, frame):
+        chain = []
+        while frame is not None:
+            chain.append(frame)
+            frame = frame.f_back
+        chain.reverse()
+        # Drop the pool machinery above Profile.run
+        for i, f in enumerate(chain):
+            if f.f_code is _RUN_CODE:
+                chain = chain[i + 1:]
+                break
+        stages = list(self._stage_stacks.get(thread, ()))
+        labels, open_stage = [], 0
+        for f in chain:
+            if f.f_code is _WRAPPER_CODE:
+                labels.append(f"[{stages[open_stage]}]" if open_stage < len(stages) else "[stage]")
+                open_stage += 1
+            else:
+                labels.append(_label(f.f_code))
+        with self._lock:
+            self.stacks[";".join(labels)] += 1
+            self.samples += 1
+
+    def finish(self, status):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.status = status
+        self.duration_ms = round((time.time() - self.started_at) * 1000, 2)
+
+    # Output
+    def collapsed(self):
+        """Collapsed-stack text: one "frame;frame;... weight" line per stack."""
+        return "".join(f"{stack} {weight}\n" for stack, weight in sorted(self.stacks.items()))
+
+    def summary(self):
+        return {"id": self.id, "mode": self.mode, "method": self.method, "target": self.target,
+                "status": self.status, "started_at": self.started_at, "duration_ms": self.duration_ms,
+                "samples": self.samples, "stacks": len(self.stacks),
+                "weight": "samples" if self.mode == "sample" else "microseconds"}
+
+    def to_dict(self):
+        stages = {name: {"calls": calls, "total_ms": round(total * 1000, 3)}
+                  for name, (calls, total) in sorted(self.stages.items(), key=lambda item: -item[1][1])}
+        return {**self.summary(), "stages": stages, "collapsed": self.collapsed()}
+
+
+class _Tracer:
+    """sys.setprofile callback accumulating self time (microseconds) per call path."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.stack = []           # [label, started, child_time]
+        self.stacks = collections.Counter()
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "call":
+            code = frame.f_code
+            label = f"[{frame.f_locals.get('name', 'stage')}]" if code is _WRAPPER_CODE else _label(code)
+            self.stack.append([label, now, 0.0])
+        elif event == "c_call":
+            self.stack.append([f"{getattr(arg, '__module__', None) or 'builtins'}:{arg.__qualname__}", now, 0.0])
+        elif event in ("return", "c_return", "c_exception") and self.stack:
+            label, started, child = self.stack[-1]
+            path = ";".join(entry[0] for entry in self.stack)
+            self.stack.pop()
+            elapsed = now - started
+            self.stacks[path] += (elapsed - child) * 1e6
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def flush(self):
+        with self.profile._lock:
+            for path, micros in self.stacks.items():
+                self.profile.stacks[path] += max(1, round(micros))
+
+
+# --- INSTRUMENTATION ---
+def _annotate(name, fn):
+    def annotated(*args, **kwargs):
+        profile = current.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        started = profile.enter_stage(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.exit_stage(name, started)
+    annotated.__wrapped__ = fn
+    return annotated
+
+
+_WRAPPER_CODE = _annotate("", None).__code__
+_RUN_CODE = Profile.run.__code__
+
+_installed = []  # (owner, attribute, original)
+_active = 0
+_install_lock = threading.Lock()
+
+
+def _profiled_pool_run(self, ctx, fn, args):
+    profile = ctx.get(current)
+    if profile is not None:
+        fn, args = profile.run, (fn, *args)
+    return _original_pool_run(self, ctx, fn, args)
+
+
+def _install():
+    global _original_pool_run
+    import compute_pool
+
+    for module_name, attribute, name in STAGES:
+        try:
+            owner = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        *path, attr = attribute.split(".")
+        for part in path:
+            owner = getattr(owner, part)
+        original = getattr(owner, attr)
+        # Methods are patched on the class, and must stay plain functions there
+        setattr(owner, attr, _annotate(name, original))
+        _installed.append((owner, attr, original))
+    _original_pool_run = compute_pool.ComputePool._run
+    compute_pool.ComputePool._run = _profiled_pool_run
+    _installed.append((compute_pool.ComputePool, "_run", _original_pool_run))
+    # The sampler needs the GIL at least once per interval (default switch interval: 5 ms)
+    _installed.append((sys, "switchinterval", sys.getswitchinterval()))
+    sys.setswitchinterval(min(sys.getswitchinterval(), PROFILE_SAMPLE_INTERVAL_MS / 1000))
+
+
+def _uninstall():
+    while _installed:
+        owner, attr, original = _installed.pop()
+        if owner is sys:
+            sys.setswitchinterval(original)
+        else:
+            setattr(owner, attr, original)
+
+
+# --- RING BUFFER ---
+_profiles = collections.OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def start(mode, method, target):
+    """Begin profiling a request (instrumenting on the first concurrent profile)."""
+    global _active
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode: {mode}. Use {' or '.join(MODES)}")
+    with _install_lock:
+        if _active == 0:
+            _install()
+        _active += 1
+    profile = Profile(mode, method, target)
+    profile.start_sampler()
+    return profile
+
+
+def finish(profile, status):
+    """Stop profiling, store the profile (evicting the oldest) and uninstrument if idle."""
+    global _active
+    profile.finish(status)
+    with _install_lock:
+        _active -= 1
+        if _active == 0:
+            _uninstall()
+    with _profiles_lock:
+        _profiles[profile.id] = profile
+        while len(_profiles) > PROFILE_RING_SIZE:
+            _profiles.popitem(last=False)
+
+
+def get(profile_id):
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def recent():
+    with _profiles_lock:
+        return [p.summary() for p in reversed(_profiles.values())]
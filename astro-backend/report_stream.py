@@ -0,0 +1,92 @@
+"""
+Progressive report streaming over Server-Sent Events.
+
+The chart is computed once and sent first; every other section then runs
+concurrently and is pushed as its own SSE message the moment it finishes, so
+the page can render fast sections without waiting for the LLM. Finished
+messages pass through a small bounded queue: when the client reads slowly,
+section tasks block on the queue instead of piling up encoded payloads.
+
+Wire format (one event per section, named after it):
+  event: career
+  data: {"career_analysis": ..., "career_report": ...}
+Failures arrive as `event: error` with {"section", "status", "detail"}, and
+the stream ends with `event: done`.
+"""
+
+import asyncio
+import os
+
+from compute_pool import gate, run_in_pool
+from llm_limiter import LLMOverloaded
+from reports import SECTIONS
+from serialization import dumps, shape_payload
+
+STREAM_SECTIONS = ("yogas", "dasa", "career", "life_purpose", "dasa_bhukti", "spouse", "indu_dasa", "vargas",
+                   "ashtakavarga", "shadbala", "predict")
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "2"))
+
+
+def parse_sections(value):
+    """Comma-separated section names -> validated tuple (all sections when empty)."""
+    if not value:
+        return STREAM_SECTIONS
+    names = tuple(dict.fromkeys(n.strip() for n in value.split(",") if n.strip()))
+    unknown = [n for n in names if n not in STREAM_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}. Choose from {', '.join(STREAM_SECTIONS)}")
+    return names
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f"event: {event}".encode()]
+    if event_id is not None:
+        lines.append(f"id: {event_id}".encode())
+    lines.append(b"data: " + dumps(data))
+    return b"\n".join(lines) + b"\n\n"
+
+
+async def _compute(section, birth):
+    # The interpretation waits on the LLM; everything else is chart math
+    kind = "io" if section == "predict" else "cpu"
+    return await run_in_pool(kind, SECTIONS[section], birth)
+
+
+async def stream_report(birth, sections=STREAM_SECTIONS, compact=False):
+    """SSE frames for one report; the stream holds a single "report_stream" gate slot."""
+    async with gate("report_stream").admit():
+        async for frame in _stream_frames(birth, sections, compact):
+            yield frame
+
+
+async def _stream_frames(birth, sections, compact):
+    """Chart first, then sections as they finish."""
+    try:
+        chart = await _compute("chart", birth)
+    except Exception as e:
+        yield sse_event("error", {"section": "chart", "status": 500, "detail": str(e)})
+        return
+    yield sse_event("chart", shape_payload(chart, compact=compact, keep_chart=True), event_id=0)
+
+    queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    async def run(section):
+        try:
+            payload = await _compute(section, birth)
+            frame = ("section", section, shape_payload(payload))
+        except LLMOverloaded as e:
+            frame = ("error", section, {"section": section, "status": 503, "detail": str(e)})
+        except Exception as e:
+            frame = ("error", section, {"section": section, "status": 500, "detail": str(e)})
+        await queue.put(frame)
+
+    tasks = [asyncio.create_task(run(section)) for section in sections]
+    try:
+        for event_id in range(1, len(tasks) + 1):
+            kind, section, data = await queue.get()
+            yield sse_event(section if kind == "section" else "error", data, event_id=event_id)
+        yield sse_event("done", {"sections": len(tasks)})
+    finally:
+        # Client went away (or we finished): stop anything still pending
+        for task in tasks:
+            task.cancel()
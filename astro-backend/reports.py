@@ -0,0 +1,299 @@
+"""
+Report sections shared by the single-chart and batch endpoints.
+
+A BirthChart computes the Julian Day and the base profile (chart, dasa table,
+yogas) once, or loads it from the chart store; each section function turns
+it into the payload its endpoint returns. Swiss Ephemeris settings are
+thread-local, so every section configures the engine for the thread it runs
+on (a no-op after the first call on that thread) before any analyzer
+touches it.
+"""
+
+import functools
+import sqlite3
+import threading
+
+import astrology
+import allyogas
+import ashtakavarga
+import aspects
+import cache
+import carear
+import dasa
+import dasa_bhukti
+import indu_dasa
+import life_purpose
+import shadbala
+import spouse_analysis
+from chart_store import STORE, birth_key
+from validation import validate_birth_data, validate_gender
+from vargas import compute_vargas, vargottama
+
+
+def memoized(compute):
+    """
+    Property computed once per BirthChart under that chart's own lock.
+    functools.cached_property on Python < 3.12 takes one lock for every
+    instance, which serialized distinct births across the CPU pool.
+    """
+    name = compute.__name__
+
+    @functools.wraps(compute)
+    def get(self):
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self.__dict__:
+                self.__dict__[name] = compute(self)
+            return self.__dict__[name]
+    return property(get)
+
+
+class BirthChart:
+    """Birth data plus lazily computed (or stored), shared chart state."""
+
+    store = STORE
+    use_cache = True
+
+    def __init__(self, dob, tob, lat, lon, tz_offset=5.5, gender="Male"):
+        self.dob = dob
+        self.tob = tob
+        self.lat = lat
+        self.lon = lon
+        self.tz_offset = tz_offset
+        self.gender = gender
+        self._lock = threading.RLock()
+
+    @memoized
+    def jd(self):
+        return astrology.get_julian_day(self.dob, self.tob, self.tz_offset)
+
+    @memoized
+    def key(self):
+        return birth_key(self.dob, self.tob, self.lat, self.lon, self.tz_offset)
+
+    def cached(self, layer, name, compute):
+        """compute() through the shared cache, keyed by this birth."""
+        if not self.use_cache:
+            return compute()
+        return cache.get_or_compute(layer, (name, self.key), compute)
+
+    @memoized
+    def profile(self):
+        """Chart, ascendant, cusps, dasa table and yogas: shared cache, then chart store, then computed."""
+        return self.cached("chart", "profile", lambda: self._stored_profile(self.store))
+
+    def _stored_profile(self, store):
+        key = self.key
+        if store is not None:
+            try:
+                saved = store.load(key)
+                if saved is not None:
+                    return saved
+            except sqlite3.Error as e:
+                store.errors += 1
+                print(f"Chart store unavailable: {e}")
+                store = None
+
+        data, asc_deg, cusps = astrology.get_planet_positions(self.dob, self.tob, self.lat, self.lon, self.tz_offset)
+        _, _, dasa_table = dasa.generate_dasa_table(self.jd, data['Moon']['longitude'])
+        # The yogas need the vargas and aspects too: compute them once and keep them on the chart
+        vargas = self.__dict__["vargas"] = compute_vargas(data)
+        matrix = self.__dict__["aspects"] = aspects.compute_aspects(data)
+        profile = {"chart": data, "asc_deg": asc_deg, "cusps": list(cusps),
+                   "dasa_table": dasa_table, "yogas": allyogas.detect_yogas(data, vargas, matrix)}
+        if store is not None:
+            try:
+                store.save(key, self, profile)
+            except sqlite3.Error as e:
+                store.errors += 1
+                print(f"Chart store write failed: {e}")
+        return profile
+
+    @memoized
+    def vargas(self):
+        """All sixteen divisional charts of the profile's chart."""
+        return compute_vargas(self.data)
+
+    @memoized
+    def ashtakavarga(self):
+        """Bhinnashtakavarga and Sarvashtakavarga of the profile's chart."""
+        return ashtakavarga.compute_ashtakavarga(self.data)
+
+    @memoized
+    def aspects(self):
+        """Graha drishti matrix of the profile's chart, shared by the analyzers."""
+        return aspects.compute_aspects(self.data)
+
+    @memoized
+    def shadbala(self):
+        """Six-fold planetary strength, computed once and shared by the analyzers."""
+        astrology.configure_engine()
+        return shadbala.compute_shadbala(self.jd, self.lat, self.lon, self.data, self.cusps, self.vargas)
+
+    @property
+    def data(self):
+        return self.profile["chart"]
+
+    @property
+    def asc_deg(self):
+        return self.profile["asc_deg"]
+
+    @property
+    def cusps(self):
+        return self.profile["cusps"]
+
+
+def parse_birth_record(record):
+    """
+    Build a BirthChart from a batch record (dict).
+    Raises ValueError with a client-facing message when the record is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be a JSON object")
+    missing = [k for k in ("dob", "tob", "lat", "lon") if k not in record]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    try:
+        lat = float(record["lat"])
+        lon = float(record["lon"])
+        tz_offset = float(record.get("tz_offset", 5.5))
+    except (TypeError, ValueError):
+        raise ValueError("lat, lon and tz_offset must be numbers")
+    dob, tob = str(record["dob"]), str(record["tob"])
+    gender = str(record.get("gender", "Male"))
+
+    is_valid, error_msg = validate_birth_data(dob, tob, lat, lon, tz_offset)
+    if not is_valid:
+        raise ValueError(error_msg)
+    if not validate_gender(gender):
+        raise ValueError("Invalid gender. Use male, female or other")
+    return BirthChart(dob, tob, lat, lon, tz_offset, gender)
+
+
+# --- SECTIONS ---
+def chart_section(birth):
+    return {"chart": birth.data}
+
+
+def predict_section(birth):
+    prompt = astrology.generate_gpt_prompt(birth.data)
+    interpretation = astrology.get_astrology_interpretation(prompt)
+    return {"chart": birth.data, "interpretation": interpretation}
+
+
+def career_section(birth):
+    analysis = carear.analyze_career(birth.data, birth.asc_deg, birth.cusps, birth.gender, birth.vargas,
+                                      birth.shadbala, birth.aspects)
+    report = carear.generate_career_report(analysis, birth.asc_deg)
+    return {"chart": birth.data, "career_analysis": analysis, "career_report": report}
+
+
+def dasa_section(birth):
+    return {"chart": birth.data, "dasa_table": birth.profile["dasa_table"]}
+
+
+def yogas_section(birth):
+    return {"chart": birth.data, "yogas": birth.profile["yogas"]}
+
+
+def vargas_section(birth):
+    return {"chart": birth.data, "vargas": birth.vargas, "vargottama": vargottama(birth.vargas)}
+
+
+def shadbala_section(birth):
+    return {"chart": birth.data, "shadbala": birth.shadbala}
+
+
+def ashtakavarga_section(birth, transit_start=None, transit_days=365):
+    """BAV and SAV; with transit_start (a date), daily transit strength for transit_days days."""
+    payload = {"chart": birth.data, "ashtakavarga": birth.ashtakavarga}
+    if transit_start is not None:
+        def compute():
+            return ashtakavarga.transit_signs(transit_start, transit_days, birth.tz_offset)
+        # The same for every birth in the timezone, so shared across charts
+        key = ("transit_signs", transit_start.isoformat(), transit_days, birth.tz_offset)
+        signs = cache.get_or_compute("chart", key, compute) if birth.use_cache else compute()
+        payload["transits"] = {"start": transit_start.isoformat(), "days": transit_days,
+                               **ashtakavarga.transit_strength(birth.ashtakavarga, signs)}
+    return payload
+
+
+def life_purpose_section(birth):
+    analysis = life_purpose.analyze_life_purpose(birth.data, birth.asc_deg, birth.cusps, birth.shadbala,
+                                                 birth.aspects)
+    report = life_purpose.generate_purpose_report(analysis, birth.data)
+    return {"chart": birth.data, "purpose_analysis": analysis, "purpose_report": report}
+
+
+def dasa_bhukti_section(birth):
+    def compute():
+        astrology.configure_engine()
+        data, _, _ = dasa_bhukti.get_planet_positions(birth.jd, birth.lat, birth.lon)
+        table = dasa_bhukti.generate_dasa_table(birth.jd, data['Moon']['longitude'])
+        return {"chart": data, "dasa_bhukti_table": table}
+    return birth.cached("dasa", "dasa_bhukti", compute)
+
+
+def spouse_section(birth):
+    astrology.configure_engine()
+    data, asc_deg = spouse_analysis.get_planet_positions(birth.jd, birth.lat, birth.lon)
+    house_aspects = spouse_analysis.get_aspects(data, birth.aspects)
+    analysis = spouse_analysis.analyze_marriage(data, asc_deg, house_aspects, birth.gender)
+    return {"chart": data, "spouse_analysis": analysis, "spouse_report": spouse_analysis.generate_report(analysis)}
+
+
+def indu_dasa_section(birth):
+    def compute():
+        astrology.configure_engine()
+        return indu_dasa.get_indu_dasa(birth.dob, birth.tob, birth.lat, birth.lon, birth.tz_offset)
+    table = birth.cached("dasa", "indu_dasa", compute)
+    return {"chart": birth.data, "indu_dasa_table": table}
+
+
+SECTIONS = {
+    "chart": chart_section,
+    "predict": predict_section,
+    "career": career_section,
+    "dasa": dasa_section,
+    "yogas": yogas_section,
+    "life_purpose": life_purpose_section,
+    "dasa_bhukti": dasa_bhukti_section,
+    "spouse": spouse_section,
+    "indu_dasa": indu_dasa_section,
+    "vargas": vargas_section,
+    "ashtakavarga": ashtakavarga_section,
+    "shadbala": shadbala_section,
+}
+
+# --- WARM-UP ---
+WARMUP_BIRTH = ("1990-01-01", "12:00", 13.0827, 80.2707, 5.5)
+
+
+def warm_up():
+    """
+    Verify the ephemeris bundle, load the rise/set table, run every
+    chart-only section once and build the LLM client, so the first real
+    request pays for none of it. Called explicitly: at app startup on a cpu
+    pool thread, and by start_prefork.py in the master before forking. A
+    client that cannot be built (no OPENAI_API_KEY) is only logged: the
+    interpretation endpoints fail on first use, as without the warm-up.
+    """
+    from ephe_loader import bundle_report
+    from llm_backends import get_llm_client
+    from riseset import RISESET
+
+    bundle_report()
+    RISESET.preload()
+    birth = BirthChart(*WARMUP_BIRTH)
+    # Exercise the compute path itself, and keep the synthetic birth out of the store
+    birth.store, birth.use_cache = None, False
+    for name, compute in SECTIONS.items():
+        if name != "predict":  # the only section that calls the LLM
+            compute(birth)
+    try:
+        get_llm_client()
+    except (ImportError, ValueError) as e:
+        print(f"LLM client not built at warm-up: {e}")
@@ -0,0 +1,199 @@
+"""
+Sunrise and sunset per local date and place, memoized across users.
+
+swe.rise_trans is the slowest call on the panchang and Shadbala paths and
+is repeated for every user in the same city on the same day, so results
+are cached per (date, geohash cell). Each cell is computed at its centre,
+so every place in a cell gets the same times whoever asked first;
+RISESET_GEOHASH_PRECISION=6 (about 1.2 x 0.6 km) keeps that within a few
+seconds of the exact place. The date is the local mean date at the cell,
+so the key needs no timezone. Sunrise is Hindu rising (disc centre, no
+refraction); either event is None when it does not happen on that date.
+
+The LRU holds RISESET_CACHE_SIZE entries. RISESET_TABLE names an optional
+precomputed table (gzipped JSON) for the busiest cities, consulted before
+the LRU and never evicted:
+
+  python riseset.py build cities.json [--start 2026-01-01] [--days 400] [--out riseset_table.json.gz]
+
+where cities.json is a JSON array of {name, lat, lon}.
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import astrology
+
+RISESET_GEOHASH_PRECISION = int(os.getenv("RISESET_GEOHASH_PRECISION", "6"))
+RISESET_CACHE_SIZE = int(os.getenv("RISESET_CACHE_SIZE", "100000"))
+RISESET_TABLE = os.getenv("RISESET_TABLE", "")
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_J2000_ORDINAL = datetime.date(2000, 1, 1).toordinal()
+_J2000_JD = 2451545.0
+
+
+# --- GEOHASH ---
+def geohash_cell(lat, lon, precision=RISESET_GEOHASH_PRECISION):
+    """(geohash, centre latitude, centre longitude) of the cell containing lat/lon."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits, bounds[0] = bits * 2 + 1, mid
+        else:
+            bits, bounds[1] = bits * 2, mid
+        even, count = not even, count + 1
+        if count == 5:
+            chars.append(_BASE32[bits])
+            bits = count = 0
+    return "".join(chars), sum(lat_range) / 2, sum(lon_range) / 2
+
+
+# --- COMPUTATION ---
+def local_midnight(ordinal, lon):
+    """UT Julian Day of local mean midnight starting the date with this ordinal at longitude lon."""
+    return _J2000_JD + (ordinal - _J2000_ORDINAL) - 0.5 - lon / 360
+
+
+def local_date_ordinal(jd, lon):
+    """Ordinal of the local mean date at longitude lon containing the UT Julian Day jd."""
+    return math.floor(jd + 0.5 + lon / 360 - _J2000_JD) + _J2000_ORDINAL
+
+
+def compute_sun_times(ordinal, lat, lon):
+    """(sunrise, sunset) UT Julian Days on a local mean date, uncached."""
+    import pyswisseph as swe
+
+    astrology.configure_engine()
+    midnight = local_midnight(ordinal, lon)
+    flag = swe.BIT_HINDU_RISING
+    res, times = swe.rise_trans(midnight, swe.SUN, swe.CALC_RISE | flag, (lon, lat, 0))
+    sunrise = times[0] if res == 0 and times[0] < midnight + 1 else None
+    res, times = swe.rise_trans(sunrise or midnight, swe.SUN, swe.CALC_SET | flag, (lon, lat, 0))
+    sunset = times[0] if res == 0 and times[0] < midnight + 1 else None
+    return sunrise, sunset
+
+
+# --- CACHE ---
+class RiseSetCache:
+    """Thread-safe LRU of (sunrise, sunset) per (date ordinal, geohash cell), over an optional pinned table."""
+
+    def __init__(self, max_entries=RISESET_CACHE_SIZE, precision=RISESET_GEOHASH_PRECISION, table_path=""):
+        self.max_entries = max_entries
+        self.precision = precision
+        self.table_path = table_path
+        self._table = None  # loaded on first use
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "table_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, date, lat, lon):
+        """(sunrise, sunset) on `date` (a datetime.date, local) at the cell containing lat/lon."""
+        cell, cell_lat, cell_lon = geohash_cell(lat, lon, self.precision)
+        key = (date.toordinal(), cell)
+        table = self._table if self._table is not None else self.preload()
+        if key in table:
+            self.stats["table_hits"] += 1
+            return table[key]
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            self.stats["misses"] += 1
+        value = compute_sun_times(key[0], cell_lat, cell_lon)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return value
+
+    def preload(self):
+        """Load the precomputed table now (reports.warm_up does, before workers fork)."""
+        with self._lock:
+            if self._table is None:
+                self._table = load_table(self.table_path, self.precision) if self.table_path else {}
+            return self._table
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "table_entries": len(self._table or ()), "precision": self.precision}
+
+
+# --- PRECOMPUTED TABLE ---
+def build_table(cities, start, days, precision=RISESET_GEOHASH_PRECISION):
+    """{"precision", "start", "days", "cells": {geohash: [[sunrise, sunset], ...]}} for the cities' cells."""
+    cells = {}
+    for city in cities:
+        cell, cell_lat, cell_lon = geohash_cell(float(city["lat"]), float(city["lon"]), precision)
+        if cell not in cells:
+            cells[cell] = [list(compute_sun_times(start.toordinal() + day, cell_lat, cell_lon))
+                           for day in range(days)]
+    return {"precision": precision, "start": start.isoformat(), "days": days, "cells": cells}
+
+
+def load_table(path, precision):
+    """The table at `path` as {(date ordinal, cell): (sunrise, sunset)}; empty if unusable."""
+    try:
+        with gzip.open(path, "rt") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Rise/set table {path} not loaded: {e}")
+        return {}
+    if data.get("precision") != precision:
+        print(f"Rise/set table {path} has geohash precision {data.get('precision')}, not {precision}; ignored")
+        return {}
+    first = datetime.date.fromisoformat(data["start"]).toordinal()
+    return {(first + day, cell): tuple(times)
+            for cell, rows in data["cells"].items() for day, times in enumerate(rows)}
+
+
+RISESET = RiseSetCache(table_path=RISESET_TABLE)
+
+
+def sun_times(date, lat, lon):
+    return RISESET.get(date, lat, lon)
+
+
+def metrics():
+    return RISESET.metrics()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Precompute a rise/set table for RISESET_TABLE.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("cities", help="JSON array of {name, lat, lon}")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, default=datetime.date.today())
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--out", default="riseset_table.json.gz")
+    args = parser.parse_args(argv)
+    with open(args.cities) as f:
+        cities = json.load(f)
+    table = build_table(cities, args.start, args.days)
+    with gzip.open(args.out, "wt") as f:
+        json.dump(table, f)
+    print(f"Wrote {args.out}: {len(table['cells'])} cells x {args.days} days from {args.start}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,104 @@
+"""
+Response encoding for chart payloads.
+
+Endpoints return FastJSONResponse objects, which are encoded once with orjson
+(falling back to the standard json module) instead of going through FastAPI's
+jsonable_encoder walk. The bulky `chart` block is dropped unless the client
+asks for it with include_chart=true, and compact=true swaps it for integer
+rows described by COMPACT_SCHEMA (served at /schema/compact).
+"""
+
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# --- COMPACT ENCODING TABLES ---
+BODY_NAMES = [
+    "Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
+    "Uranus", "Neptune", "Pluto", "Rahu", "Ketu", "Ascendant",
+    "Rahu (True)", "Ketu (True)", "Rahu (Mean)", "Ketu (Mean)"
+]
+
+RASI_NAMES = [
+    "Mesha", "Rishaba", "Mithuna", "Kataka", "Simha", "Kanni",
+    "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
+]
+
+NAKSHATRA_NAMES = [
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
+    "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni",
+    "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha",
+    "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"
+]
+
+COMPACT_FIELDS = ["body", "longitude_arcsec", "rasi", "nakshatra", "pada", "retrograde"]
+
+COMPACT_SCHEMA = {
+    "fields": COMPACT_FIELDS,
+    "body": BODY_NAMES,
+    "rasi": RASI_NAMES,
+    "nakshatra": NAKSHATRA_NAMES,
+    "longitude_arcsec": "sidereal longitude in whole arc-seconds (0-1295999)",
+    "retrograde": "1 = retrograde, 0 = direct, null = not applicable",
+}
+
+_BODY_INDEX = {name: i for i, name in enumerate(BODY_NAMES)}
+_RASI_INDEX = {name: i for i, name in enumerate(RASI_NAMES)}
+_NAKSHATRA_INDEX = {name: i for i, name in enumerate(NAKSHATRA_NAMES)}
+
+
+def compact_chart(chart):
+    """Encode a chart dict as rows of integers (see COMPACT_SCHEMA)."""
+    rows = []
+    for body, info in chart.items():
+        retro = info.get('retrograde')
+        rows.append([
+            _BODY_INDEX.get(body, body),
+            int(round(info['longitude'] * 3600)) % 1296000,
+            _RASI_INDEX[info['rasi']],
+            _NAKSHATRA_INDEX[info['nakshatra']],
+            info['pada'],
+            None if retro is None else int(retro),
+        ])
+    return rows
+
+
+def shape_payload(payload, include_chart=False, compact=False, keep_chart=False):
+    """Drop or compact the chart block of a section payload."""
+    if "chart" not in payload:
+        return payload
+    if not (include_chart or keep_chart):
+        return {k: v for k, v in payload.items() if k != "chart"}
+    if compact:
+        return {**payload, "chart": compact_chart(payload["chart"])}
+    return payload
+
+
+# --- ENCODING ---
+def dumps(content):
+    """Encode to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    """Decode JSON bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded in one pass, bypassing jsonable_encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
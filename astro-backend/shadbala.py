@@ -0,0 +1,347 @@
+"""
+Shadbala: the six-fold strength of the seven planets, in virupas
+(60 virupas = 1 rupa).
+
+  sthana      uchcha, saptavargaja, ojhayugma, kendradi, drekkana
+  dig         distance from the house where the planet is powerless
+  kala        nathonnatha, paksha, tribhaga, year/month/weekday/hora lord, ayana
+  chesta      motion class (the Sun's ayana bala, the Moon's paksha bala)
+  naisargika  fixed natural strength
+  drik        benefic minus malefic aspects received, a quarter of it
+
+Every component is computed once per chart from the chart dict, its cusps,
+the vargas and one speed/declination lookup per planet. The terms that only
+depend on the date and the place are memoized across charts: sunrise, sunset
+and the next sunrise come from the shared rise/set cache (riseset.py), and the
+Sun's sidereal ingresses that fix the year and month lords. Planetary war
+(yuddha bala) is not applied.
+"""
+
+import datetime
+import math
+from functools import lru_cache
+
+import astrology
+import riseset
+from vargas import compute_vargas
+
+RASIS = [
+    "Mesha", "Rishaba", "Mithuna", "Kataka", "Simha", "Kanni",
+    "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
+]
+RASI_INDEX = {rasi: i for i, rasi in enumerate(RASIS)}
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+SIGN_LORDS = ["Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury",
+              "Venus", "Mars", "Jupiter", "Saturn", "Saturn", "Jupiter"]
+WEEKDAY_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]  # Sunday first
+HORA_ORDER = ["Sun", "Venus", "Mercury", "Moon", "Saturn", "Jupiter", "Mars"]      # each hour's lord follows
+
+# Swiss Ephemeris body numbers
+SWE_IDS = {"Sun": 0, "Moon": 1, "Mars": 4, "Mercury": 2, "Jupiter": 5, "Venus": 3, "Saturn": 6}
+
+# --- CONSTANTS ---
+EXALTATION = {"Sun": 10, "Moon": 33, "Mars": 298, "Mercury": 165, "Jupiter": 95, "Venus": 357, "Saturn": 200}
+# (sign, first degree, last degree)
+MOOLATRIKONA = {"Sun": (4, 0, 20), "Moon": (1, 3, 30), "Mars": (0, 0, 12), "Mercury": (5, 15, 20),
+                "Jupiter": (8, 0, 10), "Venus": (6, 0, 15), "Saturn": (10, 0, 20)}
+NAISARGIKA = {"Sun": 60.0, "Moon": 51.43, "Venus": 42.86, "Jupiter": 34.29, "Mercury": 25.71, "Mars": 17.14,
+              "Saturn": 8.57}
+REQUIRED_RUPAS = {"Sun": 6.5, "Moon": 6.0, "Mars": 5.0, "Mercury": 7.0, "Jupiter": 6.5, "Venus": 5.5, "Saturn": 5.0}
+MEAN_SPEED = {"Mars": 0.524, "Mercury": 0.9856, "Jupiter": 0.0831, "Venus": 0.9856, "Saturn": 0.0335}
+
+# Natural relationships: 1 friend, 0 neutral, -1 enemy
+NATURAL = {
+    "Sun": {"Moon": 1, "Mars": 1, "Jupiter": 1, "Mercury": 0, "Venus": -1, "Saturn": -1},
+    "Moon": {"Sun": 1, "Mercury": 1, "Mars": 0, "Jupiter": 0, "Venus": 0, "Saturn": 0},
+    "Mars": {"Sun": 1, "Moon": 1, "Jupiter": 1, "Venus": 0, "Saturn": 0, "Mercury": -1},
+    "Mercury": {"Sun": 1, "Venus": 1, "Mars": 0, "Jupiter": 0, "Saturn": 0, "Moon": -1},
+    "Jupiter": {"Sun": 1, "Moon": 1, "Mars": 1, "Saturn": 0, "Mercury": -1, "Venus": -1},
+    "Venus": {"Mercury": 1, "Saturn": 1, "Mars": 0, "Jupiter": 0, "Sun": -1, "Moon": -1},
+    "Saturn": {"Mercury": 1, "Venus": 1, "Jupiter": 0, "Sun": -1, "Moon": -1, "Mars": -1},
+}
+# natural + temporal relationship (-2..2) -> saptavargaja virupas; own sign 30, moolatrikona 45
+COMPOUND_VIRUPAS = {2: 22.5, 1: 15.0, 0: 7.5, -1: 3.75, -2: 1.875}
+SAPTAVARGA = ["D1", "D2", "D3", "D7", "D9", "D12", "D30"]
+
+DIURNAL, NOCTURNAL = ("Sun", "Jupiter", "Venus"), ("Moon", "Mars", "Saturn")
+MALEFICS = ("Sun", "Mars", "Saturn")  # the Moon counts as a malefic while waning
+DREKKANA_GENDER = {"Sun": 0, "Mars": 0, "Jupiter": 0, "Mercury": 1, "Saturn": 1, "Moon": 2, "Venus": 2}
+# Houses (from the planet) a planet aspects fully in addition to the 7th
+SPECIAL_ASPECTS = {"Mars": ((90, 120), (210, 240)), "Jupiter": ((120, 150), (240, 270)),
+                   "Saturn": ((60, 90), (270, 300))}
+
+
+def _arc(a, b):
+    """Shortest angular distance, 0-180."""
+    d = abs(a - b) % 360
+    return 360 - d if d > 180 else d
+
+
+# --- DATE AND PLACE (memoized) ---
+def _vedic_day(ordinal, lat, lon):
+    """(sunrise, sunset, next sunrise), UT Julian Days, of the local mean date with this ordinal."""
+    date = datetime.date.fromordinal(ordinal)
+    sunrise, sunset = riseset.sun_times(date, lat, lon)
+    next_rise, _ = riseset.sun_times(date + datetime.timedelta(days=1), lat, lon)
+    if None in (sunrise, sunset, next_rise):  # polar day or night: a 6:00 to 18:00 local mean day
+        midnight = riseset.local_midnight(ordinal, lon)
+        return midnight + 0.25, midnight + 0.75, midnight + 1.25
+    return sunrise, sunset, next_rise
+
+
+def sun_times(jd, lat, lon):
+    """Sunrise, sunset and next sunrise of the Vedic day (sunrise to sunrise) containing jd."""
+    ordinal = riseset.local_date_ordinal(jd, lon)
+    times = _vedic_day(ordinal, lat, lon)
+    if jd < times[0]:
+        times = _vedic_day(ordinal - 1, lat, lon)
+    return times
+
+
+def _sun_longitude(jd):
+    import pyswisseph as swe
+
+    return swe.calc_ut(jd, swe.SUN, swe.FLG_SIDEREAL)[0][0]
+
+
+@lru_cache(maxsize=1024)
+def _ingress(sign, estimate):
+    """UT Julian Day of the Sun's sidereal entry into `sign` nearest to the day `estimate`."""
+    astrology.configure_engine()
+    jd = float(estimate)
+    for _ in range(10):
+        delta = (_sun_longitude(jd) - 30 * sign + 180) % 360 - 180
+        jd -= delta / 0.9856
+        if abs(delta) < 1e-7:
+            break
+    return jd
+
+
+def _weekday(jd, lon):
+    """0 = Sunday, for the local mean date at jd."""
+    return int(math.floor(jd + 1.5 + lon / 360)) % 7
+
+
+def kala_lords(jd, lat, lon, sun_longitude):
+    """Year, month, weekday and hora lords at jd."""
+    sunrise, _, _ = sun_times(jd, lat, lon)
+    sign = int(sun_longitude // 30)
+    month_start = _ingress(sign, round(jd - (sun_longitude - 30 * sign) / 0.9856))
+    year_start = _ingress(0, round(jd - sun_longitude / 0.9856))
+    weekday_lord = WEEKDAY_LORDS[_weekday(sunrise, lon)]
+    hours = int((jd - sunrise) * 24)
+    return {
+        "year": WEEKDAY_LORDS[_weekday(year_start, lon)],
+        "month": WEEKDAY_LORDS[_weekday(month_start, lon)],
+        "weekday": weekday_lord,
+        "hora": HORA_ORDER[(HORA_ORDER.index(weekday_lord) + hours) % 7],
+    }
+
+
+def _motion(jd):
+    """{planet: (sidereal speed, declination)}."""
+    import pyswisseph as swe
+
+    astrology.configure_engine()
+    motion = {}
+    for planet in PLANETS:
+        pid = SWE_IDS[planet]
+        speed = swe.calc_ut(jd, pid, swe.FLG_SIDEREAL | swe.FLG_SPEED)[0][3]
+        motion[planet] = (speed, swe.calc_ut(jd, pid, swe.FLG_EQUATORIAL)[0][1])
+    return motion
+
+
+# --- COMPONENTS ---
+def _relationship(planet, other, signs):
+    """Compound relationship, -2 (great enemy) to 2 (great friend), from the rasi chart."""
+    temporal = 1 if (signs[other] - signs[planet]) % 12 in (1, 2, 3, 9, 10, 11) else -1
+    return NATURAL[planet][other] + temporal
+
+
+def sthana_bala(planet, longitude, signs, vargas):
+    uchcha = _arc(longitude, EXALTATION[planet] + 180) / 3
+
+    saptavargaja = 0.0
+    mt_sign, mt_first, mt_last = MOOLATRIKONA[planet]
+    for code in SAPTAVARGA:
+        sign = RASI_INDEX[vargas[code][planet]]
+        lord = SIGN_LORDS[sign]
+        if code == "D1" and sign == mt_sign and mt_first <= longitude % 30 < mt_last:
+            saptavargaja += 45
+        elif lord == planet:
+            saptavargaja += 30
+        else:
+            saptavargaja += COMPOUND_VIRUPAS[_relationship(planet, lord, signs)]
+
+    ojhayugma = 0.0
+    for code in ("D1", "D9"):
+        odd = RASI_INDEX[vargas[code][planet]] % 2 == 0
+        if odd != (planet in ("Moon", "Venus")):
+            ojhayugma += 15
+
+    house = (signs[planet] - signs["Ascendant"]) % 12
+    kendradi = (60, 30, 15)[house % 3]  # kendra, panaphara, apoklima
+    drekkana = 15 if int(longitude % 30 // 10) == DREKKANA_GENDER[planet] else 0
+    return {"uchcha": uchcha, "saptavargaja": saptavargaja, "ojhayugma": ojhayugma,
+            "kendradi": kendradi, "drekkana": drekkana}
+
+
+def dig_bala(planet, longitude, asc_deg, mc):
+    """A third of the distance from the point where the planet has no directional strength."""
+    powerless = {"Sun": mc + 180, "Mars": mc + 180, "Jupiter": asc_deg + 180, "Mercury": asc_deg + 180,
+                 "Saturn": asc_deg, "Moon": mc, "Venus": mc}[planet]
+    return _arc(longitude, powerless) / 3
+
+
+def kala_bala(planet, jd, times, lords, elongation, declination):
+    sunrise, sunset, next_rise = times
+    day = jd < sunset
+    # Distance from local apparent midnight, as a fraction of half a day
+    noon = (sunrise + sunset) / 2
+    from_midnight = 1 - min(abs(jd - noon), 1 - abs(jd - noon)) * 2
+    if planet in DIURNAL:
+        nathonnatha = 60 * from_midnight
+    elif planet in NOCTURNAL:
+        nathonnatha = 60 * (1 - from_midnight)
+    else:
+        nathonnatha = 60.0
+
+    moon_phase = _arc(elongation, 0)  # 0 at new moon, 180 at full
+    paksha = 60 - moon_phase / 3 if planet in MALEFICS else moon_phase / 3
+    if planet == "Moon":
+        paksha *= 2
+
+    if day:
+        third = min(int((jd - sunrise) / (sunset - sunrise) * 3), 2)
+        tribhaga_lord = ("Mercury", "Sun", "Saturn")[third]
+    else:
+        third = min(int((jd - sunset) / (next_rise - sunset) * 3), 2)
+        tribhaga_lord = ("Moon", "Venus", "Mars")[third]
+    tribhaga = 60 if planet in (tribhaga_lord, "Jupiter") else 0
+
+    abda = 15 if lords["year"] == planet else 0
+    masa = 30 if lords["month"] == planet else 0
+    vara = 45 if lords["weekday"] == planet else 0
+    hora = 60 if lords["hora"] == planet else 0
+
+    if planet == "Mercury":
+        kranti = abs(declination)
+    elif planet in ("Moon", "Saturn"):
+        kranti = -declination
+    else:
+        kranti = declination
+    ayana = (24 + kranti) / 48 * 60
+    if planet == "Sun":
+        ayana *= 2
+    return {"nathonnatha": nathonnatha, "paksha": paksha, "tribhaga": tribhaga, "abda": abda, "masa": masa,
+            "vara": vara, "hora": hora, "ayana": ayana}
+
+
+def chesta_bala(planet, speed, kala):
+    if planet == "Sun":
+        return kala["ayana"] / 2
+    if planet == "Moon":
+        return kala["paksha"] / 2
+    ratio = speed / MEAN_SPEED[planet]
+    if ratio < 0:
+        return 60.0   # vakra (retrograde)
+    if ratio < 0.1:
+        return 15.0   # vikala (stationary)
+    if ratio < 0.5:
+        return 15.0   # mandatara
+    if ratio < 0.9:
+        return 30.0   # manda
+    if ratio < 1.1:
+        return 7.5    # sama
+    if ratio < 1.5:
+        return 45.0   # chara
+    return 30.0       # atichara
+
+
+def drishti(aspecting, distance):
+    """Aspect value (virupas) of `aspecting` on a point `distance` degrees ahead of it."""
+    for start, end in SPECIAL_ASPECTS.get(aspecting, ()):
+        if start <= distance < end:
+            return 60.0
+    if distance < 30 or distance >= 300:
+        return 0.0
+    if distance < 60:
+        return (distance - 30) / 2
+    if distance < 90:
+        return distance - 45
+    if distance < 120:
+        return (120 - distance) / 2 + 30
+    if distance < 150:
+        return 150 - distance
+    if distance < 180:
+        return (distance - 150) * 2
+    return (300 - distance) / 2
+
+
+def drik_bala(planet, longitudes, elongation):
+    total = 0.0
+    for other in PLANETS:
+        if other == planet:
+            continue
+        value = drishti(other, (longitudes[planet] - longitudes[other]) % 360)
+        malefic = other in MALEFICS or (other == "Moon" and elongation > 180)
+        total += -value if malefic else value
+    return total / 4
+
+
+# --- SHADBALA ---
+def compute_shadbala(jd, lat, lon, chart, cusps, vargas=None):
+    """
+    Six-fold strength of the seven planets of a chart dict (with its Porphyry
+    cusps) born at jd (UT) and lat/lon. Returns per-planet components in
+    virupas, totals in rupas against the required minimum, and the ranking.
+    """
+    if vargas is None:
+        vargas = compute_vargas(chart)
+    longitudes = {planet: chart[planet]["longitude"] for planet in PLANETS}
+    signs = {body: RASI_INDEX[chart[body]["rasi"]] for body in PLANETS + ["Ascendant"]}
+    asc_deg, mc = chart["Ascendant"]["longitude"], cusps[9]
+    elongation = (longitudes["Moon"] - longitudes["Sun"]) % 360
+    times = sun_times(jd, lat, lon)
+    lords = kala_lords(jd, lat, lon, longitudes["Sun"])
+    motion = _motion(jd)
+
+    planets = {}
+    for planet in PLANETS:
+        speed, declination = motion[planet]
+        sthana = sthana_bala(planet, longitudes[planet], signs, vargas)
+        kala = kala_bala(planet, jd, times, lords, elongation, declination)
+        components = {
+            "sthana": sum(sthana.values()),
+            "dig": dig_bala(planet, longitudes[planet], asc_deg, mc),
+            "kala": sum(kala.values()),
+            "chesta": chesta_bala(planet, speed, kala),
+            "naisargika": NAISARGIKA[planet],
+            "drik": drik_bala(planet, longitudes, elongation),
+        }
+        total = sum(components.values())
+        rupas = total / 60
+        planets[planet] = {
+            **{name: round(value, 2) for name, value in components.items()},
+            "total": round(total, 2),
+            "rupas": round(rupas, 2),
+            "required": REQUIRED_RUPAS[planet],
+            "ratio": round(rupas / REQUIRED_RUPAS[planet], 3),
+            "strong": rupas >= REQUIRED_RUPAS[planet],
+            "sthana_parts": {name: round(value, 2) for name, value in sthana.items()},
+            "kala_parts": {name: round(value, 2) for name, value in kala.items()},
+        }
+    return {
+        "planets": planets,
+        "ranking": sorted(PLANETS, key=lambda p: planets[p]["ratio"], reverse=True),
+        "day_birth": jd < times[1],
+        "lords": lords,
+    }
+
+
+def rank_planets(shadbala, planets):
+    """The given planets (Rahu, Ketu and duplicates dropped) by Shadbala ratio, strongest first."""
+    ranked = [p for p in shadbala["ranking"] if p in planets]
+    return [{"planet": p, "rupas": shadbala["planets"][p]["rupas"], "ratio": shadbala["planets"][p]["ratio"],
+             "strong": shadbala["planets"][p]["strong"]} for p in ranked]
@@ -1,11 +1,11 @@
 import pyswisseph as swe
 import datetime
-from openai import OpenAI
 import os
-from env_config import OPENAI_API_KEY
-
-# --- CONFIGURE OPENAI ---
-client = OpenAI(api_key=OPENAI_API_KEY)
+from aspects import compute_aspects
+from ephe_loader import EPHE_PATH
+from house_lords import house_lord, house_sign, lord_houses
+from llm_backends import get_llm_client
+from llm_limiter import LLMOverloaded, create_chat_completion
 
 # --- CONSTANTS ---
 rasis = [
@@ -26,20 +26,13 @@ planet_ids = {
     "Saturn": 6, "Uranus": 7, "Neptune": 8, "Pluto": 9
 }
 
-sign_lords = {
-    "Mesha": "Mars", "Rishaba": "Venus", "Mithuna": "Mercury",
-    "Kataka": "Moon", "Simha": "Sun", "Kanni": "Mercury",
-    "Thula": "Venus", "Vrischika": "Mars", "Dhanus": "Jupiter",
-    "Makara": "Saturn", "Kumbha": "Saturn", "Meena": "Jupiter"
-}
-
 direction_map = {
     1: "East", 2: "East", 3: "North-East", 4: "North", 
     5: "North", 6: "North-West", 7: "West", 8: "West",
     9: "South-West", 10: "South", 11: "South", 12: "South-East"
 }
 
-swe.set_ephe_path('./ephe')
+swe.set_ephe_path(EPHE_PATH)
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
 # --- FUNCTIONS ---
@@ -69,22 +62,16 @@ def get_planet_positions(jd, lat, lon):
 def get_house_from_longitude(longitude, asc_deg):
     return int(((longitude - asc_deg) % 360) // 30) + 1
 
-def get_aspects(data, asc_deg):
-    house_aspects = {}
-    for planet, info in data.items():
-        if planet == 'Ascendant':
-            continue
-        planet_deg = info['longitude']
-        planet_house = get_house_from_longitude(planet_deg, asc_deg)
-        aspects = [(planet_house + 6 - 1) % 12 + 1]
-        house_aspects[planet] = sorted(set(aspects))
-    return house_aspects
+def get_aspects(data, matrix=None):
+    """Houses (from the lagna) each planet of the chart aspects, special aspects included."""
+    if matrix is None:
+        matrix = compute_aspects(data)
+    return {planet: info['houses'] for planet, info in matrix.to_dict().items()}
 
 def analyze_marriage(data, asc_deg, aspects, gender):
     lagna_rasi = data['Ascendant']['rasi']
-    rasi_seq = rasis[rasis.index(lagna_rasi):] + rasis[:rasis.index(lagna_rasi)]
-    seventh_rasi = rasi_seq[6]
-    seventh_lord = sign_lords.get(seventh_rasi)
+    seventh_rasi = house_sign(lagna_rasi, 7)
+    seventh_lord = house_lord(lagna_rasi, 7)
     seventh_house_deg = (asc_deg + 180) % 360
     spouse_direction = direction_map.get(int(seventh_house_deg // 30) + 1, "Unknown")
 
@@ -93,7 +80,9 @@ def analyze_marriage(data, asc_deg, aspects, gender):
         "lagna": lagna_rasi,
         "7th_house_sign": seventh_rasi,
         "7th_lord": seventh_lord,
+        "7th_lord_rules": list(lord_houses(lagna_rasi, seventh_lord)),
         "spouse_direction": spouse_direction,
+        "7th_house_aspected_by": [planet for planet, houses in aspects.items() if 7 in houses],
         "aspects": aspects
     }
 
@@ -103,13 +92,15 @@ def generate_report(analysis):
         f"Gender: {analysis['gender']}\n"
         f"Ascendant: {analysis['lagna']}\n"
         f"7th House: {analysis['7th_house_sign']}\n"
-        f"7th Lord: {analysis['7th_lord']}\n"
+        f"7th Lord: {analysis['7th_lord']} (rules houses {', '.join(map(str, analysis['7th_lord_rules']))})\n"
         f"Spouse Direction: {analysis['spouse_direction']}\n"
+        f"7th House Aspected By: {', '.join(analysis['7th_house_aspected_by']) or 'None'}\n"
     )
 
 def ask_gpt_spouse(prompt):
     try:
-        response = client.chat.completions.create(
+        response = create_chat_completion(
+            get_llm_client(),
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are an expert Vedic astrologer specializing in marriage and spouse prediction."},
@@ -119,5 +110,7 @@ def ask_gpt_spouse(prompt):
             max_tokens=1000
         )
         return response.choices[0].message.content.strip()
+    except LLMOverloaded:
+        raise
     except Exception as e:
         return f"GPT Error: {str(e)}"
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Pre-fork production launcher.
+
+The master imports the app and every analyzer module, computes one chart per
+section (so lookup tables, lazily built state and the ephemeris pages are all
+loaded), binds the listening socket and then forks the workers. Everything
+loaded before the fork is shared copy-on-write, so each extra worker only
+costs the memory it dirties itself. gc.freeze() keeps the collector from
+touching (and therefore copying) those preloaded objects.
+
+Workers are plain uvicorn servers on the inherited socket. The master:
+  - respawns any worker that exits,
+  - recycles workers after MAX_REQUESTS (+ random jitter, so they don't all
+    restart together) or when one grows beyond MAX_WORKER_RSS_MB,
+  - on SIGHUP starts a fresh set of workers, then gracefully drains the old
+    ones (no dropped connections),
+  - on SIGTERM/SIGINT drains all workers and exits.
+
+Because the app is preloaded, SIGHUP refreshes worker memory but not code;
+deploy new code by restarting the master.
+
+Usage:
+  python start_prefork.py [--workers 4] [--port 8000]
+Environment (or .env): WEB_CONCURRENCY, HOST, PORT, MAX_REQUESTS,
+MAX_REQUESTS_JITTER, MAX_WORKER_RSS_MB, GRACEFUL_TIMEOUT.
+"""
+
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def log(message):
+    print(f"[prefork {os.getpid()}] {message}", flush=True)
+
+
+# --- PRELOAD (master) ---
+def preload():
+    """Import and warm everything workers would otherwise load on first request."""
+    # The master warms up below; the workers' lifespan must not do it again after the fork
+    os.environ["STARTUP_WARMUP"] = "0"
+    from main import app
+    import astrology
+    from reports import warm_up
+
+    # On this thread, not the cpu pool: threads don't survive fork()
+    warm_up()
+
+    # Close the ephemeris files this thread opened: workers open their own
+    # (a shared file offset across processes would corrupt reads)
+    astrology.configure_engine(force=True)
+
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind_socket(host, port, backlog):
+    # proto must be IPPROTO_TCP: asyncio only sets TCP_NODELAY on accepted
+    # connections from such sockets (proto 0 means a 40 ms delayed-ACK stall)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+# --- WORKER ---
+def run_worker(app, sock, worker_id, generation, args):
+    """Child process body: serve until recycled or told to stop."""
+    from worker_stats import WORKER
+
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    random.seed()
+
+    max_requests = None
+    if args.max_requests:
+        max_requests = args.max_requests + random.randint(0, args.max_requests_jitter)
+
+    config = uvicorn.Config(app, limit_max_requests=max_requests,
+                            timeout_graceful_shutdown=args.graceful_timeout,
+                            log_level=args.log_level, access_log=args.access_log)
+    server = uvicorn.Server(config)
+    WORKER.update(id=worker_id, generation=generation, master_pid=os.getppid(),
+                  started=time.time(), server=server, max_requests=max_requests)
+    server.run(sockets=[sock])
+
+
+# --- MASTER ---
+class Master:
+    def __init__(self, app, sock, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> (worker_id, generation, started)
+        self.generation = 0
+        self.stopping = False
+        self.reload_requested = False
+        self.recycling = set()
+
+    def spawn(self, worker_id):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, worker_id, self.generation, self.args)
+            except BaseException as e:
+                log(f"worker {worker_id} crashed: {e!r}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = (worker_id, self.generation, time.monotonic())
+        log(f"worker {worker_id} (gen {self.generation}) started as pid {pid}")
+
+    def signal_workers(self, sig, pids=None):
+        for pid in list(self.workers if pids is None else pids):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited workers; replace current-generation ones unless stopping."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker_id, generation, started = self.workers.pop(pid, (None, None, None))
+            self.recycling.discard(pid)
+            if worker_id is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            log(f"worker {worker_id} (pid {pid}) exited with {code}")
+            if self.stopping or generation != self.generation:
+                continue
+            if code != 0 and time.monotonic() - started < 1:
+                time.sleep(1)  # crashing at startup: don't spin
+            self.spawn(worker_id)
+
+    def check_memory(self):
+        """Gracefully recycle workers that outgrew MAX_WORKER_RSS_MB."""
+        if not self.args.max_worker_rss_mb:
+            return
+        from worker_stats import read_memory
+
+        limit_kb = self.args.max_worker_rss_mb * 1024
+        for pid, (worker_id, _, _) in list(self.workers.items()):
+            rss_kb = read_memory(pid).get("rss_kb", 0)
+            if rss_kb > limit_kb and pid not in self.recycling:
+                log(f"worker {worker_id} (pid {pid}) at {rss_kb // 1024} MB, recycling")
+                self.recycling.add(pid)
+                os.kill(pid, signal.SIGTERM)
+
+    def reload(self):
+        """Rolling restart: bring up a new generation, then drain the old one."""
+        old = list(self.workers)
+        self.generation += 1
+        log(f"reloading: starting generation {self.generation}")
+        for worker_id in range(self.args.workers):
+            self.spawn(worker_id)
+        self.signal_workers(signal.SIGTERM, old)
+
+    def shutdown(self):
+        log("shutting down workers")
+        self.signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + (self.args.graceful_timeout or 30) + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.signal_workers(signal.SIGKILL)
+        self.reap()
+
+    def run(self):
+        def on_stop(signum, frame):
+            self.stopping = True
+
+        def on_reload(signum, frame):
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, on_stop)
+        signal.signal(signal.SIGINT, on_stop)
+        signal.signal(signal.SIGHUP, on_reload)
+
+        for worker_id in range(self.args.workers):
+            self.spawn(worker_id)
+
+        while not self.stopping:
+            self.reap()
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload()
+            self.check_memory()
+            time.sleep(0.5)
+        self.shutdown()
+        self.sock.close()
+        log("stopped")
+
+
+def parse_args():
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=env("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(env("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(env("WEB_CONCURRENCY", str(os.cpu_count() or 2))))
+    parser.add_argument("--max-requests", type=int, default=int(env("MAX_REQUESTS", "10000")),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(env("MAX_REQUESTS_JITTER", "1000")))
+    parser.add_argument("--max-worker-rss-mb", type=int, default=int(env("MAX_WORKER_RSS_MB", "0")),
+                        help="recycle a worker whose RSS exceeds this (0 = no limit)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(env("GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default=env("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    load_dotenv()  # before the launcher's own settings and before preload() imports the app
+    args = parse_args()
+    started = time.perf_counter()
+    app = preload()
+    log(f"✅ preloaded app and warmed all sections in {time.perf_counter() - started:.2f}s")
+    sock = bind_socket(args.host, args.port, args.backlog)
+    log(f"🚀 listening on {args.host}:{args.port} with {args.workers} workers")
+    Master(app, sock, args).run()
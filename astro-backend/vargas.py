@@ -0,0 +1,128 @@
+"""
+Divisional charts (vargas): the sixteen of Parashara's Shodasavarga.
+
+Each division splits a sign into n parts and maps every part to a sign
+by its own rule (Navamsa counts on continuously from Mesha, Dasamsa starts
+even signs from the ninth, Trimsamsa has unequal parts, ...). All those
+rules are folded once, at import, into one lookup table per division
+indexed by the part's position on the whole zodiac, so placing a body in
+all sixteen charts is one integer conversion and sixteen integer
+divisions and lookups, with no per-chart branching.
+
+Longitudes are converted to integer units of 1/7 arc-second
+(UNITS_PER_SIGN = 756000): every part boundary of every division,
+including the Saptamsa's 4deg 17' 8.57", falls on a whole unit, so the
+integer placement agrees with the exact one. Signs are 0-based indices
+into RASIS (0 = Mesha).
+"""
+
+RASIS = [
+    "Mesha", "Rishaba", "Mithuna", "Kataka", "Simha", "Kanni",
+    "Thula", "Vrischika", "Dhanus", "Makara", "Kumbha", "Meena"
+]
+
+UNITS_PER_SIGN = 756000  # 30 deg in 1/7 arc-seconds; divisible by every division below
+UNITS_PER_DEGREE = UNITS_PER_SIGN // 30
+CIRCLE = 12 * UNITS_PER_SIGN
+
+
+def _quality(sign):
+    return sign % 3  # 0 movable, 1 fixed, 2 dual
+
+
+def _odd(sign):
+    return sign % 2 == 0  # Mesha, the first sign, is odd
+
+
+# --- DIVISION RULES ---
+# rule(sign, part) -> varga sign, for part in range(n)
+def _continuous(n):
+    return lambda sign, part: (sign * n + part) % 12
+
+
+def _from_sign(offset_odd, offset_even=None, step=1):
+    """Parts counted on, `step` signs at a time, from the sign plus an offset (another for even signs)."""
+    def rule(sign, part):
+        offset = offset_odd if offset_even is None or _odd(sign) else offset_even
+        return (sign + offset + step * part) % 12
+    return rule
+
+
+def _from_start(starts):
+    """Parts counted on from a fixed start sign chosen by the sign's quality or parity."""
+    def rule(sign, part):
+        start = starts[_quality(sign)] if len(starts) == 3 else starts[0 if _odd(sign) else 1]
+        return (start + part) % 12
+    return rule
+
+
+def _hora(sign, part):
+    # Odd signs: Sun's hora (Simha) then Moon's (Kataka); even signs the reverse
+    return (4 if part == 0 else 3) if _odd(sign) else (3 if part == 0 else 4)
+
+
+# Trimsamsa: unequal parts, (last degree, sign) pairs
+_TRIMSAMSA_ODD = [(5, 0), (10, 10), (18, 8), (25, 2), (30, 6)]    # Mars, Saturn, Jupiter, Mercury, Venus
+_TRIMSAMSA_EVEN = [(5, 1), (12, 5), (20, 11), (25, 9), (30, 7)]   # Venus, Mercury, Jupiter, Saturn, Mars
+
+
+def _trimsamsa(sign, degree):
+    return next(s for last, s in (_TRIMSAMSA_ODD if _odd(sign) else _TRIMSAMSA_EVEN) if degree < last)
+
+
+# (code, name, parts per sign, rule); the Trimsamsa is tabulated by whole degree
+DIVISIONS = [
+    ("D1", "Rasi", 1, _continuous(1)),
+    ("D2", "Hora", 2, _hora),
+    ("D3", "Drekkana", 3, _from_sign(0, step=4)),        # 1st, 5th, 9th
+    ("D4", "Chaturthamsa", 4, _from_sign(0, step=3)),    # 1st, 4th, 7th, 10th
+    ("D7", "Saptamsa", 7, _from_sign(0, 6)),
+    ("D9", "Navamsa", 9, _continuous(9)),
+    ("D10", "Dasamsa", 10, _from_sign(0, 8)),
+    ("D12", "Dwadasamsa", 12, _from_sign(0)),
+    ("D16", "Shodasamsa", 16, _from_start((0, 4, 8))),
+    ("D20", "Vimsamsa", 20, _from_start((0, 8, 4))),
+    ("D24", "Chaturvimsamsa", 24, _from_start((4, 3))),
+    ("D27", "Bhamsa", 27, _continuous(27)),
+    ("D30", "Trimsamsa", 30, _trimsamsa),
+    ("D40", "Khavedamsa", 40, _from_start((0, 6))),
+    ("D45", "Akshavedamsa", 45, _from_start((0, 4, 8))),
+    ("D60", "Shashtiamsa", 60, _from_sign(0)),
+]
+
+
+def _build_table(n, rule):
+    return bytes(rule(sign, part) for sign in range(12) for part in range(n))
+
+
+CODES = [code for code, _, _, _ in DIVISIONS]
+NAMES = {code: name for code, name, _, _ in DIVISIONS}
+# (units per part, table indexed by the part's position on the zodiac) per division
+_SPECS = [(UNITS_PER_SIGN // n, _build_table(n, rule)) for _, _, n, rule in DIVISIONS]
+
+
+# --- PLACEMENT ---
+def varga_signs(longitudes):
+    """
+    Sign indices of every body in every division, in one pass.
+    Returns one bytes object per longitude, ordered like CODES.
+    """
+    specs = _SPECS
+    rows = []
+    for longitude in longitudes:
+        units = int(longitude % 360 * UNITS_PER_DEGREE) % CIRCLE  # integer 1/7 arc-seconds
+        rows.append(bytes([table[units // width] for width, table in specs]))
+    return rows
+
+
+def compute_vargas(chart):
+    """{"D1": {body: rasi}, "D9": {...}, ...} for every body of a chart dict."""
+    bodies = list(chart)
+    rows = varga_signs([chart[body]["longitude"] for body in bodies])
+    return {code: {body: RASIS[row[i]] for body, row in zip(bodies, rows)} for i, code in enumerate(CODES)}
+
+
+def vargottama(vargas, bodies=None):
+    """Bodies in the same sign in the Rasi and Navamsa charts."""
+    d1, d9 = vargas["D1"], vargas["D9"]
+    return [body for body in (bodies or d1) if body in d1 and d1[body] == d9[body]]
@@ -0,0 +1,10 @@
+"""
+Version of the calculation engine.
+
+Bump ENGINE_VERSION whenever a change alters any computed output (positions,
+analyzer results, report text). HTTP ETags are derived from it, so a bump
+invalidates every cached response.
+"""
+
+ENGINE_VERSION = "1.5.3"
+AYANAMSA = "LAHIRI"
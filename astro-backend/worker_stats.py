@@ -0,0 +1,64 @@
+"""
+Per-process figures for /metrics and the pre-fork benchmarks.
+
+Memory comes from /proc/<pid>/smaps_rollup, which splits RSS into the part
+this process shares with its siblings (pages inherited copy-on-write from the
+pre-fork master) and the part it has dirtied privately. PSS divides shared
+pages evenly between the processes mapping them, so summing PSS over master
+and workers gives the real footprint of the whole server.
+
+start_prefork.py fills WORKER in each forked child; in single-process mode it
+stays empty and only the process figures are reported.
+"""
+
+import os
+import resource
+import time
+
+_STARTED = time.time()
+
+# Set by start_prefork.py in each worker: id, generation, master_pid, server
+WORKER = {}
+
+_SMAPS_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def read_memory(pid="self"):
+    """RSS/PSS breakdown in kB for a process (empty dict where /proc is unavailable)."""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in _SMAPS_FIELDS:
+                    memory[_SMAPS_FIELDS[key]] = int(rest.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+def process_metrics():
+    """This process: pid, uptime, memory, and worker identity when pre-forked."""
+    info = {
+        "pid": os.getpid(),
+        "uptime_s": round(time.time() - WORKER.get("started", _STARTED), 1),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        **read_memory(),
+    }
+    if WORKER:
+        server = WORKER.get("server")
+        info.update({
+            "worker_id": WORKER["id"],
+            "generation": WORKER["generation"],
+            "master_pid": WORKER["master_pid"],
+            "requests": server.server_state.total_requests if server else None,
+            "max_requests": WORKER.get("max_requests"),
+        })
+    return info
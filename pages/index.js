@@ -146,7 +146,7 @@ export default function Home() {
       console.log('Making requests to:', backend);
       
       const [chartRes, careerRes, dasaRes, yogaRes, lifePurposeRes, dasaBhuktiRes, spouseRes, induDasaRes] = await Promise.all([
-        fetch(`${backend}/predict?${new URLSearchParams({ dob, tob, lat, lon, tz_offset: "5.5" })}`).then(res => {
+        fetch(`${backend}/predict?${new URLSearchParams({ dob, tob, lat, lon, tz_offset: "5.5", include_chart: "true" })}`).then(res => {
           if (!res.ok) {
             throw new Error(`Predict endpoint failed: ${res.status} ${res.statusText}`);
           }
@@ -182,7 +182,7 @@ export default function Home() {
           }
           return res.json();
         }),
-        fetch(`${backend}/spouse?${new URLSearchParams({ dob, tob, lat, lon, tz_offset: "5.5", gender: "Male" })}`).then(res => {
+        fetch(`${backend}/spouse?${new URLSearchParams({ dob, tob, lat, lon, tz_offset: "5.5", gender: "Male", include_chart: "true" })}`).then(res => {
           if (!res.ok) {
             throw new Error(`Spouse endpoint failed: ${res.status} ${res.statusText}`);
           }